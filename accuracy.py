@@ -0,0 +1,244 @@
+# Accuracy versus cost of the FDM solver against closed-form beam solutions
+# usage:
+#       python accuracy.py                        (writes accuracy_results.json)
+#       python accuracy.py --save-baseline        (stores the results as the new baseline)
+#       python accuracy.py --baseline FILE        (exit code 1 if any error grew)
+# Every case is built through add_support / add_point_load / add_loads,
+# and node counts double the number of intervals so the observed order of convergence can be read
+# Over-refined cases (REFINED_CASES) must be rejected or still accurate, otherwise the exit code is 1
+# Solves the model warns about (rounding errors past the discretization error) are marked with a *
+import argparse
+import json
+import os
+import sys
+import numpy as np
+
+from main import Model
+
+NODE_COUNTS = [31, 61, 121, 241, 481, 961, 1921]
+
+DEFAULT_OUTPUT = "accuracy_results.json"
+DEFAULT_BASELINE = "accuracy_baseline.json"
+
+L = 10.0        # beam length (m)
+q = -1e3        # distributed load (N/m)
+P = -1e4        # point load (N)
+EI = 2e11 * 10e-6       # flexural rigidity of the default materials (N m^2)
+beta = 10.0     # 1 / characteristic length of the beam on an elastic foundation (1/m)
+k = 4 * EI * beta**4    # foundation modulus (N/m^2)
+
+
+# Closed-form solutions, as functions of x returning (EI * deflection, moment)
+# both follow the solver's convention: EI v'''' = q and M = EI v''
+
+def simply_supported_udl(x):
+        return q * x * (L**3 - 2 * L * x**2 + x**3) / 24, q * (x**2 - L * x) / 2
+
+def simply_supported_midpoint_load(x):
+        a = np.minimum(x, L - x)
+        return P * a * (3 * L**2 - 4 * a**2) / 48, -P * a / 2
+
+def cantilever_udl(x):
+        return q * x**2 * (6 * L**2 - 4 * L * x + x**2) / 24, q * (L - x)**2 / 2
+
+def cantilever_tip_load(x):
+        return P * x**2 * (3 * L - x) / 6, P * (L - x)
+
+def fixed_fixed_udl(x):
+        return q * x**2 * (L - x)**2 / 24, q * (L**2 - 6 * L * x + 6 * x**2) / 12
+
+def propped_cantilever_udl(x):
+        return q * x**2 * (3 * L**2 - 5 * L * x + 2 * x**2) / 48, q * (L**2 - 5 * L * x + 4 * x**2) / 8
+
+def two_span_udl(x):
+        # By symmetry each span is a propped cantilever fixed at the middle support
+        l = L / 2
+        a = np.where(x <= l, x, L - x)
+        return q * a * (l**3 - 3 * l * a**2 + 2 * a**3) / 48, q * a * (4 * a - 3 * l) / 8
+
+def foundation_midpoint_load(x):
+        # Infinite beam on an elastic foundation, the ends are beta L / 2 = 50 characteristic lengths away
+        r = beta * np.abs(x - L / 2)
+        return P * np.exp(-r) * (np.cos(r) + np.sin(r)) / (8 * beta**3), -P * np.exp(-r) * (np.cos(r) - np.sin(r)) / (4 * beta)
+
+
+# name: (supports, point loads, distributed loads, foundations, closed-form solution)
+CASES = {
+        "simply supported, UDL": ([(0, "xy"), (L, "y")], [], [((0, L), q)], [], simply_supported_udl),
+        "simply supported, point": ([(0, "xy"), (L, "y")], [(P, L / 2)], [], [], simply_supported_midpoint_load),
+        "cantilever, UDL": ([(0, "xyz")], [], [((0, L), q)], [], cantilever_udl),
+        "cantilever, point": ([(0, "xyz")], [(P, L)], [], [], cantilever_tip_load),
+        "fixed-fixed, UDL": ([(0, "xyz"), (L, "xyz")], [], [((0, L), q)], [], fixed_fixed_udl),
+        "propped cantilever, UDL": ([(0, "xyz"), (L, "y")], [], [((0, L), q)], [], propped_cantilever_udl),
+        "two spans, UDL": ([(0, "xy"), (L / 2, "y"), (L, "y")], [], [((0, L), q)], [], two_span_udl),
+        "foundation, point": ([(0, "x")], [(P, L / 2)], [], [((0, L), k)], foundation_midpoint_load),
+}
+
+# (case, nodes) solved after the sweep: the foundation bounds the condition number,
+# so the deflections keep their digits far past the node counts of a beam on supports
+LARGE_CASES = [
+        ("foundation, point", 100001),
+]
+
+
+# Over-refined models: rounding errors grow like N^4 and pass the discretization error,
+# the deflections of these (case, nodes, out of core) have lost several digits or all of them
+REFINED_CASES = [
+        ("simply supported, UDL", 65537, False),
+        ("simply supported, UDL", 100001, False),
+        ("cantilever, UDL", 30000, False),
+        ("fixed-fixed, UDL", 100001, False),
+        ("simply supported, UDL", 100001, True),
+]
+# Largest deflection error a solve of REFINED_CASES may return instead of an error
+REFINED_TOLERANCE = 1e-3
+
+
+# Solves one case with N nodes and measures its error against the closed-form solution
+def run_case(name:str, nodes:int, out_of_core:bool = False):
+        supports, point_loads, loads, foundations, exact = CASES[name]
+
+        model = Model()
+        model.set_properties(L, model.materials["E"], model.materials["I"])
+        model.set_total_node_num(nodes)
+        model.out_of_core = out_of_core
+        for pos, support_type in supports:
+                model.add_support(pos, support_type)
+        for magnitude, pos in point_loads:
+                model.add_point_load(magnitude, pos)
+        for pos_limits, magnitude in loads:
+                model.add_loads(pos_limits, magnitude)
+        for pos_limits, modulus in foundations:
+                model.add_foundation(pos_limits, modulus)
+
+        if not model.solve_FDM():
+                raise RuntimeError(f"{name} ({nodes} nodes): {model.stats.error}")
+
+        x = model.node_positions
+        v_exact, m_exact = exact(x)
+        v_exact = v_exact / (model.materials["E"] * model.materials["I"])
+        # moments are only computed for the inner nodes 2 .. N-4
+        m_exact = m_exact[2:-3]
+
+        return {
+                "case": name,
+                "nodes": nodes,
+                "key": f"{name}/{nodes}",
+                "deflection_error": float(np.max(np.abs(model.deflections - v_exact)) / np.max(np.abs(v_exact))),
+                "moment_error": float(np.max(np.abs(model.moments - m_exact)) / np.max(np.abs(m_exact))),
+                "solve_time": model.stats.total(),
+                "warning": model.stats.warning,
+        }
+
+
+# Runs every case over every node count, printing the error and the observed order, then LARGE_CASES
+def run_suite(node_counts):
+        results = []
+        print(f"{'case':<26}{'nodes':>7}{'defl. error':>13}{'order':>7}{'moment error':>14}{'order':>7}{'time ms':>10}")
+        for name in CASES:
+                previous = None
+                for nodes in node_counts:
+                        record = run_case(name, nodes)
+                        orders = ["", ""]
+                        if previous is not None:
+                                # The step halves between consecutive node counts
+                                for i, error in enumerate(("deflection_error", "moment_error")):
+                                        if record[error] > 0 and previous[error] > 0:
+                                                orders[i] = f"{np.log2(previous[error] / record[error]):.2f}"
+                        print(f"{name:<26}{nodes:>7}{record['deflection_error']:13.3e}{orders[0]:>7}{record['moment_error']:14.3e}{orders[1]:>7}{record['solve_time'] * 1e3:10.2f}{' *' if record['warning'] else ''}")
+                        results.append(record)
+                        previous = record
+        for name, nodes in LARGE_CASES:
+                record = run_case(name, nodes)
+                print(f"{name:<26}{nodes:>7}{record['deflection_error']:13.3e}{'':>7}{record['moment_error']:14.3e}{'':>7}{record['solve_time'] * 1e3:10.2f}{' *' if record['warning'] else ''}")
+                results.append(record)
+        return results
+
+
+# Runs the over-refined cases, each must be rejected or within REFINED_TOLERANCE
+# returns the records of the solved cases and the keys of the inaccurate ones
+def run_refined(cases):
+        results = []
+        failures = []
+        print(f"\n{'over-refined case':<26}{'nodes':>7}  result")
+        for name, nodes, out_of_core in cases:
+                label = f"{name}{' (out of core)' if out_of_core else ''}"
+                try:
+                        record = run_case(name, nodes, out_of_core)
+                except RuntimeError as e:
+                        print(f"{label:<26}{nodes:>7}  rejected: {str(e).split(': ', 1)[-1]}")
+                        continue
+                record["key"] += "/out-of-core" if out_of_core else ""
+                flag = ""
+                if record["deflection_error"] > REFINED_TOLERANCE:
+                        flag = "  WRONG RESULT ACCEPTED"
+                        failures.append(record["key"])
+                print(f"{label:<26}{nodes:>7}  deflection error {record['deflection_error']:.3e}{' *' if record['warning'] else ''}{flag}")
+                results.append(record)
+        return results, failures
+
+
+# Compares with a baseline: errors may not grow, times are only reported
+def compare(results, baseline, tolerance:float):
+        reference = {record["key"]: record for record in baseline["results"]}
+        regressions = []
+
+        print(f"\n{'case':<34}{'error ratio':>13}{'time ratio':>12}")
+        for record in results:
+                if record["key"] not in reference:
+                        continue
+                old = reference[record["key"]]
+                error_ratios = [
+                        record[error] / old[error] if old[error] > 0 else 1.0
+                        for error in ("deflection_error", "moment_error")
+                ]
+                time_ratio = record["solve_time"] / old["solve_time"] if old["solve_time"] > 0 else float("inf")
+                flag = ""
+                if max(error_ratios) > 1 + tolerance:
+                        flag = "  LESS ACCURATE"
+                        regressions.append(record["key"])
+                print(f"{record['key']:<34}{max(error_ratios):13.3f}{time_ratio:12.2f}{flag}")
+
+        return regressions
+
+
+def main():
+        parser = argparse.ArgumentParser(description="Check the FDM solver against closed-form beam solutions")
+        parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file for the results")
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON file with the baseline results")
+        parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+        parser.add_argument("--tolerance", type=float, default=0.01, help="allowed relative growth of the errors")
+        args = parser.parse_args()
+
+        results = run_suite(NODE_COUNTS)
+        refined, failures = run_refined(REFINED_CASES)
+
+        with open(args.output, "w") as file:
+                json.dump({"results": results, "refined": refined}, file, indent=2)
+        print(f"\nResults written to {args.output}")
+        if failures:
+                print(f"\n{len(failures)} over-refined case(s) returned wrong deflections: {', '.join(failures)}")
+                return 1
+
+        if args.save_baseline:
+                with open(args.baseline, "w") as file:
+                        json.dump({"results": results}, file, indent=2)
+                print(f"Baseline written to {args.baseline}")
+                return 0
+
+        if not os.path.exists(args.baseline):
+                print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+                return 0
+
+        with open(args.baseline) as file:
+                baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+                print(f"\n{len(regressions)} case(s) lost accuracy: {', '.join(regressions)}")
+                return 1
+        return 0
+
+
+if __name__ == "__main__":
+        sys.exit(main())
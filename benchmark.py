@@ -0,0 +1,311 @@
+# Headless benchmark harness for the beam solver and the GUI rendering
+# usage:
+#       python benchmark.py                       (full sweep, writes benchmark_results.json)
+#       python benchmark.py --quick               (node counts up to 10^4, 10^3 for rendering)
+#       python benchmark.py --save-baseline       (stores the results as the new baseline)
+#       python benchmark.py --baseline FILE       (compares against FILE, exit code 1 on regression)
+# Every solve timing is stored with an estimate of the error of its deflections; solves the model
+# rejects as too finely discretized are reported as such, with the time it took to reject them
+# Up to DENSE_REFERENCE_MAX_NODES the node sweep also times the linear solve alone, with BandedLU and with
+# the dense solve it replaced, on the same system
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tkinter as tk
+import numpy as np
+
+from main import BandedLU, Controller, Model, Renderer
+
+NODE_COUNTS = [30, 100, 300, 1_000, 10_000, 100_000, 1_000_000]
+QUICK_NODE_COUNTS = [30, 100, 300, 1_000, 10_000]
+RENDER_NODE_COUNTS = [30, 1_000, 100_000]
+QUICK_RENDER_NODE_COUNTS = [30, 1_000]
+LOAD_COUNTS = [1, 10, 100, 1_000, 10_000]
+SUPPORT_COUNTS = [2, 10, 100, 1_000]
+# The dense N x N matrix of the reference solve takes 72 MB at this size
+DENSE_REFERENCE_MAX_NODES = 3_000
+
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+
+# Collects the machine information stored next to the results
+def machine_metadata():
+        return {
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+                "cpu_count": os.cpu_count(),
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+
+# Builds a model with evenly spaced supports and random loads (seeded, so runs are reproducible)
+# the elements are added in bulk, one history entry each instead of one per element
+def build_model(nodes:int, num_loads:int = 1, num_supports:int = 2, seed:int = 0):
+        rng = np.random.default_rng(seed)
+        model = Model()
+        model.total_node_num = nodes
+
+        model.add_supports(np.linspace(0, model.length, num_supports), ["xy"] + ["y"] * (num_supports - 1))
+
+        magnitudes, positions = rng.uniform(-1e3, -1e2, num_loads), rng.uniform(0, model.length, num_loads)
+        model.add_point_loads(magnitudes, positions)
+
+        magnitudes, limits = rng.uniform(-1e3, -1e2, num_loads), np.sort(rng.uniform(0, model.length, (num_loads, 2)))
+        model.add_distributed_loads(limits[:, 0], limits[:, 1], magnitudes)
+
+        return model
+
+
+# Estimate of the relative error of the last solve's deflections: one step of iterative refinement,
+# the correction K^-1 (F - K v) computed from a float64 residual is about as large as the error
+def error_estimate(model:Model):
+        N = model.total_node_num
+        h = model.length / (N - 1)
+        K, _ = model._apply_boundary_conditions(model._build_stiffness_matrix(N), np.ones(N), N, h)
+        F = model._scale_loads(model._build_load_vector(N, h), model._load_mask, N, h)
+        v = np.asarray(model.deflections)
+        correction = model._factorization.solve(F - BandedLU.multiply(K, model.band_lower, v))
+        return float(np.abs(correction).max() / np.abs(v).max())
+
+
+# Solves the model `repeat` times from scratch and keeps the fastest run
+# the per-phase timings come from the model's SolveStats; a rejected solve is timed once
+# and its record carries the model's error instead of an error estimate
+def time_solve(model:Model, repeat:int):
+        best = None
+        for _ in range(repeat):
+                model.solved = False
+                model._factorization = None
+                if not model.solve_FDM():
+                        return {"total": model.stats.total(), "phases": dict(model.stats.timings), "error": model.stats.error}
+                if best is None or model.stats.total() < best.total():
+                        best = model.stats
+
+        # Time a second solve that reuses the factorization (load-only change)
+        model.solved = False
+        model.solve_FDM()
+
+        return {
+                "total": best.total(),
+                "phases": dict(best.timings),
+                "resolve": model.stats.total(),
+                "condition": best.condition,
+                "error_estimate": error_estimate(model),
+        }
+
+
+# Accuracy column printed next to a solve timing
+def accuracy(record):
+        if "error" in record:
+                return f"  rejected: {record['error']}"
+        return f"  error ~{record['error_estimate']:.1e}"
+
+
+# Times a callable `repeat` times and returns the fastest run
+def time_call(function, repeat:int):
+        best = float("inf")
+        for _ in range(repeat):
+                start = time.perf_counter()
+                function()
+                best = min(best, time.perf_counter() - start)
+        return best
+
+
+# Times of the linear solve of the model's system: factorizing and solving with BandedLU, and
+# np.linalg.solve on the dense N x N matrix (assembled from the band on every solve, as the solver
+# used before the banded one did); returns (banded, dense)
+def time_linear_solves(model:Model, repeat:int):
+        N = model.total_node_num
+        h = model.length / (N - 1)
+        K, load_mask = model._apply_boundary_conditions(model._build_stiffness_matrix(N), np.ones(N), N, h)
+        F = model._scale_loads(model._build_load_vector(N, h), load_mask, N, h)
+        banded = time_call(lambda: BandedLU(K, model.band_lower, model.band_upper).solve(F), repeat)
+        dense = time_call(lambda: np.linalg.solve(BandedLU.to_dense(K, model.band_lower), F), repeat)
+        return banded, dense
+
+
+# Solver scaling with the number of nodes
+def bench_nodes(node_counts, repeat:int):
+        results = []
+        for nodes in node_counts:
+                model = build_model(nodes)
+                # The largest cases are slow, a single run is enough for them
+                record = time_solve(model, repeat if nodes <= 10_000 else 1)
+                record.update(suite="nodes", key=f"nodes/{nodes}", nodes=nodes, loads=2, supports=2)
+                reference = ""
+                if nodes <= DENSE_REFERENCE_MAX_NODES and "error" not in record:
+                        record["linear_solve"], record["dense_reference"] = time_linear_solves(model, repeat)
+                        reference = f"  (banded LU {record['linear_solve'] * 1e3:.2f} ms, dense solve {record['dense_reference'] * 1e3:.2f} ms)"
+                results.append(record)
+                print(f"nodes {nodes:>9}: {record['total'] * 1e3:10.2f} ms{reference}{accuracy(record)}")
+        return results
+
+
+# Solver scaling with the number of point and distributed loads
+def bench_loads(load_counts, repeat:int, nodes:int = 1_000):
+        results = []
+        for num_loads in load_counts:
+                model = build_model(nodes, num_loads=num_loads)
+                record = time_solve(model, repeat)
+                record.update(suite="loads", key=f"loads/{num_loads}", nodes=nodes, loads=2 * num_loads, supports=2)
+                results.append(record)
+                print(f"loads {2 * num_loads:>9}: {record['total'] * 1e3:10.2f} ms{accuracy(record)}")
+        return results
+
+
+# Solver scaling with the number of supports
+def bench_supports(support_counts, repeat:int, nodes:int = 10_000):
+        results = []
+        for num_supports in support_counts:
+                model = build_model(nodes, num_supports=num_supports)
+                record = time_solve(model, repeat)
+                record.update(suite="supports", key=f"supports/{num_supports}", nodes=nodes, loads=2, supports=num_supports)
+                results.append(record)
+                print(f"supports {num_supports:>6}: {record['total'] * 1e3:10.2f} ms{accuracy(record)}")
+        return results
+
+
+# Solved model drawn by the rendering benchmarks, spans of about 1000 nodes keep the solve accurate
+def build_render_model(nodes:int):
+        model = build_model(nodes, num_loads=5, num_supports=max(3, nodes // 1_000))
+        if not model.solve_FDM():
+                raise RuntimeError(model.stats.error)
+        return model
+
+
+# Redraw times of the schematic and of the solved diagrams on a hidden Tk window
+def bench_rendering(node_counts, repeat:int):
+        try:
+                app = Controller()
+        except tk.TclError as e:
+                print(f"rendering skipped: {e}")
+                return []
+
+        results = []
+        view = app.view
+        # Keep the window off screen while still giving the canvases a real size
+        view.geometry("1000x700+-3000+-3000")
+        view.update()
+
+        for nodes in node_counts:
+                app.model = build_render_model(nodes)
+
+                draw_beam = time_call(lambda: (view.draw_beam(), view.update_idletasks()), repeat)
+                draw_solved = {}
+                for mode in ("deflection", "moment", "shear", "slope"):
+                        view.solution_mode = mode
+                        draw_solved[mode] = time_call(lambda: (view.draw_solved_beam(), view.update_idletasks()), repeat)
+
+                record = {
+                        "suite": "rendering",
+                        "key": f"rendering/{nodes}",
+                        "nodes": nodes,
+                        "total": draw_beam + sum(draw_solved.values()),
+                        "phases": {"draw_beam": draw_beam, **{f"draw_solved_beam/{mode}": t for mode, t in draw_solved.items()}},
+                }
+                results.append(record)
+                print(f"render {nodes:>8}: {record['total'] * 1e3:10.2f} ms")
+
+        view.destroy()
+        return results
+
+
+# Times of the same drawings written to .svg and .png files, without a display
+def bench_file_rendering(node_counts, repeat:int):
+        results = []
+        for nodes in node_counts:
+                renderer = Renderer(build_render_model(nodes))
+
+                drawings = {
+                        "draw_beam": renderer.draw_beam,
+                        "draw_solved_beam/deflection": lambda: renderer.draw_solved_beam("deflection"),
+                        "draw_solved_beam/moment": lambda: renderer.draw_solved_beam("moment"),
+                }
+                phases = {}
+                for name, draw in drawings.items():
+                        phases[f"{name}/svg"] = time_call(lambda: draw().to_svg(), repeat)
+                        phases[f"{name}/png"] = time_call(lambda: draw().to_png(), repeat)
+
+                record = {"suite": "file_rendering", "key": f"file_rendering/{nodes}", "nodes": nodes, "total": sum(phases.values()), "phases": phases}
+                results.append(record)
+                print(f"file render {nodes:>6}: {record['total'] * 1e3:10.2f} ms")
+        return results
+
+
+# Compares the results with a baseline, returns the list of regressions
+def compare(results, baseline, threshold:float):
+        reference = {record["key"]: record for record in baseline["results"]}
+        regressions = []
+
+        print(f"\n{'case':<22}{'baseline ms':>14}{'current ms':>14}{'ratio':>9}")
+        for record in results:
+                if record["key"] not in reference:
+                        continue
+                old = reference[record["key"]]["total"]
+                new = record["total"]
+                ratio = new / old if old > 0 else float("inf")
+                flag = ""
+                if ratio > 1 + threshold:
+                        flag = "  REGRESSION"
+                        regressions.append(record["key"])
+                print(f"{record['key']:<22}{old * 1e3:14.2f}{new * 1e3:14.2f}{ratio:9.2f}{flag}")
+
+        return regressions
+
+
+def main():
+        parser = argparse.ArgumentParser(description="Benchmark the FDM beam solver and the GUI rendering")
+        parser.add_argument("--quick", action="store_true", help="only run node counts up to 10^4 (10^3 for rendering)")
+        parser.add_argument("--repeat", type=int, default=3, help="runs per case, the fastest is kept")
+        parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file for the results")
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON file with the baseline results")
+        parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+        parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging a regression")
+        parser.add_argument("--no-render", action="store_true", help="skip the GUI rendering benchmarks")
+        args = parser.parse_args()
+
+        node_counts = QUICK_NODE_COUNTS if args.quick else NODE_COUNTS
+        render_node_counts = QUICK_RENDER_NODE_COUNTS if args.quick else RENDER_NODE_COUNTS
+
+        results = []
+        results += bench_nodes(node_counts, args.repeat)
+        results += bench_loads(LOAD_COUNTS, args.repeat)
+        results += bench_supports(SUPPORT_COUNTS, args.repeat)
+        if not args.no_render:
+                results += bench_rendering(render_node_counts, args.repeat)
+                results += bench_file_rendering(render_node_counts, args.repeat)
+
+        report = {"machine": machine_metadata(), "results": results}
+        with open(args.output, "w") as file:
+                json.dump(report, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+        if args.save_baseline:
+                with open(args.baseline, "w") as file:
+                        json.dump(report, file, indent=2)
+                print(f"Baseline written to {args.baseline}")
+                return 0
+
+        if not os.path.exists(args.baseline):
+                print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+                return 0
+
+        with open(args.baseline) as file:
+                baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+                print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+                return 1
+        return 0
+
+
+if __name__ == "__main__":
+        sys.exit(main())
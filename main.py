@@ -1,10 +1,615 @@
 # Import necessary libraries
+import json
+import os
+import struct
+import tempfile
+import time
+import tracemalloc
+import zlib
 import tkinter as tk
 import numpy as np
-from tkinter import ttk
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from multiprocessing import shared_memory
+from tkinter import ttk, filedialog
+
+# This class collects the time (and optionally memory) spent on each phase of a solve
+class SolveStats():
+        def __init__(self, track_memory:bool = False, callbacks = ()):
+                self.track_memory = track_memory
+                # Callbacks are called as callback(phase, seconds, peak_bytes) after each phase
+                self.callbacks = list(callbacks)
+                # Phase name -> seconds, in the order the phases ran
+                self.timings = {}
+                # Phase name -> peak bytes allocated during the phase (only if track_memory)
+                self.memory = {}
+                self.reused_factorization = False
+                self.error = None
+                # Set when the mixed precision solve fell back to another method
+                self.fallback = None
+                # Set when rounding errors likely exceed the discretization error (see Model.rounding_warning_loss)
+                self.warning = None
+                # 1-norm condition estimate of K and (mixed precision) number of refinement steps
+                self.condition = None
+                self.refinement_iterations = None
+                # Second order solves: fixed point iterations (0 if K - G was factorized directly)
+                self.second_order_iterations = None
+                self.buckling_factor = None
+
+        # Context manager that times one phase of the solve
+        @contextmanager
+        def phase(self, name:str):
+                if self.track_memory:
+                        started_tracing = not tracemalloc.is_tracing()
+                        if started_tracing:
+                                tracemalloc.start()
+                        tracemalloc.reset_peak()
+                        start_memory = tracemalloc.get_traced_memory()[0]
+
+                start = time.perf_counter()
+                try:
+                        yield
+                finally:
+                        seconds = time.perf_counter() - start
+                        self.timings[name] = self.timings.get(name, 0) + seconds
+
+                        peak = None
+                        if self.track_memory:
+                                peak = tracemalloc.get_traced_memory()[1] - start_memory
+                                self.memory[name] = max(self.memory.get(name, 0), peak)
+                                if started_tracing:
+                                        tracemalloc.stop()
+
+                        for callback in self.callbacks:
+                                callback(name, seconds, peak)
+
+        # Total time of all phases
+        def total(self):
+                return sum(self.timings.values())
+
+        # One line description of the timings, used by the GUI terminal
+        def summary(self):
+                phases = ", ".join(f"{name} {seconds * 1e3:.2f}" for name, seconds in self.timings.items())
+                text = f"Solved in {self.total() * 1e3:.2f} ms ({phases} ms)"
+                if self.reused_factorization:
+                        text += " [factorization reused]"
+                if self.refinement_iterations is not None:
+                        text += f" [float32 factors, {self.refinement_iterations} refinement steps]"
+                if self.condition is not None:
+                        text += f" [condition ~{self.condition:.1e}]"
+                if self.second_order_iterations is not None:
+                        text += f" [P-Delta: {self.second_order_iterations} iterations, buckling factor {self.buckling_factor:.3g}]"
+                if self.fallback:
+                        text += f" [{self.fallback}]"
+                if self.warning:
+                        text += f" [warning: {self.warning}]"
+                if self.memory:
+                        text += f" peak {max(self.memory.values()) / 2**20:.1f} MiB"
+                return text
+
+# This class holds the LU factorization (with partial pivoting) of a banded matrix
+# The matrix is stored by rows: band[i, d + lower] = K[i, i + d], for d in [-lower, upper]
+class BandedLU():
+        # Pivots below this many epsilons of the largest entry of the matrix mean it is singular
+        # in practice: the solution would have no correct digits left
+        pivot_tolerance = 64
+        # Up to this many rows the matrix is solved as a dense one by LAPACK (gesv): factorizing it on
+        # every solve is still as fast as the banded loops (about 5 ms at 500 rows, see benchmark.py)
+        dense_max_rows = 500
+        # Above it the loops run on Python floats, this many rows at a time: numpy's overhead per call
+        # is larger than the arithmetic of one band row
+        list_rows = 4096
+
+        # Factorize the banded matrix once, so it can be reused for any number of load vectors
+        # dtype sets the precision of the factors (default: the precision of band)
+        def __init__(self, band, lower:int, upper:int, dtype = None):
+                N = band.shape[0]
+                self.size = N
+                self.lower = lower
+                # Row interchanges widen the upper band of U to lower + upper
+                self.upper = lower + upper
+                dtype = dtype or band.dtype
+                self.dtype = np.dtype(dtype)
+                # Set by condition_estimate
+                self.condition = None
+                # The factors are in memory, vectors are handled in one block
+                self.block_rows = max(N, 1)
+
+                # Small matrices are kept dense, LAPACK factorizes them on every solve
+                self.dense = None
+                if N <= self.dense_max_rows:
+                        self.dense = self.to_dense(band, lower).astype(dtype, copy=False)
+                        return
+
+                # Each working row i stores columns i - lower .. i + lower + upper
+                work = np.zeros((N, 2 * lower + upper + 1), dtype=dtype)
+                work[:, :lower + upper + 1] = band
+                self.multipliers = np.zeros((N, lower), dtype=dtype)
+                self.pivots = np.arange(N)
+                self.min_pivot = self.pivot_tolerance * np.finfo(dtype).eps * np.abs(band).max()
+
+                self._eliminate(work, 0, N, 0)
+
+                # Row i of U holds columns i .. i + lower + upper
+                self.U = work[:, lower:]
+
+        # Eliminates the columns first .. last - 1
+        # work holds the working rows offset .. offset + len(work) - 1 (at least up to last - 1 + lower)
+        def _eliminate(self, work, first:int, last:int, offset:int):
+                N = self.size
+                lower = self.lower
+                upper = self.upper
+                for start in range(first, last, self.list_rows):
+                        stop = min(start + self.list_rows, last)
+                        end = min(stop + lower, N)
+                        rows = work[start - offset:end - offset].tolist()
+                        multipliers = [[0.0] * lower for _ in range(stop - start)]
+                        pivots = list(range(start, stop))
+
+                        for k in range(start, stop):
+                                i = k - start
+                                # Rows below k that still have an entry in column k (row i + r holds it at lower - r)
+                                below = min(lower, N - 1 - k)
+                                r, largest = 0, abs(rows[i][lower])
+                                for s in range(1, below + 1):
+                                        if abs(rows[i + s][lower - s]) > largest:
+                                                r, largest = s, abs(rows[i + s][lower - s])
+
+                                # Swap rows so the largest entry of the column is the pivot
+                                if r:
+                                        pivots[i] = k + r
+                                        row, other = rows[i], rows[i + r]
+                                        row[lower:], other[lower - r:lower - r + upper + 1] = other[lower - r:lower - r + upper + 1], row[lower:]
+
+                                pivot = rows[i][lower]
+                                if abs(pivot) <= self.min_pivot:
+                                        raise np.linalg.LinAlgError(f"Singular matrix (pivot {pivot:.1e} at node {k})")
+
+                                # Eliminate column k from the rows below the pivot
+                                tail = rows[i][lower + 1:]
+                                for s in range(1, below + 1):
+                                        row = rows[i + s]
+                                        m = row[lower - s] / pivot
+                                        multipliers[i][s - 1] = m
+                                        row[lower - s + 1:lower - s + 1 + upper] = [a - m * b for a, b in zip(row[lower - s + 1:lower - s + 1 + upper], tail)]
+
+                        work[start - offset:end - offset] = rows
+                        self.multipliers[start:stop] = multipliers
+                        self.pivots[start:stop] = pivots
+
+        # Solves K x = b for a single load vector (N,) or many load vectors (N, m)
+        def solve(self, b):
+                if self.dense is not None:
+                        return np.linalg.solve(self.dense, np.asarray(b, dtype=self.dtype)).astype(np.result_type(b, self.dtype), copy=False)
+                N = self.size
+                x = np.array(b, dtype=np.result_type(b, self.U))
+                single = x.ndim == 1
+                if single:
+                        x = x[:, None]
+
+                self._forward(x, 0, N, 0)
+                self._backward(self.U, x, 0, N, 0)
+
+                return x[:, 0] if single else x
+
+        # Forward substitution with L and the row interchanges for the rows first .. last - 1
+        # x holds the rows offset .. offset + len(x) - 1 (at least up to last - 1 + lower)
+        def _forward(self, x, first:int, last:int, offset:int):
+                N = self.size
+                if x.shape[1] == 1:
+                        for start in range(first, last, self.list_rows):
+                                stop = min(start + self.list_rows, last)
+                                end = min(stop + self.lower, N)
+                                values = x[start - offset:end - offset, 0].tolist()
+                                multipliers = self.multipliers[start:stop].tolist()
+                                pivots = self.pivots[start:stop].tolist()
+                                for k in range(start, stop):
+                                        i = k - start
+                                        p = pivots[i] - start
+                                        if p != i:
+                                                values[i], values[p] = values[p], values[i]
+                                        for s in range(1, min(self.lower, N - 1 - k) + 1):
+                                                values[i + s] -= multipliers[i][s - 1] * values[i]
+                                x[start - offset:end - offset, 0] = values
+                        return
+
+                for k in range(first, last):
+                        i = k - offset
+                        p = self.pivots[k] - offset
+                        if p != i:
+                                x[[i, p]] = x[[p, i]]
+                        below = min(self.lower, N - 1 - k)
+                        if below:
+                                x[i + 1:i + 1 + below] -= self.multipliers[k, :below, None] * x[i]
+
+        # Solves K^T x = b for a single vector (N,), used by the condition estimate and the adjoint solves
+        def solve_transposed(self, b):
+                if self.dense is not None:
+                        return np.linalg.solve(self.dense.T, np.asarray(b, dtype=self.dtype)).astype(np.result_type(b, self.dtype), copy=False)
+                N = self.size
+                x = np.array(b, dtype=np.result_type(b, self.U))
+                self._forward_transposed(self.U, x, 0, N, 0)
+                self._backward_transposed(self.multipliers, self.pivots, x, 0, N, 0)
+                return x
+
+        # U^T is lower triangular: solves it by columns for the rows first .. last - 1, from the first row down
+        # U holds the rows offset .., x the rows offset .. (at least up to last - 1 + upper)
+        def _forward_transposed(self, U, x, first:int, last:int, offset:int):
+                N = self.size
+                for start in range(first, last, self.list_rows):
+                        stop = min(start + self.list_rows, last)
+                        end = min(stop + self.upper, N)
+                        values = x[start - offset:end - offset].tolist()
+                        rows = U[start - offset:stop - offset].tolist()
+                        for k in range(start, stop):
+                                i = k - start
+                                row = rows[i]
+                                values[i] /= row[0]
+                                for s in range(1, min(self.upper, N - 1 - k) + 1):
+                                        values[i + s] -= row[s] * values[i]
+                        x[start - offset:end - offset] = values
+
+        # L^T and the row interchanges for the rows last - 1 .. first, in the reverse order of _forward
+        # multipliers and pivots hold the rows offset .., x the rows offset .. (at least up to last - 1 + lower)
+        def _backward_transposed(self, multipliers, pivots, x, first:int, last:int, offset:int):
+                N = self.size
+                for stop in range(last, first, -self.list_rows):
+                        start = max(stop - self.list_rows, first)
+                        end = min(stop + self.lower, N)
+                        values = x[start - offset:end - offset].tolist()
+                        rows = multipliers[start - offset:stop - offset].tolist()
+                        swaps = pivots[start - offset:stop - offset].tolist()
+                        for k in range(stop - 1, start - 1, -1):
+                                i = k - start
+                                for s in range(1, min(self.lower, N - 1 - k) + 1):
+                                        values[i] -= rows[i][s - 1] * values[i + s]
+                                p = swaps[i] - start
+                                if p != i:
+                                        values[i], values[p] = values[p], values[i]
+                        x[start - offset:end - offset] = values
+
+        # Vector of the factors' size (memory-mapped for the out-of-core factors)
+        def empty(self, shape, dtype = np.float64):
+                return np.empty(shape, dtype=dtype)
+
+        # Estimate of the 1-norm condition number of the factorized matrix (band is the matrix itself)
+        # Hager's method: a few solves with K and K^T instead of forming the inverse
+        # the estimate only grows between iterations, so it stops once it reaches limit
+        # every vector is read block_rows rows at a time
+        def condition_estimate(self, band, limit:float = np.inf):
+                N = self.size
+                blocks = [(start, min(start + self.block_rows, N)) for start in range(0, N, self.block_rows)]
+                norm = self.norm(band, self.lower, self.block_rows)
+
+                x = self.empty((N,))
+                for start, stop in blocks:
+                        x[start:stop] = 1 / N
+                signs = self.empty((N,))
+                inverse_norm = 0.0
+                for _ in range(5):
+                        y = self.solve(x)
+                        inverse_norm = sum(float(np.abs(y[start:stop]).sum()) for start, stop in blocks)
+                        if norm * inverse_norm >= limit:
+                                break
+                        for start, stop in blocks:
+                                signs[start:stop] = np.where(y[start:stop] >= 0, 1.0, -1.0)
+                        z = self.solve_transposed(signs)
+                        j, largest, zx = 0, 0.0, 0.0
+                        for start, stop in blocks:
+                                block = np.abs(z[start:stop])
+                                k = int(np.argmax(block))
+                                if block[k] > largest:
+                                        j, largest = start + k, float(block[k])
+                                zx += float(z[start:stop] @ x[start:stop])
+                        if largest <= zx:
+                                break
+                        for start, stop in blocks:
+                                x[start:stop] = 0
+                        x[j] = 1
+
+                self.condition = float(norm * inverse_norm)
+                return self.condition
+
+        # 1-norm (largest column sum) of a banded matrix, read block_rows rows at a time
+        # column j gathers K[j - d, j] from the rows j - upper .. j + lower
+        @staticmethod
+        def norm(band, lower:int, block_rows:int = None):
+                N = band.shape[0]
+                block_rows = block_rows or max(N, 1)
+                norm = 0.0
+                for start in range(0, N, block_rows):
+                        stop = min(start + block_rows, N)
+                        sums = np.zeros(stop - start)
+                        for c in range(band.shape[1]):
+                                d = c - lower
+                                first, last = max(start - d, 0), min(stop - d, N)
+                                if first < last:
+                                        sums[first + d - start:last + d - start] += np.abs(band[first:last, c])
+                        norm = max(norm, float(sums.max()))
+                return norm
+
+        # Dense copy of a banded matrix (stored by rows, `lower` sub-diagonals)
+        @staticmethod
+        def to_dense(band, lower:int):
+                N = band.shape[0]
+                dense = np.zeros((N, N), dtype=band.dtype)
+                # K[i, i + d] is entry i (N + 1) + d of the flattened matrix, so each diagonal is one strided slice
+                flat = dense.reshape(-1)
+                for d in range(band.shape[1]):
+                        first, last = max(lower - d, 0), min(N + lower - d, N)
+                        if first < last:
+                                start = first * (N + 1) + d - lower
+                                flat[start:start + (last - first - 1) * (N + 1) + 1:N + 1] = band[first:last, d]
+                return dense
+
+        # Banded matrix (stored by rows, `lower` sub-diagonals) times a vector (N,) or vectors (N, m)
+        @staticmethod
+        def multiply(band, lower:int, x):
+                n = len(x)
+                padding = x.shape[1:]
+                padded = np.concatenate((np.zeros((lower,) + padding, dtype=x.dtype), x, np.zeros((band.shape[1],) + padding, dtype=x.dtype)))
+                out = np.zeros(x.shape, dtype=np.result_type(band, x))
+                for d in range(band.shape[1]):
+                        out += band[:, d].reshape((n,) + (1,) * len(padding)) * padded[d:d + n]
+                return out
+
+        # Back substitution with U for the rows last - 1 .. first
+        # U and x hold the rows offset .. (at least up to last - 1 + upper)
+        def _backward(self, U, x, first:int, last:int, offset:int):
+                N = self.size
+                if x.shape[1] == 1:
+                        for stop in range(last, first, -self.list_rows):
+                                start = max(stop - self.list_rows, first)
+                                end = min(stop + self.upper, N)
+                                values = x[start - offset:end - offset, 0].tolist()
+                                rows = U[start - offset:stop - offset].tolist()
+                                for k in range(stop - 1, start - 1, -1):
+                                        i = k - start
+                                        row = rows[i]
+                                        total = values[i]
+                                        for s in range(1, min(self.upper, N - 1 - k) + 1):
+                                                total -= row[s] * values[i + s]
+                                        values[i] = total / row[0]
+                                x[start - offset:stop - offset, 0] = values[:stop - start]
+                        return
+
+                for k in range(last - 1, first - 1, -1):
+                        i = k - offset
+                        w = min(self.upper, N - 1 - k)
+                        if w:
+                                x[i] -= U[i, 1:1 + w] @ x[i + 1:i + 1 + w]
+                        x[i] /= U[i, 0]
+
+# This class is a BandedLU whose factors and solutions live in temporary memory-mapped files
+# Only blocks of block_rows rows (plus the band overlap) are held in memory at a time,
+# so the memory used does not grow with the number of nodes
+class OutOfCoreBandedLU(BandedLU):
+        def __init__(self, band, lower:int, upper:int, block_rows:int, directory:str = None):
+                N = band.shape[0]
+                self.size = N
+                self.lower = lower
+                self.upper = lower + upper
+                self.dtype = band.dtype
+                self.condition = None
+                self.dense = None
+                self.directory = directory
+                # A block must reach past the rows it modifies
+                self.block_rows = max(block_rows, self.upper + 1)
+                B = self.block_rows
+
+                storage = self.empty((N, 2 * lower + upper + 1), band.dtype)
+                self.multipliers = self.empty((N, lower), band.dtype)
+                self.pivots = self.empty((N,), np.int64)
+                largest = 0
+                for start in range(0, N, B):
+                        stop = min(start + B, N)
+                        largest = max(largest, np.abs(band[start:stop]).max())
+                        storage[start:stop, :lower + upper + 1] = band[start:stop]
+                        storage[start:stop, lower + upper + 1:] = 0
+                        self.pivots[start:stop] = np.arange(start, stop)
+
+                self.min_pivot = self.pivot_tolerance * np.finfo(band.dtype).eps * largest
+
+                # Pivoting and elimination only reach `lower` rows below the current one
+                for start in range(0, N, B):
+                        stop = min(start + B, N)
+                        end = min(stop + lower, N)
+                        work = np.array(storage[start:end])
+                        self._eliminate(work, start, stop, start)
+                        storage[start:end] = work
+
+                self.U = storage[:, lower:]
+
+        # Temporary memory-mapped array, its file is deleted once the array is released
+        def empty(self, shape, dtype = np.float64):
+                return np.memmap(tempfile.TemporaryFile(dir=self.directory), dtype=dtype, mode="w+", shape=shape)
+
+        # Solves K x = b block by block, x is returned as a memory-mapped array
+        def solve(self, b):
+                N = self.size
+                B = self.block_rows
+                x = self.empty(b.shape, np.result_type(b, self.U))
+                for start in range(0, N, B):
+                        x[start:start + B] = b[start:start + B]
+                x2 = x[:, None] if x.ndim == 1 else x
+
+                for start in range(0, N, B):
+                        stop = min(start + B, N)
+                        end = min(stop + self.lower, N)
+                        block = np.array(x2[start:end])
+                        self._forward(block, start, stop, start)
+                        x2[start:end] = block
+
+                for stop in range(N, 0, -B):
+                        start = max(stop - B, 0)
+                        end = min(stop + self.upper, N)
+                        block = np.array(x2[start:end])
+                        self._backward(np.array(self.U[start:end]), block, start, stop, start)
+                        x2[start:stop] = block[:stop - start]
+
+                return x
+
+        # Solves K^T x = b block by block, x is returned as a memory-mapped array
+        def solve_transposed(self, b):
+                N = self.size
+                B = self.block_rows
+                x = self.empty(b.shape, np.result_type(b, self.U))
+                for start in range(0, N, B):
+                        x[start:start + B] = b[start:start + B]
+
+                for start in range(0, N, B):
+                        stop = min(start + B, N)
+                        end = min(stop + self.upper, N)
+                        block = np.array(x[start:end])
+                        self._forward_transposed(np.array(self.U[start:stop]), block, start, stop, start)
+                        x[start:end] = block
+
+                for stop in range(N, 0, -B):
+                        start = max(stop - B, 0)
+                        end = min(stop + self.lower, N)
+                        block = np.array(x[start:end])
+                        self._backward_transposed(np.array(self.multipliers[start:stop]), np.array(self.pivots[start:stop]), block, start, stop, start)
+                        x[start:end] = block
+
+                return x
+
+# This class stores beam elements (supports or loads) in a growable structured numpy array
+# Iterating it yields plain tuples, so it can be used like the lists it replaces
+class ElementArray():
+        def __init__(self, fields:list, as_tuple = None, capacity:int = 16):
+                self._data = np.zeros(capacity, dtype=fields)
+                self._size = 0
+                # Optional function that rearranges the fields of each iterated tuple
+                self._as_tuple = as_tuple
+                # Increased on every change, so unchanged elements can be shared between snapshots
+                self.version = 0
+
+        # View of the stored elements (no copy), e.g. supports.view["position"]
+        @property
+        def view(self):
+                return self._data[:self._size]
+
+        # Structured dtype of the stored elements
+        @property
+        def dtype(self):
+                return self._data.dtype
+
+        # Field name -> array view, integer index -> tuple of one element
+        def __getitem__(self, key):
+                if isinstance(key, str):
+                        return self.view[key]
+                return list(self)[key]
+
+        def __len__(self):
+                return self._size
+
+        def __iter__(self):
+                records = self.view.tolist()
+                if self._as_tuple is not None:
+                        return (self._as_tuple(*record) for record in records)
+                return iter(records)
+
+        # Grows the storage (doubling) so it can hold `size` elements
+        def _reserve(self, size:int):
+                if size > len(self._data):
+                        data = np.zeros(max(size, 2 * len(self._data)), dtype=self._data.dtype)
+                        data[:self._size] = self.view
+                        self._data = data
+
+        # Adds one element, given as a tuple of its fields in order
+        def append(self, record:tuple):
+                self._reserve(self._size + 1)
+                self._data[self._size] = record
+                self._size += 1
+                self.version += 1
+
+        # Adds many elements at once from a structured array or a sequence of tuples
+        def extend(self, records):
+                records = np.asarray(records, dtype=self._data.dtype)
+                self._reserve(self._size + len(records))
+                self._data[self._size:self._size + len(records)] = records
+                self._size += len(records)
+                self.version += 1
+
+        # Removes and returns the last element
+        def pop(self):
+                self._size -= 1
+                self.version += 1
+                record = self._data[self._size:self._size + 1].tolist()[0]
+                if self._as_tuple is not None:
+                        return self._as_tuple(*record)
+                return record
+
+        # Keeps only the elements where mask is true, returns the number removed
+        def keep(self, mask):
+                kept = self.view[mask]
+                removed = self._size - len(kept)
+                self._data[:len(kept)] = kept
+                self._size = len(kept)
+                if removed:
+                        self.version += 1
+                return removed
+
+        # Bytes of the stored elements, used to detect changes
+        def key(self):
+                return self.view.tobytes()
+
+        # Replaces all elements with the given records
+        def replace(self, records):
+                self._size = 0
+                self.extend(records)
+
+        # New array of the same fields holding the given records, this one is unchanged
+        def with_records(self, records):
+                elements = ElementArray(self._data.dtype, self._as_tuple)
+                elements.extend(records)
+                return elements
+
+# This class holds one state of the model for the undo/redo history
+# element arrays that did not change since the previous state are shared, not copied
+class ModelSnapshot():
+        __slots__ = ("length", "materials", "total_node_num", "order_of_efforts", "elements", "solution", "factorization", "settings")
+
+        element_names = ("supports", "point_loads", "loads", "sections", "foundations", "springs", "settlements", "thermal_loads")
+
+        def __init__(self, model, previous = None):
+                self.length = model.length
+                self.materials = dict(model.materials)
+                self.total_node_num = model.total_node_num
+                self.order_of_efforts = tuple(model.order_of_efforts)
+
+                # name -> (version of the element array, copy of its records)
+                self.elements = {}
+                for name in self.element_names:
+                        elements = getattr(model, name)
+                        if previous is not None and previous.elements[name][0] == elements.version:
+                                self.elements[name] = previous.elements[name]
+                        else:
+                                self.elements[name] = (elements.version, elements.view.copy())
+
+                # Results and factorization of this state, None until solved (or once evicted)
+                self.solution = None
+                self.factorization = None
+                # Solver settings the solution was computed with (see Model._solution_settings)
+                self.settings = None
+
+        # True if both snapshots describe the same beam
+        def same_inputs(self, other):
+                return (
+                        self.length == other.length
+                        and self.materials == other.materials
+                        and self.total_node_num == other.total_node_num
+                        and self.order_of_efforts == other.order_of_efforts
+                        and all(self.elements[name][0] == other.elements[name][0] for name in self.element_names)
+                )
 
 # This class holds the data for the beam simulation
 class Model():
+        # Number of sub- and super-diagonals of the conditioned stiffness matrix
+        band_lower = 2
+        band_upper = 3
+
         # Initialize the model with default values
         def __init__(self):
                 # Length of the beam
@@ -16,38 +621,128 @@ class Model():
                 # Where z is rotation 
                 self.nodes = []
 
-                # List to store point loads (magnitude, position, angle)
+                # Point loads (magnitude, position, angle)
                 # note that angle is in degrees
-                self.point_loads = []
-                # List to store distributed loads (position tuple, magnitude)
-                self.loads = []
+                self.point_loads = ElementArray([("magnitude", float), ("position", float), ("angle", float)])
+                # Distributed loads ((start, end), magnitude)
+                self.loads = ElementArray(
+                        [("start", float), ("end", float), ("magnitude", float)],
+                        as_tuple=lambda start, end, magnitude: ((start, end), magnitude)
+                )
                 # List to keep track of the order efforts were added
                 self.order_of_efforts = []
 
                 self.deflections = np.nan
-
-                # List to store supports (position, support_type)
-                self.supports = []
+                # Axial force per node (tension positive)
+                self.normals = np.nan
+                # if true, solve_FDM includes the effect of the axial forces on bending (P-Delta)
+                self.second_order = False
+                self.max_second_order_iterations = 30
+                # Load factor at which the current axial forces buckle the beam (inf if they cannot)
+                self.buckling_factor = np.inf
+
+                # Supports (position, support_type)
+                self.supports = ElementArray([("position", float), ("type", "U3")])
                 # Dictionary for material properties
                 self.materials = {
                         "E":2e11, # Young's Modulus in Pascals
                         "I":10e-6, # Moment of inertia in m^4
                 }
+                # Sections with their own flexural rigidity E*I in N*m^2 (start, end, EI at start, EI at end)
+                # EI varies linearly from start to end (tapered), equal ends make a stepped beam;
+                # the materials apply outside every section, and later sections override earlier ones
+                self.sections = ElementArray([("start", float), ("end", float), ("EI", float), ("end_EI", float)])
+
+                # Winkler foundations (start, end, modulus), the modulus is in N/m per m of beam
+                # overlapping foundations add up
+                self.foundations = ElementArray([("start", float), ("end", float), ("modulus", float)])
+                # Springs (position, stiffness in N/m, rotational stiffness in N*m/rad)
+                self.springs = ElementArray([("position", float), ("stiffness", float), ("rotational", float)])
+                # Prescribed displacements of the supports (position, deflection in m, rotation as a slope in rad)
+                # they act through the support on the same node, only in the directions it restrains
+                self.settlements = ElementArray([("position", float), ("deflection", float), ("rotation", float)])
+                # Thermal gradients through the depth (start, end, curvature in 1/m the free beam would take)
+                self.thermal_loads = ElementArray([("start", float), ("end", float), ("curvature", float)])
 
                 self.solved = False
 
+                # Cached factorization of the conditioned stiffness matrix
+                # it only depends on the nodes and supports, not on the loads
+                self._factorization = None
+                self._factorization_key = None
+                self._load_mask = None
+                self._influence_lines = None
+
+                # "double" factorizes K in float64, "mixed" in float32 and recovers float64 accuracy
+                # with iterative refinement (falls back to float64 if K is too ill-conditioned)
+                self.precision = "double"
+                self.max_refinement_iterations = 30
+                # Mixed precision is only tried up to this many nodes: refinement needs condition * eps(float32) < 1,
+                # and the condition number grows like N^4 (about 0.04 N^4 for a span fixed at both ends, more for
+                # other supports), so larger beams would only waste a float32 factorization and its condition estimate
+                self.mixed_precision_max_nodes = 100
+                # Nodes of the coarse model whose inverse estimates the condition number (see _estimate_condition)
+                self.condition_probe_nodes = 65
+                # Solves whose condition * eps(float64) reaches this are flagged in stats.warning: the discretization
+                # error falls like h^2 and the rounding error grows like condition * eps, and the closed-form cases of
+                # accuracy.py are most accurate around 1e-3 (961 nodes for a cantilever, about 3000 for a fixed span)
+                self.rounding_warning_loss = 1e-3
+
+                # if true, the band storage and the results are kept in temporary memory-mapped files
+                # and solved block by block (banded LU only)
+                self.out_of_core = False
+                # Memory for the blocks of an out-of-core solve, in bytes
+                self.memory_budget = 64 * 2**20
+                # Directory of the temporary files (None for the system default)
+                self.out_of_core_dir = None
+
+                # (min, max) envelopes of the last moving load analysis
+                self.envelopes = {}
+                # Largest number of values of the influence lines (nodes x loaded nodes), 256 MiB
+                self.max_influence_size = 2**25
+                # Largest nodes x train positions of a moving load analysis; the positions are summed
+                # in blocks of about moving_load_block_size values, so this bounds the time, not the memory
+                self.max_moving_load_size = 10**9
+                self.moving_load_block_size = 2**21
+
+                # Value and derivatives of the result of the last sensitivity analysis (see solve_sensitivities)
+                self.sensitivities = {}
+
+                # Section found by the last design search (see size_inertia and select_section)
+                self.design = {}
+
+                # Percentiles and peaks of the last Monte Carlo analysis (see solve_monte_carlo)
+                self.uncertainty = {}
+
+                # Natural frequencies (Hz) and mode shapes (N, k) of the last modal analysis
+                self.mode_frequencies = None
+                self.mode_shapes = None
+                self.mode_iterations = 0
+
+                # Instrumentation of the last solve
+                self.stats = SolveStats()
+                # if true, tracks peak memory of each solve phase with tracemalloc
+                self.track_memory = False
+                # Functions called as callback(phase, seconds, peak_bytes) after each solve phase
+                self.solve_callbacks = []
+
+                # Undo/redo history of model states, history[history_index] is the current one
+                self.history = []
+                self.history_index = -1
+                # Maximum number of states kept in the history
+                self.max_history = 200
+                # Maximum number of states that keep their solution, older ones are evicted
+                self.max_cached_solutions = 10
+                self._cached_solutions = []
+                self._record_state()
+
         # Method to find the maximum force applied to the beam
         def get_max_force(self):
-                max_force = 0
-                # Check point loads
-                for magnitude, _, _ in self.point_loads:
-                        if abs(magnitude) > max_force:
-                                max_force = abs(magnitude)
-                # Check distributed loads
-                for _, magnitude in self.loads:
-                        if abs(magnitude) > max_force:
-                                max_force = abs(magnitude)
-                return max_force
+                # Check point loads and distributed loads
+                magnitudes = np.concatenate((self.point_loads["magnitude"], self.loads["magnitude"]))
+                if not len(magnitudes):
+                        return 0
+                return float(np.abs(magnitudes).max())
         
         # Method to set a new length for the beam
         def set_properties(self, new_length:float, new_E:float, new_I:float):
@@ -57,6 +752,7 @@ class Model():
                 # Check if existing supports are still valid with the new length
                 self._check_valid_elements()
                 self.solved = False
+                self._record_state()
                 return True
         
         # Method to remove the most recently added support
@@ -64,19 +760,10 @@ class Model():
                 if self.supports: # Check if the list is not empty
                         self.supports.pop()
                         self.solved = False
+                        self._record_state()
                         return True
                 return False
         
-        def _restart_order_of_efforts(self):
-                self.order_of_efforts = []
-                self.solved = False
-
-                for _ in self.loads:
-                        self.order_of_efforts.append("load")
-                
-                for _ in self.point_loads:
-                        self.order_of_efforts.append("point")
-
         # Method to remove the most recently added effort (load or point force)
         def remove_last_effort(self):
                 if self.order_of_efforts:
@@ -92,35 +779,74 @@ class Model():
                                 self.point_loads.pop()
                         case "load":
                                 self.loads.pop()
+                self._record_state()
                 return True
 
-        # Method to validate supports, removing any outside the beam's length
+        # Method to validate elements, removing any outside the beam's length
         def _check_valid_elements(self):
-                for i, (pos, _) in enumerate(self.supports):
-                        if not 0 <= pos <= self.length:
-                                # Removes supports when length (L) is changed
-                                self.supports.pop(i)
-                
-                for i, ((pos1, pos2), _) in enumerate(self.loads):
-                        if not 0 <= pos1 <= self.length or not 0 <= pos2 <= self.length:
-                                self.loads.pop(i)
-                
-                for i, (_, pos, _) in enumerate(self.point_loads):
-                        if not 0 <= pos <= self.length:
-                                self.point_loads.pop(i)
-                
-                self._restart_order_of_efforts()
+                # Removes supports when length (L) is changed
+                pos = self.supports["position"]
+                self.supports.keep((0 <= pos) & (pos <= self.length))
+
+                start, end = self.loads["start"], self.loads["end"]
+                loads_mask = (0 <= start) & (start <= self.length) & (0 <= end) & (end <= self.length)
+                self.loads.keep(loads_mask)
+
+                pos = self.point_loads["position"]
+                point_loads_mask = (0 <= pos) & (pos <= self.length)
+                self.point_loads.keep(point_loads_mask)
+
+                start, end = self.sections["start"], self.sections["end"]
+                self.sections.keep((0 <= start) & (end <= self.length))
+
+                start, end = self.foundations["start"], self.foundations["end"]
+                self.foundations.keep((0 <= start) & (end <= self.length))
+
+                pos = self.springs["position"]
+                self.springs.keep((0 <= pos) & (pos <= self.length))
+
+                pos = self.settlements["position"]
+                self.settlements.keep((0 <= pos) & (pos <= self.length))
+
+                start, end = self.thermal_loads["start"], self.thermal_loads["end"]
+                self.thermal_loads.keep((0 <= start) & (end <= self.length))
+
+                # Drop the removed efforts from the order they were added, keeping the rest in order
+                order = np.array(self.order_of_efforts, dtype="U5")
+                keep = np.ones(len(order), dtype=bool)
+                keep[order == "load"] = loads_mask
+                keep[order == "point"] = point_loads_mask
+                self.order_of_efforts = order[keep].tolist()
+                self.solved = False
                                 
+        # Method to register a function called after each phase of a solve
+        def add_solve_callback(self, callback):
+                self.solve_callbacks.append(callback)
+                return True
+
         # Method to set the total number of nodes for calculations
         def set_total_node_num(self, new_node_num:int):
                 self.total_node_num = new_node_num
                 self.solved = False
+                self._record_state()
                 return True
 
         # Method to add a new support to the beam
         def add_support(self, position:float, support_type:str):
                 self.supports.append((position, support_type))
                 self.solved = False
+                self._record_state()
+                return True
+
+        # Method to add many supports in one step
+        # support_types may be one type for all positions or one type per position
+        def add_supports(self, positions, support_types):
+                records = np.empty(len(positions), dtype=self.supports.dtype)
+                records["position"] = positions
+                records["type"] = support_types
+                self.supports.extend(records)
+                self.solved = False
+                self._record_state()
                 return True
 
         # Method to add a concentrated (point) load
@@ -134,6 +860,7 @@ class Model():
                         self.point_loads.append((magnitude, position, angle))
                         self.order_of_efforts.append("point")
                         self.solved = False
+                        self._record_state()
                         return True
                 return False
         
@@ -142,54 +869,1781 @@ class Model():
 
                 pos0, pos1 = pos_limits
 
-                self.loads.append(((pos0, pos1), magnitude))
+                self.loads.append((pos0, pos1, magnitude))
                 self.order_of_efforts.append("load")
                 self.solved = False
+                self._record_state()
+                return True
+
+        # Method to give part of the beam its own section
+        # E in Pa and I in m^4 at the start, end_I (if given) at the end for a tapered section
+        def add_section(self, pos_limits:tuple, E:float, I:float, end_I:float = None):
+                pos0, pos1 = pos_limits
+                if end_I is None:
+                        end_I = I
+                if not (0 <= pos0 < pos1 <= self.length) or E <= 0 or I <= 0 or end_I <= 0:
+                        return False
+
+                self.sections.append((pos0, pos1, E * I, E * end_I))
+                self.solved = False
+                self._record_state()
+                return True
+
+        # Method to set EI from samples along the beam (positions in increasing order, EI in N*m^2)
+        # replaces every section, EI is interpolated linearly between samples
+        def set_stiffness_profile(self, positions, EI):
+                positions = np.asarray(positions, dtype=float)
+                EI = np.asarray(EI, dtype=float)
+                if len(positions) < 2 or len(positions) != len(EI):
+                        return False
+                if np.any(np.diff(positions) <= 0) or positions[0] < 0 or positions[-1] > self.length or not np.all(EI > 0):
+                        return False
+
+                records = np.empty(len(positions) - 1, dtype=self.sections.dtype)
+                records["start"] = positions[:-1]
+                records["end"] = positions[1:]
+                records["EI"] = EI[:-1]
+                records["end_EI"] = EI[1:]
+                self.sections.replace(records)
+                self.solved = False
+                self._record_state()
+                return True
+
+        # Method to remove the most recently added section
+        def remove_last_section(self):
+                if self.sections:
+                        self.sections.pop()
+                        self.solved = False
+                        self._record_state()
+                        return True
+                return False
+
+        # Method to rest part of the beam on an elastic (Winkler) foundation, modulus in N/m per m of beam
+        def add_foundation(self, pos_limits:tuple, modulus:float):
+                pos0, pos1 = pos_limits
+                if not (0 <= pos0 <= pos1 <= self.length) or not modulus > 0:
+                        return False
+
+                self.foundations.append((pos0, pos1, modulus))
+                self.solved = False
+                self._record_state()
+                return True
+
+        # Method to remove the most recently added foundation
+        def remove_last_foundation(self):
+                if self.foundations:
+                        self.foundations.pop()
+                        self.solved = False
+                        self._record_state()
+                        return True
+                return False
+
+        # Method to add a spring support, stiffness in N/m and rotational stiffness in N*m/rad
+        def add_spring(self, position:float, stiffness:float, rotational:float = 0.0):
+                return self.add_springs([position], [stiffness], [rotational])
+
+        # Method to add many springs in one step
+        # stiffnesses may be one value for all positions or one per position (same for rotational)
+        # all springs are rejected if any of them is invalid
+        def add_springs(self, positions, stiffnesses, rotational = 0.0):
+                records = np.empty(len(positions), dtype=self.springs.dtype)
+                records["position"] = positions
+                records["stiffness"] = stiffnesses
+                records["rotational"] = rotational
+
+                valid = (records["stiffness"] >= 0) & (records["rotational"] >= 0)
+                valid &= (records["stiffness"] > 0) | (records["rotational"] > 0)
+                valid &= (0 <= records["position"]) & (records["position"] <= self.length)
+                if not valid.all():
+                        return False
+
+                self.springs.extend(records)
+                self.solved = False
+                self._record_state()
+                return True
+
+        # Method to remove the most recently added spring
+        def remove_last_spring(self):
+                if self.springs:
+                        self.springs.pop()
+                        self.solved = False
+                        self._record_state()
+                        return True
+                return False
+
+        # Method to prescribe the settlement (m, positive up) and rotation (rad, slope dv/dx) of the support at position
+        def add_settlement(self, position:float, deflection:float = 0.0, rotation:float = 0.0):
+                if not 0 <= position <= self.length or not (np.isfinite(deflection) and np.isfinite(rotation)):
+                        return False
+
+                self.settlements.append((position, deflection, rotation))
+                self.solved = False
+                self._record_state()
+                return True
+
+        # Method to remove the most recently added settlement
+        def remove_last_settlement(self):
+                if self.settlements:
+                        self.settlements.pop()
+                        self.solved = False
+                        self._record_state()
+                        return True
+                return False
+
+        # Method to add a thermal gradient between pos_limits
+        # delta_T is the bottom minus the top temperature (K), depth the section depth (m)
+        # and alpha the thermal expansion coefficient (1/K, steel by default)
+        def add_thermal_load(self, pos_limits:tuple, delta_T:float, depth:float, alpha:float = 1.2e-5):
+                pos0, pos1 = pos_limits
+                if not (0 <= pos0 <= pos1 <= self.length) or depth <= 0 or not np.isfinite(delta_T):
+                        return False
+
+                self.thermal_loads.append((pos0, pos1, alpha * delta_T / depth))
+                self.solved = False
+                self._record_state()
+                return True
+
+        # Method to remove the most recently added thermal load
+        def remove_last_thermal_load(self):
+                if self.thermal_loads:
+                        self.thermal_loads.pop()
+                        self.solved = False
+                        self._record_state()
+                        return True
+                return False
+
+        # Method to add many point loads in one step
+        # all loads are rejected if any of them is invalid
+        def add_point_loads(self, magnitudes, positions, angles = 90):
+                records = np.empty(len(positions), dtype=self.point_loads.dtype)
+                records["magnitude"] = magnitudes
+                records["position"] = positions
+                records["angle"] = angles
+
+                valid = np.isfinite(records["magnitude"])
+                valid &= (0 <= records["angle"]) & (records["angle"] <= 180)
+                valid &= (0 <= records["position"]) & (records["position"] <= self.length)
+                if not valid.all():
+                        return False
+
+                self.point_loads.extend(records)
+                self.order_of_efforts.extend(["point"] * len(records))
+                self.solved = False
+                self._record_state()
+                return True
+
+        # Method to add many distributed loads in one step
+        # all loads are rejected if any of them is invalid
+        def add_distributed_loads(self, starts, ends, magnitudes):
+                records = np.empty(len(starts), dtype=self.loads.dtype)
+                records["start"] = starts
+                records["end"] = ends
+                records["magnitude"] = magnitudes
+
+                valid = np.isfinite(records["magnitude"])
+                for pos in (records["start"], records["end"]):
+                        valid &= (0 <= pos) & (pos <= self.length)
+                if not valid.all():
+                        return False
+
+                self.loads.extend(records)
+                self.order_of_efforts.extend(["load"] * len(records))
+                self.solved = False
+                self._record_state()
                 return True
 
         def solve_FDM(self):
                 if not self.solved:
+                        self.stats = stats = SolveStats(self.track_memory, self.solve_callbacks)
                         try:
                                 # 1. Initialization
                                 N = self.total_node_num
                                 h = self.length / (N - 1)  # Step size
-                                E = self.materials["E"]
-                                I = self.materials["I"]
-
-                                # 2. Assemble the stiffness matrix and force vector
-                                K = self._build_stiffness_matrix(N)
-                                F = self._build_load_vector(N, h)
-
-                                # 3. Add boundaries
-                                K, F = self._apply_boundary_conditions(K, F, N, h)
-                                F_scaled = F * (h**4 / (E * I))
-                                v = np.linalg.solve(K, F_scaled) # v is the deflection vector
 
-                                # 4. Calculate and store results
-                                self.node_positions = np.linspace(0, self.length, N)
-                                self.deflections = v
-                                self.slopes = np.gradient(v, h)
-
-                                # Moment M = E*I*v''
-                                self.moments = E * I * np.gradient(self.slopes[2:-3], h)
-
-                                # Shear V = E*I*v'''
-                                self.shears = np.gradient(self.moments, h)
-                                self.shears[0] = self.shears[1]
-                                self.shears[-1] = self.shears[-2]
+                                # Reject mechanisms before assembling anything
+                                stats.error = self.check_stability()
+                                if stats.error:
+                                        return False
 
-                                # Normal force (simplified calculation)
-                                # self.normals = self._calculate_normal_force(N, h)
-                                # to do
+                                if self.out_of_core:
+                                        self._solve_out_of_core(N, h, stats)
+                                else:
+                                        # 2. Assemble the force vector
+                                        with stats.phase("load assembly"):
+                                                F = self._build_load_vector(N, h)
+
+                                        # 3. Add boundaries and factorize (reused while supports are unchanged)
+                                        lu, load_mask = self._factorize_stiffness(N, h, stats)
+                                        with stats.phase("solve"):
+                                                F_scaled = self._scale_loads(F, load_mask, N, h)
+                                                v = self._solve_factorized(lu, F_scaled, stats) # v is the deflection vector
+
+                                        # Second order (P-Delta): the axial forces change the bending stiffness
+                                        if self.second_order:
+                                                v = self._solve_second_order(lu, F_scaled, v, N, h, stats)
+                                                if v is None:
+                                                        return False
+
+                                        # 4. Calculate and store results
+                                        with stats.phase("post-processing"):
+                                                self.node_positions = np.linspace(0, self.length, N)
+                                                self.deflections = v
+                                                self.slopes, self.moments, self.shears = self._post_process(v, h)
+
+                                # Normal force, from the horizontal part of the point loads
+                                with stats.phase("axial"):
+                                        self.normals = self._normal_forces(N, h)
 
                                 self.solved = True
+                                self._store_solution()
                                 return True
                         except np.linalg.LinAlgError as e:
-                                print(f"Beam may be unstable: {e}")
+                                stats.error = f"Beam is unstable or too finely discretized: {e}"
                                 return False
                         except Exception as e:
-                                print(e)
+                                stats.error = f"{type(e).__name__}: {e}"
+                                return False
+
+        # Method to check that the supports can hold the beam, without assembling anything
+        # the rigid motions of the beam are v(x) = a + b x (and a horizontal slide):
+        # a "y" support (or spring) at node x fixes a + b x, a "z" support (or rotational spring) fixes b,
+        # a foundation fixes both at its ends, so the beam is stable when these constraints have rank 2
+        # returns a description of the mechanism, or None if the beam is stable
+        # (axial loads are only checked if check_loads, modal analysis has no loads)
+        def check_stability(self, check_loads:bool = True):
+                if not (len(self.supports) or len(self.springs) or len(self.foundations)):
+                        return "Beam has no supports"
+
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                types = self.supports["type"]
+                has_x = np.char.find(types, "x") >= 0
+                has_y = np.char.find(types, "y") >= 0
+                has_z = np.char.find(types, "z") >= 0
+                springs = self.springs.view
+                foundations = self.foundations.view
+
+                # Supports act on the node closest to them
+                restrained = np.concatenate((
+                        self.supports["position"][has_y],
+                        springs["position"][springs["stiffness"] > 0],
+                        foundations["start"],
+                        foundations["end"],
+                ))
+                x = self._get_nodes_by_pos(restrained, h) * h / self.length
+                rotations = int(has_z.sum() + (springs["rotational"] > 0).sum())
+
+                constraints = np.concatenate((
+                        np.stack((np.ones(len(x)), x), axis=1),
+                        np.tile([0.0, 1.0], (rotations, 1)),
+                ))
+                rank = np.linalg.matrix_rank(constraints) if len(constraints) else 0
+                if rank < 2:
+                        if not len(x):
+                                return "Beam is a mechanism: no support restrains the deflection (add a 'y' support or a spring)"
+                        return f"Beam is a mechanism: it can rotate about the node at {x[0] * self.length:g} m (add a second 'y' support or a 'z' restraint)"
+
+                # Inclined point loads push the beam along its axis
+                horizontal = self.point_loads["magnitude"] * np.cos(self.point_loads["angle"] * np.pi / 180)
+                if check_loads and not has_x.any() and np.any(np.abs(horizontal) > 1e-9 * max(self.get_max_force(), 1)):
+                        return "Beam is a mechanism: inclined loads push it along its axis and no support restrains 'x'"
+
+                return None
+
+        # entries after the current one (undone edits) are discarded
+        def _record_state(self):
+                previous = self.history[self.history_index] if self.history else None
+                snapshot = ModelSnapshot(self, previous)
+                if previous is not None and snapshot.same_inputs(previous):
+                        return
+
+                for discarded in self.history[self.history_index + 1:]:
+                        if discarded in self._cached_solutions:
+                                self._cached_solutions.remove(discarded)
+                del self.history[self.history_index + 1:]
+
+                self.history.append(snapshot)
+                if len(self.history) > self.max_history:
+                        dropped = self.history.pop(0)
+                        if dropped in self._cached_solutions:
+                                self._cached_solutions.remove(dropped)
+                self.history_index = len(self.history) - 1
+
+        # Method to keep the results of the last solve in the current history entry
+        # only the most recently used solutions are kept, to bound memory
+        def _store_solution(self):
+                snapshot = self.history[self.history_index]
+                snapshot.solution = {name: getattr(self, name) for name in self.result_names}
+                snapshot.factorization = (self._factorization, self._factorization_key, self._load_mask)
+                snapshot.settings = self._solution_settings()
+                self._touch_solution(snapshot)
+
+        # Solver settings that change the results of a solve, a cached solution is only restored with the same ones
+        solution_settings = ("precision", "max_refinement_iterations", "mixed_precision_max_nodes", "second_order", "max_second_order_iterations", "out_of_core")
+
+        def _solution_settings(self):
+                return (self.total_node_num,) + tuple(getattr(self, name) for name in self.solution_settings)
+
+        # Moves a snapshot to the most recently used end of the cache, evicting the oldest
+        def _touch_solution(self, snapshot):
+                if snapshot in self._cached_solutions:
+                        self._cached_solutions.remove(snapshot)
+                self._cached_solutions.append(snapshot)
+                while len(self._cached_solutions) > self.max_cached_solutions:
+                        evicted = self._cached_solutions.pop(0)
+                        evicted.solution = None
+                        evicted.factorization = None
+
+        # Method to go back to the previous state
+        def undo(self):
+                if self.history_index <= 0:
+                        return False
+                self.history_index -= 1
+                self._restore_state(self.history[self.history_index])
+                return True
+
+        # Method to go forward to the state that was undone last
+        def redo(self):
+                if self.history_index >= len(self.history) - 1:
+                        return False
+                self.history_index += 1
+                self._restore_state(self.history[self.history_index])
+                return True
+
+        # Method to restore a history entry, with its solution if it is still cached
+        def _restore_state(self, snapshot):
+                self.length = snapshot.length
+                self.materials = dict(snapshot.materials)
+                self.total_node_num = snapshot.total_node_num
+                self.order_of_efforts = list(snapshot.order_of_efforts)
+
+                for name in ModelSnapshot.element_names:
+                        elements = getattr(self, name)
+                        elements.replace(snapshot.elements[name][1])
+                        # The restored elements match the snapshot, so the next one can share them
+                        snapshot.elements[name] = (elements.version, snapshot.elements[name][1])
+
+                # A solution computed with other settings (e.g. before P-Delta was switched) is not restored
+                self.solved = snapshot.solution is not None and snapshot.settings == self._solution_settings()
+                if self.solved:
+                        for name, result in snapshot.solution.items():
+                                setattr(self, name, result)
+                        self._factorization, self._factorization_key, self._load_mask = snapshot.factorization
+                        self._influence_lines = None
+                        self._touch_solution(snapshot)
+
+        # Method to get slopes, moments and shears from deflections
+        # v may hold one deflection vector (N,) or one per column (N, m)
+        # thermal is false for deflections that are not caused by the model loads (see _moments)
+        def _post_process(self, v, h, thermal:bool = True):
+                slopes = np.gradient(v, h, axis=0)
+
+                # Moment M = E*I*v''
+                moments = self._moments(v, slopes, h, thermal=thermal)
+
+                # Shear V = E*I*v'''
+                shears = np.gradient(moments, h, axis=0)
+                shears[0] = shears[1]
+                shears[-1] = shears[-2]
+
+                return slopes, moments, shears
+
+        # Method to get the moments of nodes 2 .. n - 4 from the deflections of nodes first .. first + n - 1
+        # inside, the moments of the compact second difference (the ones the equations balance,
+        # so they hold across steps of EI) are averaged over three nodes,
+        # for a prismatic beam this is the same as differentiating the slopes
+        # thermal gradients take their thermal moments off (unless thermal is false, for load effects alone)
+        def _moments(self, v, slopes, h, first:int = 0, thermal:bool = True):
+                n = len(v)
+                shape = (-1,) + (1,) * (v.ndim - 1)
+                EI = self._flexural_rigidity(first + n, h, first + 2, first + n - 3).reshape(shape)
+                M_thermal = 0
+                if thermal and len(self.thermal_loads):
+                        M_thermal = self._thermal_moments(first + n, h, first + 2, first + n - 3).reshape(shape)
+
+                moments = EI * np.gradient(slopes[2:-3], h, axis=0) - M_thermal
+                compact = EI * (v[1:-4] - 2 * v[2:-3] + v[3:-2]) / h**2 - M_thermal
+                moments[1:-1] = (compact[:-2] + 2 * compact[1:-1] + compact[2:]) / 4
+                return moments
+
+        # Method to solve the axial problem -EA u'' = p, returns w = EA u (None if there is no axial load)
+        # p is the horizontal part of the point loads and "x" supports fix u; EA is uniform,
+        # so the normal force N = w' does not depend on it (tridiagonal, N = 0 past the free ends)
+        def _solve_axial(self, N, h):
+                point_loads = self.point_loads.view
+                Fx = point_loads["magnitude"] * np.cos(point_loads["angle"] * np.pi / 180)
+                has_x = np.char.find(self.supports["type"], "x") >= 0
+                if not has_x.any() or np.all(np.abs(Fx) <= 1e-9 * max(self.get_max_force(), 1)):
+                        return None
+
+                if self.out_of_core:
+                        band = self._empty_out_of_core((N, 3))
+                        rhs = self._empty_out_of_core((N,))
+                else:
+                        band = np.zeros((N, 3))
+                        rhs = np.zeros(N)
+                band[:] = [-1, 2, -1]
+                band[0] = [0, 1, -1]
+                band[-1] = [-1, 1, 0]
+                fixed = self._get_nodes_by_pos(self.supports["position"][has_x], h)
+                band[fixed] = [0, 1, 0]
+                np.add.at(rhs, self._get_nodes_by_pos(point_loads["position"], h), Fx / h * h**2)
+                rhs[fixed] = 0
+
+                if self.out_of_core:
+                        return OutOfCoreBandedLU(band, 1, 1, self._out_of_core_block_rows(), self.out_of_core_dir).solve(rhs)
+                return BandedLU(band, 1, 1).solve(rhs)
+
+        # Normal force per node (tension positive)
+        def _normal_forces(self, N, h):
+                w = self._solve_axial(N, h)
+                if self.out_of_core:
+                        # New memory-mapped arrays are zero
+                        normals = self._empty_out_of_core((N,))
+                        if w is not None:
+                                self._gradient_blocks(w, h, normals, self._out_of_core_block_rows())
+                        return normals
+                if w is None:
+                        return np.zeros(N)
+                return np.gradient(w, h)
+
+        # Method to assemble the geometric stiffness G of the axial forces, scaled like K,
+        # so that the second order equations are (K - G) v = F
+        # (N v')' at node i is (N(i+1/2) (v(i+1) - v(i)) - N(i-1/2) (v(i) - v(i-1))) / h^2,
+        # rows replaced by supports get no term (None if there is no axial force)
+        def _geometric_stiffness(self, N, h, load_mask):
+                w = self._solve_axial(N, h)
+                if w is None:
+                        return None
+
+                # Axial force between nodes i and i + 1
+                half = np.diff(w) / h
+                G = np.zeros((N, self.band_lower + self.band_upper + 1))
+                G[1:, self.band_lower - 1] = half
+                G[:-1, self.band_lower + 1] = half
+                G[1:, self.band_lower] -= half
+                G[:-1, self.band_lower] -= half
+                # At the end nodes the ghost nodes of the free or sliding end mirror the inner ones,
+                # which doubles the term (with zero shear EI v''' = N v' at a free end)
+                G[[0, -1]] *= 2
+                G *= (h**2 / self._flexural_rigidity(N, h) * (load_mask > 0))[:, None]
+                return G
+
+        # Method to solve the second order (P-Delta) equations (K - G) v = F
+        # iterates v = K^-1 (F + G v) with the cached factorization of K; the iterations slow down
+        # as the axial forces approach buckling, then K - G is factorized instead
+        # also estimates the buckling factor (smallest lambda with K - lambda G singular)
+        # returns None if the axial forces exceed the buckling load
+        def _solve_second_order(self, lu, F_scaled, v, N, h, stats:SolveStats):
+                with stats.phase("second order"):
+                        G = self._geometric_stiffness(N, h, self._load_mask)
+                        stats.second_order_iterations = 0
+                        self.buckling_factor = np.inf
+                        if G is None:
+                                stats.buckling_factor = self.buckling_factor
+                                return v
+
+                        mu = self._dominant_eigenvalue(lu, G)
+                        self.buckling_factor = stats.buckling_factor = 1 / mu if mu > 0 else np.inf
+                        if self.buckling_factor <= 1:
+                                stats.error = f"Axial forces exceed the buckling load (buckling factor {self.buckling_factor:.3g})"
+                                return None
+
+                        # Each iteration reduces the error by about |mu|
+                        if abs(mu) <= 0.5:
+                                for iteration in range(1, self.max_second_order_iterations + 1):
+                                        v_next = self._solve_factorized(lu, F_scaled + BandedLU.multiply(G, self.band_lower, v))
+                                        change = np.abs(v_next - v).max() / max(np.abs(v_next).max(), 1e-300)
+                                        v = v_next
+                                        stats.second_order_iterations = iteration
+                                        if change <= 1e-10:
+                                                return v
+
+                        # Close to buckling (or large tension): factorize the second order matrix itself
+                        K, _ = self._apply_boundary_conditions(self._build_stiffness_matrix(N), np.ones(N), N, h)
+                        return BandedLU(K - G, self.band_lower, self.band_upper).solve(F_scaled)
+
+        # Eigenvalue mu of K^-1 G with the largest magnitude, by power iteration
+        # the buckling factor is 1 / mu when mu > 0 (compression), tension gives mu < 0
+        def _dominant_eigenvalue(self, lu, G, tol:float = 1e-8, max_iterations:int = 200):
+                x = np.random.default_rng(0).standard_normal(lu.size)
+                mu = 0.0
+                for _ in range(max_iterations):
+                        y = lu.solve(BandedLU.multiply(G, self.band_lower, x))
+                        previous, mu = mu, (x @ y) / (x @ x)
+                        x = y / np.abs(y).max()
+                        if abs(mu - previous) <= tol * abs(mu):
+                                break
+                return mu
+
+        # Method to factorize the conditioned stiffness matrix
+        # the last factorization is reused while the nodes and supports are unchanged
+        def _factorize_stiffness(self, N, h, stats:SolveStats = None):
+                if stats is None:
+                        stats = SolveStats()
+
+                mixed = self.precision == "mixed" and N <= self.mixed_precision_max_nodes
+                if self.precision == "mixed" and not mixed:
+                        stats.fallback = f"float32 factors are only tried up to {self.mixed_precision_max_nodes} nodes, factorized in float64"
+
+                key = (N, self.length, self.supports.key(), self._stiffness_key(), self.out_of_core, mixed)
+                if self._factorization is None or self._factorization_key != key:
+                        with stats.phase("stiffness assembly"):
+                                if self.out_of_core:
+                                        K = self._empty_out_of_core((N, self.band_lower + self.band_upper + 1))
+                                        K = self._build_stiffness_matrix(N, K, self._out_of_core_block_rows())
+                                else:
+                                        K = self._build_stiffness_matrix(N)
+                        # Boundary conditions only zero entries of F,
+                        # so applying them to a vector of ones gives the load mask
+                        with stats.phase("boundary conditions"):
+                                if self.out_of_core:
+                                        ones = self._empty_out_of_core((N,))
+                                        ones[:] = 1
+                                else:
+                                        ones = np.ones(N)
+                                K, load_mask = self._apply_boundary_conditions(K, ones, N, h)
+
+                        with stats.phase("factorization"):
+                                if self.out_of_core:
+                                        self._factorization = OutOfCoreBandedLU(K, self.band_lower, self.band_upper, self._out_of_core_block_rows(), self.out_of_core_dir)
+                                elif mixed:
+                                        self._factorization = self._factorize_mixed(K, N, h, stats)
+                                else:
+                                        self._factorization = BandedLU(K, self.band_lower, self.band_upper)
+                        # The estimate is cached with the factors, so only a new factorization pays for it
+                        with stats.phase("condition estimate"):
+                                if self._factorization.condition is None:
+                                        self._factorization.condition = self._estimate_condition(K, N, self._factorization)
+                        self._factorization_key = key
+                        self._load_mask = load_mask
+                        self._influence_lines = None
+                else:
+                        stats.reused_factorization = True
+                stats.condition = self._factorization.condition
+
+                # Rounding errors are amplified by up to the condition number: past 1 / eps no digit is left
+                loss = stats.condition * np.finfo(np.float64).eps
+                if loss >= 1:
+                        # The condition number of a beam grows like N^4, half the nodes of loss = 1 leave a margin
+                        nodes = int(N / 2 / loss**0.25)
+                        raise np.linalg.LinAlgError(f"the deflections would have no correct digits (condition number ~{stats.condition:.1e}), use fewer than about {nodes} nodes")
+                if loss >= self.rounding_warning_loss:
+                        nodes = int(N * (self.rounding_warning_loss / loss)**0.25)
+                        stats.warning = f"rounding errors likely exceed the discretization error (condition number ~{stats.condition:.1e}), about {nodes} nodes would be as accurate"
+
+                return self._factorization, self._load_mask
+
+        # Factorizes K in float32 for mixed precision solves
+        # refinement converges when condition * eps(float32) < 1, otherwise K is factorized in float64
+        def _factorize_mixed(self, K, N, h, stats:SolveStats):
+                try:
+                        lu = BandedLU(K, self.band_lower, self.band_upper, np.float32)
+                        lu.condition = self._estimate_condition(K, N, lu)
+                        if lu.condition * np.finfo(np.float32).eps < 0.5:
+                                return lu
+                        stats.fallback = "too ill-conditioned for float32, factorized in float64"
+                except np.linalg.LinAlgError:
+                        stats.fallback = "singular in float32, factorized in float64"
+
+                return BandedLU(K, self.band_lower, self.band_upper)
+
+        # Estimate of the 1-norm condition number of the conditioned K (band form), without solving with it
+        # K^-1 tends to the Green's function of the beam divided by h^4, so the inverse of a coarse model of
+        # the same beam (condition_probe_nodes nodes) times (h_coarse / h)^4 estimates it, within about 5 %
+        # the coarse model is refined until it keeps the restraints on distinct nodes (merged supports could
+        # make it a mechanism); beams up to its size are inverted directly, and past 4 x condition_probe_nodes
+        # the factors lu are estimated by Hager's method instead
+        def _estimate_condition(self, K, N, lu:BandedLU):
+                restraints = np.concatenate((self.supports["position"], self.springs["position"], self.foundations["start"], self.foundations["end"]))
+                distinct = lambda n: len(np.unique(self._get_nodes_by_pos(restraints, self.length / (n - 1))))
+                n = min(N, self.condition_probe_nodes)
+                while n < N and distinct(n) < distinct(N):
+                        n = min(2 * n - 1, N)
+                if n > 4 * self.condition_probe_nodes:
+                        return lu.condition_estimate(K)
+
+                try:
+                        if n == N:
+                                coarse = np.asarray(K)
+                        else:
+                                coarse, _ = self._apply_boundary_conditions(self._build_stiffness_matrix(n), np.ones(n), n, self.length / (n - 1))
+                        inverse = np.linalg.inv(BandedLU.to_dense(coarse, self.band_lower))
+                except np.linalg.LinAlgError:
+                        return lu.condition_estimate(K)
+                inverse_norm = float(np.abs(inverse).sum(axis=0).max()) * ((N - 1) / (n - 1))**4
+                return BandedLU.norm(K, self.band_lower, lu.block_rows) * inverse_norm
+
+        # Solves with the cached factors, float32 factors (mixed precision) always go through refinement
+        # F_scaled holds one load vector (N,) or one per column (N, m)
+        def _solve_factorized(self, lu:BandedLU, F_scaled, stats:SolveStats = None):
+                if lu.dtype == np.float32:
+                        return self._solve_refined(lu, F_scaled, stats or SolveStats())
+                return lu.solve(F_scaled)
+
+        # Solves with float32 factors and corrects the solution with float64 residuals
+        # stops once the residual of every column is at the float64 rounding level of K v (the LAPACK dsgesv criterion)
+        # if it does not get there, the system is solved again with float64 factors
+        def _solve_refined(self, lu:BandedLU, F_scaled, stats:SolveStats):
+                N = len(F_scaled)
+                h = self.length / (N - 1)
+                # Assembling K again is cheap next to the solves, and always matches the cached factors
+                K, _ = self._apply_boundary_conditions(self._build_stiffness_matrix(N), np.ones(N), N, h)
+                limit = np.linalg.norm(K) * np.finfo(np.float64).eps * np.sqrt(N)
+
+                v = lu.solve(F_scaled.astype(np.float32)).astype(np.float64)
+                stats.refinement_iterations = 0
+                for _ in range(self.max_refinement_iterations):
+                        r = F_scaled - BandedLU.multiply(K, self.band_lower, v)
+                        scale = np.abs(r).max(axis=0)
+                        if np.all(scale <= limit * np.abs(v).max(axis=0)):
+                                return v
+                        # Scaled by column so that small residuals do not underflow in float32
+                        scale = np.where(scale > 0, scale, 1.0)
+                        v += lu.solve((r / scale).astype(np.float32)).astype(np.float64) * scale
+                        stats.refinement_iterations += 1
+
+                stats.fallback = "refinement did not converge, solved in float64"
+                condition = lu.condition
+                self._factorization = BandedLU(K, self.band_lower, self.band_upper)
+                self._factorization.condition = condition
+                return self._factorization.solve(F_scaled)
+
+        # Method to scale the load vector like the equations (h^4 / EI) and add the settlements of the supports
+        def _scale_loads(self, F, load_mask, N, h):
+                F_scaled = F * load_mask * (h**4 / self._flexural_rigidity(N, h))
+                rows, values = self._prescribed_rhs(N, h)
+                F_scaled[rows] += values
+                return F_scaled
+
+        # Method to solve with the band, load vector and results in memory-mapped files
+        # every array of N values is filled block by block, so memory stays within memory_budget
+        def _solve_out_of_core(self, N, h, stats:SolveStats):
+                B = self._out_of_core_block_rows()
+
+                lu, load_mask = self._factorize_stiffness(N, h, stats)
+                with stats.phase("load assembly"):
+                        F_scaled = self._empty_out_of_core((N,))
+                        for start in range(0, N, B):
+                                stop = min(start + B, N)
+                                F_scaled[start:stop] = self._build_load_vector(N, h, start, stop) * load_mask[start:stop] * (h**4 / self._flexural_rigidity(N, h, start, stop))
+                        rows, values = self._prescribed_rhs(N, h)
+                        F_scaled[rows] += values
+
+                with stats.phase("solve"):
+                        v = lu.solve(F_scaled)
+
+                with stats.phase("post-processing"):
+                        self.node_positions = self._empty_out_of_core((N,))
+                        for start in range(0, N, B):
+                                self.node_positions[start:start + B] = np.arange(start, min(start + B, N)) * h
+                        self.node_positions[-1] = self.length
+                        self.deflections = v
+
+                        self.slopes = self._empty_out_of_core((N,))
+                        self._gradient_blocks(v, h, self.slopes, B)
+                        self.moments = self._empty_out_of_core((N - 5,))
+                        for start in range(0, N - 5, B):
+                                stop = min(start + B, N - 5)
+                                # One moment of overlap keeps the averages at the block edges
+                                first, last = max(start - 1, 0), min(stop + 6, N)
+                                window = np.array(v[first:last])
+                                moments = self._moments(window, np.gradient(window, h), h, first)
+                                self.moments[start:stop] = moments[start - first:stop - first]
+                        self.shears = self._empty_out_of_core((N - 5,))
+                        self._gradient_blocks(self.moments, h, self.shears, B)
+                        self.shears[0] = self.shears[1]
+                        self.shears[-1] = self.shears[-2]
+
+        # Same as np.gradient(values, h) * scale, computed block by block into out
+        def _gradient_blocks(self, values, h, out, block_rows:int, scale:float = 1.0):
+                n = len(values)
+                for start in range(0, n, block_rows):
+                        stop = min(start + block_rows, n)
+                        # One node of overlap keeps the central differences at the block edges
+                        first = max(start - 1, 0)
+                        last = min(stop + 1, n)
+                        gradient = np.gradient(np.array(values[first:last]), h)
+                        out[start:stop] = scale * gradient[start - first:stop - first]
+
+        # Rows per block of an out-of-core solve, from the memory budget
+        # each row holds the working band, the multipliers, the pivot and a few vector entries
+        def _out_of_core_block_rows(self):
+                row_bytes = 8 * (3 * self.band_lower + self.band_upper + 1 + 1 + 4)
+                return max(self.memory_budget // row_bytes, 64)
+
+        def _empty_out_of_core(self, shape):
+                return np.memmap(tempfile.TemporaryFile(dir=self.out_of_core_dir), dtype=np.float64, mode="w+", shape=shape)
+
+        # Elements that only change the right-hand side, the parts of a load case (see solve_load_cases)
+        load_case_names = ("point_loads", "loads", "settlements", "thermal_loads")
+
+        # Method to solve several load cases on the beam, each a dict mapping some of load_case_names
+        # to records (structured arrays or tuples) that replace the model's own; the rest of the beam is shared
+        # in memory and first order the cases are the columns of one multi-vector solve with the cached
+        # factorization (refined together with mixed precision), otherwise (P-Delta, out-of-core)
+        # they are solved one by one on a trial model
+        # returns per case a dict of the result_names arrays and the reactions, or {"error": message};
+        # the model keeps its own loads (unchanged, so the history and its snapshots are untouched) and its solution
+        def solve_load_cases(self, cases):
+                results = [None] * len(cases)
+                if self.second_order or self.out_of_core:
+                        trial = self._trial_model(ModelSnapshot(self), {name: getattr(self, name) for name in self.design_settings})
+                        for k, case in enumerate(cases):
+                                with trial._load_case(case):
+                                        trial.solved = False
+                                        if trial.solve_FDM():
+                                                results[k] = {name: np.array(getattr(trial, name)) for name in self.result_names}
+                                                results[k]["reactions"] = trial.get_reactions()
+                                        else:
+                                                results[k] = {"error": trial.stats.error}
+                        self.stats = trial.stats
+                        return results
+
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                was_solved = self.solved
+                self.stats = stats = SolveStats(self.track_memory, self.solve_callbacks)
+                try:
+                        # Mechanisms are rejected case by case, before anything is assembled
+                        stable = []
+                        for k, case in enumerate(cases):
+                                with self._load_case(case):
+                                        error = self.check_stability()
+                                if error:
+                                        results[k] = {"error": error}
+                                else:
+                                        stable.append(k)
+                        if not stable:
+                                return results
+
+                        lu, load_mask = self._factorize_stiffness(N, h, stats)
+                        F = np.empty((N, len(stable)))
+                        with stats.phase("load assembly"):
+                                for column, k in enumerate(stable):
+                                        with self._load_case(cases[k]):
+                                                F[:, column] = self._scale_loads(self._build_load_vector(N, h), load_mask, N, h)
+
+                        with stats.phase("solve"):
+                                V = self._solve_factorized(lu, F, stats)
+
+                        with stats.phase("post-processing"):
+                                node_positions = np.linspace(0, self.length, N)
+                                for column, k in enumerate(stable):
+                                        with self._load_case(cases[k]):
+                                                v = V[:, column]
+                                                slopes, moments, shears = self._post_process(v, h)
+                                                results[k] = {
+                                                        "node_positions": node_positions,
+                                                        "deflections": v,
+                                                        "slopes": slopes,
+                                                        "moments": moments,
+                                                        "shears": shears,
+                                                        "normals": self._normal_forces(N, h),
+                                                        "reactions": self._reactions(v, N, h),
+                                                }
+                except np.linalg.LinAlgError as e:
+                        stats.error = f"Beam is unstable or too finely discretized: {e}"
+                        results = [result if result is not None else {"error": stats.error} for result in results]
+                finally:
+                        self.solved = was_solved
+                return results
+
+        # Context manager that gives the model the loads of a case (see load_case_names), the ones it does not
+        # name stay its own; the model's element arrays are set aside, not changed, and put back on exit
+        @contextmanager
+        def _load_case(self, case):
+                own = {name: getattr(self, name) for name in self.load_case_names}
+                try:
+                        for name in self.load_case_names:
+                                if name in case:
+                                        setattr(self, name, own[name].with_records(case[name]))
+                        yield
+                finally:
+                        for name, elements in own.items():
+                                setattr(self, name, elements)
+
+        # Method to get the deflection influence lines of the beam
+        # column j holds the deflections caused by a unit point load at node nodes[j] (by default every node)
+        # only the loaded nodes are solved for; returns None (with stats.error) if the N x len(nodes)
+        # result would exceed max_influence_size
+        def get_influence_lines(self, nodes = None):
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                every_node = nodes is None
+                nodes = np.arange(N) if every_node else np.asarray(nodes, dtype=int)
+                if N * len(nodes) > self.max_influence_size:
+                        self.stats = SolveStats()
+                        self.stats.error = f"Influence lines of {len(nodes)} nodes over {N} nodes exceed max_influence_size ({self.max_influence_size} values), ask for fewer nodes"
+                        return None
+
+                lu, load_mask = self._factorize_stiffness(N, h)
+                EI = self.materials["E"] * self.materials["I"]
+                if every_node and self._influence_lines is not None:
+                        return self._influence_lines.T / EI
+
+                # A unit point load is a distributed load of 1 / tributary length on its node
+                # every column comes from the same factorization
+                # (equations are scaled by the EI of their node, relative to the materials)
+                F = np.zeros((N, len(nodes)))
+                F[nodes, np.arange(len(nodes))] = (load_mask * h**4 * EI / self._flexural_rigidity(N, h))[nodes] / self._tributary(nodes, N, h)
+                G = self._solve_factorized(lu, F)
+                if every_node:
+                        # Cached by rows, so the line of one node is contiguous (see solve_moving_load)
+                        self._influence_lines = np.ascontiguousarray(G.T)
+
+                return G / EI
+
+        # Method to get the deflections caused by a unit settlement (1 m) of each support that restrains
+        # the deflection, column s belongs to the s-th of them in the order they were added
+        # settlements only change the right-hand side, so all columns are solved with the cached factorization
+        def get_settlement_influence_lines(self):
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                lu, load_mask = self._factorize_stiffness(N, h)
+
+                restraining = np.flatnonzero(np.char.find(self.supports["type"], "y") >= 0) if len(self.supports) else []
+                B = np.zeros((N, len(restraining)))
+                rotations = np.zeros(len(self.supports))
+                for column, support in enumerate(restraining):
+                        deflections = np.zeros(len(self.supports))
+                        deflections[support] = 1
+                        rows, values = self._prescribed_rhs(N, h, deflections, rotations)
+                        B[rows, column] = values
+                return self._solve_factorized(lu, B)
+
+        # Method to get the reaction (N, upward positive) of every support from the last solve
+        # a reaction is what the equation of its node lacks for equilibrium, over the length of the node
+        # (h, h / 2 at the ends), so the reactions balance the loads exactly; supports that leave
+        # the deflection free (or share a node with a support added later) get 0
+        def get_reactions(self):
+                if not self.solved and not self.solve_FDM():
+                        return None
+
+                N = self.total_node_num
+                return self._reactions(np.asarray(self.deflections), N, self.length / (N - 1))
+
+        # Method to get the reactions of the supports for the deflections v of the current loads (see get_reactions)
+        def _reactions(self, v, N, h):
+                reactions = np.zeros(len(self.supports))
+                if not len(self.supports):
+                        return reactions
+
+                rows, stencils, writers = self._support_row_writes(N, h)
+                y = stencils == 0
+                reactions[writers[y]] = self._node_reactions(v, self._node_moments(v, N, h), rows[y], N, h)
+                return reactions
+
+        # Method to get the compact moments EI (v'' - curvature) of every node, the moments the equations balance
+        # an end is moment free unless a support restrains its rotation, then its moment comes
+        # from the ghost node of the support's stencil (w_-1 = w_1 - 2 h rotation on the left)
+        def _node_moments(self, v, N, h):
+                EI = self._flexural_rigidity(N, h)
+                thermal = self.thermal_loads.view
+                curvature = self._sum_over_ranges(thermal["start"], thermal["end"], thermal["curvature"], h, 0, N)
+
+                M = np.zeros(N)
+                M[1:-1] = EI[1:-1] * ((v[:-2] - 2 * v[1:-1] + v[2:]) / h**2 - curvature[1:-1])
+                for end, inner, rotation in zip((0, N - 1), (1, N - 2), self._end_rotations(N, h)):
+                        if rotation is not None:
+                                side = 1 if end == 0 else -1
+                                M[end] = EI[end] * (2 * (v[inner] - v[end] - side * h * rotation) / h**2 - curvature[end])
+                return M
+
+        # Method to get the prescribed rotation of the (left, right) ends, None for an end free to rotate
+        def _end_rotations(self, N, h):
+                if not len(self.supports):
+                        return None, None
+                rows, stencils, writers = self._support_row_writes(N, h)
+                rotations = self._support_settlements(N, h)[1]
+
+                ends = []
+                for closures in (((0, 1), (1, 3)), ((N - 1, 2), (N - 2, 4))):
+                        # "z" stencil on the end node or "yz" stencil next to it
+                        restrained = np.zeros(len(rows), dtype=bool)
+                        for row, stencil in closures:
+                                restrained |= (rows == row) & (stencils == stencil)
+                        ends.append(rotations[writers[restrained][0]] if restrained.any() else None)
+                return ends
+
+        # Method to get the distributed force (N/m) of the foundations and springs on every node
+        def _elastic_forces(self, v, N, h):
+                foundations = self.foundations.view
+                forces = self._sum_over_ranges(foundations["start"], foundations["end"], foundations["modulus"], h, 0, N) * v
+
+                rows, cols, values = self._spring_entries(N, h)
+                forces += np.bincount(rows, weights=values / self._tributary(rows, N, h) * v[cols], minlength=N)
+                return forces
+
+        # Method to get the reactions of the nodes j from the deflections v and the node moments M
+        # (moments are mirrored past the ends, like the ghost nodes of a free end)
+        def _node_reactions(self, v, M, j, N, h):
+                mirrored = np.concatenate(([M[1]], M, [M[-2]]))
+                bending = (mirrored[j] - 2 * mirrored[j + 1] + mirrored[j + 2]) / h**2
+                loads = self._build_load_vector(N, h, thermal=False)
+                return self._tributary(j, N, h) * (bending + self._elastic_forces(v, N, h)[j] - loads[j])
+
+        # Method to get the derivatives of one result with respect to the design parameters, by the adjoint method:
+        # one solve with the transpose of the conditioned K gives the weight of every equation on the result,
+        # then each derivative is a sum over the few nodes its parameter touches, so the whole gradient
+        # costs about one more solve whatever the number of parameters (no re-solve per parameter)
+        # quantity is "max_deflection" (largest |v|), "deflection" or "moment" at position,
+        # or "reaction" of the support at position; self.sensitivities gets the value and its derivatives
+        # with respect to
+        #       E, I: the materials (they set EI outside the sections)
+        #       EI: the flexural rigidity of each node
+        #       sections: a factor on the EI of each section (d/dI of a uniform section is this over its I)
+        #       supports: the position of each support (nan for supports that restrain the rotation)
+        #       point_loads, loads: the magnitude of each point and distributed load
+        # for first order, in-memory solves (the second order and out-of-core solves are not differentiated)
+        def solve_sensitivities(self, quantity:str, position:float = None):
+                if quantity not in ("max_deflection", "deflection", "moment", "reaction"):
+                        return False
+                if quantity != "max_deflection" and (position is None or not 0 <= position <= self.length):
+                        return False
+                if not self.solved and not self.solve_FDM():
+                        return False
+                if self.second_order or self.out_of_core:
+                        self.stats.error = "Sensitivities need a first order solve in memory"
+                        return False
+
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                v = self.deflections
+                EI = self._flexural_rigidity(N, h)
+                M = self._node_moments(v, N, h)
+                if len(self.supports):
+                        rows, stencils, writers = self._support_row_writes(N, h)
+                else:
+                        rows, stencils, writers = (np.zeros(0, dtype=int),) * 3
+
+                # The result is a . v plus the moment weights on M (and the loads of its node for a reaction)
+                a = np.zeros(N)
+                weights = np.zeros(N)
+                load_weights = np.zeros(N)
+                if quantity == "max_deflection":
+                        m = int(np.argmax(np.abs(v)))
+                        a[m] = np.sign(v[m])
+                        value = abs(v[m])
+                elif quantity == "deflection":
+                        m = self._get_node_by_pos(position, h)
+                        a[m] = 1
+                        value = v[m]
+                elif quantity == "moment":
+                        # The moment diagram averages the compact moments of three nodes
+                        m = min(max(self._get_node_by_pos(position, h), 1), N - 2)
+                        weights[m - 1:m + 2] = [0.25, 0.5, 0.25]
+                        value = weights @ M
+                else:
+                        m = self._get_node_by_pos(position, h)
+                        support = np.flatnonzero((rows == m) & (stencils == 0))
+                        if not len(support):
+                                self.stats.error = f"No support restrains the deflection at {position} m"
+                                return False
+                        tributary = h / 2 if m in (0, N - 1) else h
+                        if m in (0, N - 1):
+                                inner = 1 if m == 0 else N - 2
+                                weights[[m, inner]] = np.array([-2, 2]) * tributary / h**2
+                        else:
+                                weights[m - 1:m + 2] = np.array([1, -2, 1]) * tributary / h**2
+                        load_weights[m] = -tributary
+
+                        # Foundations and springs on the node take part of the load
+                        foundations = self.foundations.view
+                        a[m] += tributary * self._sum_over_ranges(foundations["start"], foundations["end"], foundations["modulus"], h, m, m + 1)[0]
+                        spring_rows, cols, values = self._spring_entries(N, h)
+                        on_node = spring_rows == m
+                        np.add.at(a, cols[on_node], values[on_node])
+                        value = self._node_reactions(v, M, np.array([m]), N, h)[0]
+
+                # Derivative of the moments with respect to the deflections (an end free to rotate has M = 0)
+                t = weights * EI / h**2
+                for end, rotation in zip((0, -1), self._end_rotations(N, h)):
+                        if rotation is None:
+                                t[end] = 0
+                a[:-2] += t[1:-1]
+                a[1:-1] -= 2 * t[1:-1]
+                a[2:] += t[1:-1]
+                a[[0, 1]] += np.array([-2, 2]) * t[0]
+                a[[-1, -2]] += np.array([-2, 2]) * t[-1]
+                gradient = weights * M / EI
+
+                # Adjoint solve, the conditioned equations use the same factorization as the solve
+                lu, load_mask = self._factorize_stiffness(N, h)
+                if lu.dtype != np.float64:
+                        K, _ = self._apply_boundary_conditions(self._build_stiffness_matrix(N), np.ones(N), N, h)
+                        lu = BandedLU(K, self.band_lower, self.band_upper)
+                weight = lu.solve_transposed(a)
+
+                # mu: weight of the physical equations (loads in N/m), none on the rows fixing a deflection
+                mu = weight * h**4 / EI
+                mu[rows[stencils == 0]] = 0
+
+                # Rigidity: equations of the free rows balance the moments, sum_k W_ik M_k / h^2
+                # with W = [1, -2, 1] (twice the inner moment on the end rows, whose own moment is 0)
+                free = mu.copy()
+                free[rows] = 0
+                free[[0, -1]] *= 2
+                gradient[1:-1] -= (free[:-2] - 2 * free[1:-1] + free[2:]) * M[1:-1] / (EI[1:-1] * h**2)
+
+                # rows closed by a "z" or "yz" stencil keep their own EI and their thermal load
+                closed = rows[stencils > 0]
+                if len(closed):
+                        thermal = self.thermal_loads.view
+                        curvature = self._sum_over_ranges(thermal["start"], thermal["end"], thermal["curvature"], h, 0, N)
+                        F = self._build_load_vector(N, h)
+                        gradient[closed] -= mu[closed] * F[closed] / EI[closed]
+                        left = np.where(closed == 0, 1, closed - 1)
+                        right = np.where(closed == N - 1, N - 2, closed + 1)
+                        np.add.at(gradient, left, mu[closed] * curvature[left] / h**2)
+                        np.add.at(gradient, right, mu[closed] * curvature[right] / h**2)
+                        gradient[closed] -= 2 * mu[closed] * curvature[closed] / h**2
+
+                owners = self._section_owners(N, h)
+                materials = owners < 0
+                sections = np.bincount(owners[~materials], weights=(gradient * EI)[~materials], minlength=len(self.sections))
+
+                # Loads: a point load P is P / tributary length on its node, a distributed load covers its range of nodes
+                load_weights += mu
+                point_loads = self.point_loads.view
+                point_nodes = self._get_nodes_by_pos(point_loads["position"], h)
+                point_gradient = load_weights[point_nodes] * np.sin(point_loads["angle"] * np.pi / 180) / self._tributary(point_nodes, N, h)
+                loads = self.loads.view
+                cumulative = np.concatenate(([0], np.cumsum(load_weights)))
+                j_start = self._get_nodes_by_pos(loads["start"], h)
+                j_end = self._get_nodes_by_pos(loads["end"], h)
+                load_gradient = cumulative[j_end + 1] - cumulative[j_start]
+
+                # Supports: moving a support by dx settles it by -v' dx and moves its reaction R by dx,
+                # so dJ/dx = R mu' / h - (dJ/d settlement) v'
+                support_gradient = np.full(len(self.supports), np.nan)
+                if len(self.supports):
+                        kinds = np.char.replace(self.supports["type"], "x", "")
+                        support_gradient[kinds == ""] = 0
+                        y = (stencils == 0) & (kinds[writers] == "y")
+                        reactions = self._node_reactions(v, M, rows[y], N, h)
+                        adjoint_slope = np.gradient(mu / h, h)
+                        support_gradient[writers[y]] = reactions * adjoint_slope[rows[y]] - weight[rows[y]] * self.slopes[rows[y]]
+
+                I = self.materials["I"]
+                E = self.materials["E"]
+                self.sensitivities = {
+                        "quantity": quantity,
+                        "position": m * h,
+                        "value": float(value),
+                        "E": float(I * gradient[materials].sum()),
+                        "I": float(E * gradient[materials].sum()),
+                        "EI": gradient,
+                        "sections": sections,
+                        "supports": support_gradient,
+                        "point_loads": point_gradient,
+                        "loads": load_gradient,
+                }
+                return True
+
+        # Fields of a catalog of sections for select_section (I in m^4, W the elastic section modulus in m^3, mass in kg/m)
+        section_catalog_fields = [("name", "U32"), ("I", float), ("W", float), ("mass", float)]
+        # Solver settings copied to the trial models of a design search
+        design_settings = (
+                "precision", "max_refinement_iterations", "mixed_precision_max_nodes", "second_order",
+                "max_second_order_iterations", "out_of_core", "memory_budget", "out_of_core_dir",
+        )
+        # Trial model of a design worker process (see _start_design_worker)
+        _design_worker = None
+
+        # Method to find the smallest I (m^4) of the beam that meets a deflection limit (m) and a stress limit (Pa),
+        # stresses are M (depth / 2) / I; E and the sections keep their values and the model is not changed
+        # every round evaluates a geometric grid of I inside the bracket of the previous one
+        # self.design gets I with the deflection and stress it gives
+        def size_inertia(self, deflection_limit:float, stress_limit:float, depth:float, workers:int = None, tol:float = 1e-4):
+                if deflection_limit <= 0 or stress_limit <= 0 or depth <= 0:
+                        return False
+
+                start = time.perf_counter()
+                try:
+                        with self._design_responses(workers) as (responses, batch):
+                                evaluated = 0
+                                def check(inertias):
+                                        nonlocal evaluated
+                                        evaluated += len(inertias)
+                                        deflections, moments = responses(inertias)
+                                        stresses = moments * depth / 2 / inertias
+                                        return (deflections <= deflection_limit) & (stresses <= stress_limit), deflections, stresses
+
+                                # Linear responses are cheap, solves are spread over the workers
+                                points = 64 if batch is None else max(batch, 4)
+                                I = self.materials["I"]
+                                lo, hi = I * 1e-4, I * 1e4
+                                for _ in range(4):
+                                        grid = np.geomspace(lo, hi, points)
+                                        feasible = check(grid)[0]
+                                        if feasible.any() and not feasible[0]:
+                                                break
+                                        lo, hi = (lo * 1e-8, lo) if feasible[0] else (hi, hi * 1e8)
+                                else:
+                                        self.stats = SolveStats()
+                                        self.stats.error = "No I meets the limits" if not feasible.any() else "Any I meets the limits"
+                                        return False
+
+                                first = int(np.argmax(feasible))
+                                lo, hi = grid[first - 1], grid[first]
+                                while hi / lo - 1 > tol:
+                                        grid = np.geomspace(lo, hi, points + 2)[1:-1]
+                                        feasible = check(grid)[0]
+                                        if feasible.any():
+                                                first = int(np.argmax(feasible))
+                                                lo, hi = (grid[first - 1] if first else lo), grid[first]
+                                        else:
+                                                lo = grid[-1]
+
+                                _, deflections, stresses = check(np.array([hi]))
+                except ValueError as e:
+                        self.stats = SolveStats()
+                        self.stats.error = str(e)
+                        return False
+
+                self.design = {
+                        "I": float(hi),
+                        "deflection": float(deflections[0]),
+                        "stress": float(stresses[0]),
+                        "evaluated": evaluated,
+                        "time": time.perf_counter() - start,
+                }
+                return True
+
+        # Method to pick the lightest section of a catalog (see section_catalog_fields) for the whole beam
+        # that meets a deflection limit (m) and a stress limit (Pa); E and the sections keep their values
+        # sections are tried from the lightest, one batch per round, until one meets the limits
+        # self.design gets the section with the deflection and stress it gives
+        def select_section(self, catalog, deflection_limit:float, stress_limit:float, workers:int = None):
+                catalog = np.asarray(catalog)
+                if not len(catalog) or deflection_limit <= 0 or stress_limit <= 0:
+                        return False
+                if np.any(catalog["I"] <= 0) or np.any(catalog["W"] <= 0):
+                        return False
+
+                start = time.perf_counter()
+                order = np.argsort(catalog["mass"], kind="stable")
+                try:
+                        with self._design_responses(workers) as (responses, batch):
+                                batch = batch or len(order)
+                                for first in range(0, len(order), batch):
+                                        candidates = order[first:first + batch]
+                                        deflections, moments = responses(catalog["I"][candidates])
+                                        stresses = moments / catalog["W"][candidates]
+                                        feasible = (deflections <= deflection_limit) & (stresses <= stress_limit)
+                                        if feasible.any():
+                                                best = int(np.argmax(feasible))
+                                                break
+                                else:
+                                        self.stats = SolveStats()
+                                        self.stats.error = "No section of the catalog meets the limits"
+                                        return False
+                except ValueError as e:
+                        self.stats = SolveStats()
+                        self.stats.error = str(e)
+                        return False
+
+                section = catalog[candidates[best]]
+                self.design = {
+                        "index": int(candidates[best]),
+                        "name": str(section["name"]),
+                        "I": float(section["I"]),
+                        "W": float(section["W"]),
+                        "mass": float(section["mass"]),
+                        "deflection": float(deflections[best]),
+                        "stress": float(stresses[best]),
+                        "evaluated": first + len(candidates),
+                        "time": time.perf_counter() - start,
+                }
+                return True
+
+        # Context giving (responses, batch): responses(inertias) returns the max |deflection| and max |moment|
+        # of the beam with each I, batch is how many I are worth evaluating at once (None for any number)
+        # without sections, foundations, springs or P-Delta the results are linear in 1/I: two solves
+        # (the second reuses the factorization) give v = A I1 / I + B and M = P + Q I / I1 for every I,
+        # B and Q coming from settlements and thermal loads; otherwise each I is a full solve of a trial model
+        # with its own factorization, on a pool of worker processes
+        @contextmanager
+        def _design_responses(self, workers:int = None):
+                workers = workers or os.cpu_count() or 1
+                snapshot = ModelSnapshot(self)
+                settings = {name: getattr(self, name) for name in self.design_settings}
+
+                if len(self.sections) or len(self.foundations) or len(self.springs) or self.second_order:
+                        if workers == 1:
+                                trial = self._trial_model(snapshot, settings)
+                                yield (lambda inertias: self._solve_design_candidates(inertias, trial)), 4
+                                return
+                        with ProcessPoolExecutor(workers, initializer=Model._start_design_worker, initargs=(snapshot, settings)) as pool:
+                                def responses(inertias):
+                                        chunks = np.array_split(np.asarray(inertias, dtype=float), workers)
+                                        results = list(pool.map(Model._solve_design_candidates, chunks))
+                                        return tuple(np.concatenate(values) for values in zip(*results))
+                                yield responses, 2 * workers
+                        return
+
+                trial = self._trial_model(snapshot, settings)
+                I1 = trial.materials["I"]
+                solutions = []
+                for I in (I1, 2 * I1):
+                        trial.materials["I"] = I
+                        trial.solved = False
+                        if not trial.solve_FDM():
+                                raise ValueError(trial.stats.error)
+                        solutions.append((np.array(trial.deflections), np.array(trial.moments)))
+                (v1, M1), (v2, M2) = solutions
+
+                # Loads alone: the deflections scale with 1/I and the moments do not change
+                if not (len(self.settlements) or len(self.thermal_loads)):
+                        max_deflection, max_moment = np.abs(v1).max(), np.abs(M1).max()
+                        yield (lambda inertias: (max_deflection * I1 / np.asarray(inertias, dtype=float), np.full(len(inertias), max_moment))), None
+                        return
+
+                A, B = 2 * (v1 - v2), 2 * v2 - v1
+                P, Q = 2 * M1 - M2, M2 - M1
+                def chunk_responses(r):
+                        return np.abs(A[:, None] / r + B[:, None]).max(axis=0), np.abs(P[:, None] + Q[:, None] * r).max(axis=0)
+
+                with ThreadPoolExecutor(workers) as pool:
+                        def responses(inertias):
+                                r = np.asarray(inertias, dtype=float) / I1
+                                # About 32 MiB for each temporary (N, chunk) array
+                                size = max(1, 2**22 // len(A))
+                                results = list(pool.map(chunk_responses, [r[i:i + size] for i in range(0, len(r), size)]))
+                                return tuple(np.concatenate(values) for values in zip(*results))
+                        yield responses, None
+
+        # Method to build a model with the inputs of a snapshot and the given solver settings, for trial solves
+        @staticmethod
+        def _trial_model(snapshot, settings):
+                trial = Model()
+                for name, value in settings.items():
+                        setattr(trial, name, value)
+                trial._restore_state(snapshot)
+                return trial
+
+        # Initializer of a design worker process, builds its trial model once
+        @staticmethod
+        def _start_design_worker(snapshot, settings):
+                Model._design_worker = Model._trial_model(snapshot, settings)
+
+        # Method to solve the trial model (the worker's by default) with each I
+        # returns the max |deflection| and max |moment| of each, inf where the solve fails
+        @staticmethod
+        def _solve_design_candidates(inertias, trial = None):
+                trial = trial or Model._design_worker
+                deflections = np.full(len(inertias), np.inf)
+                moments = np.full(len(inertias), np.inf)
+                for i, I in enumerate(inertias):
+                        trial.materials["I"] = I
+                        trial.solved = False
+                        if trial.solve_FDM():
+                                deflections[i] = np.abs(trial.deflections).max()
+                                moments[i] = np.abs(trial.moments).max()
+                return deflections, moments
+
+        # Distributions of solve_monte_carlo: numpy Generator method -> number of parameters
+        monte_carlo_distributions = {"normal": 2, "lognormal": 2, "uniform": 2, "triangular": 3}
+        # Batch of a Monte Carlo worker process (see _start_monte_carlo_worker)
+        _monte_carlo_worker = None
+
+        # Method to get percentiles of the peak |deflection| and |moment| over random samples of the beam
+        # distributions maps "E", "I", "P<i>" (magnitude of the i-th point load), "x<i>" (its position)
+        # and "q<i>" (magnitude of the i-th distributed load) to (kind, *parameters) of monte_carlo_distributions,
+        # e.g. {"E": ("normal", 2e11, 1e10)}; the other inputs keep their values
+        # samples are drawn per batch from (seed, batch), so the results do not depend on the number of workers
+        # self.uncertainty gets the percentiles and the peaks of every sample (nan where the sample failed)
+        def solve_monte_carlo(self, distributions:dict, samples:int, percentiles = (5, 50, 95), workers:int = None, seed:int = 0):
+                names = {"E", "I"}
+                names |= {f"{prefix}{i}" for prefix in "Px" for i in range(len(self.point_loads))}
+                names |= {f"q{i}" for i in range(len(self.loads))}
+                for name, (kind, *parameters) in distributions.items():
+                        if name not in names or len(parameters) != self.monte_carlo_distributions.get(kind):
                                 return False
+                if samples < 1:
+                        return False
+
+                self.stats = SolveStats()
+                if self.out_of_core:
+                        self.stats.error = "Monte Carlo needs the beam in memory"
+                        return False
+                self.stats.error = self.check_stability()
+                if self.stats.error:
+                        return False
+
+                start = time.perf_counter()
+                N = self.total_node_num
+                try:
+                        plan = self._monte_carlo_plan(distributions, samples, seed, max(16, min(4096, 2**22 // N)))
+                except np.linalg.LinAlgError as e:
+                        self.stats.error = f"Beam is unstable or too finely discretized: {e}"
+                        return False
+
+                batches = -(-samples // plan["batch_size"])
+                workers = min(workers or os.cpu_count() or 1, batches)
+                if workers == 1:
+                        plan["model"] = self if "U" in plan else self._trial_model(plan["snapshot"], plan["settings"])
+                        plan["peaks"] = np.zeros((2, samples))
+                        for batch in range(batches):
+                                self._run_monte_carlo_batch(batch, plan)
+                        peaks = plan["peaks"]
+                else:
+                        peaks = self._run_monte_carlo_pool(plan, batches, workers)
+
+                with np.errstate(all="ignore"):
+                        deflection = np.nanpercentile(peaks[0], percentiles) if not np.isnan(peaks[0]).all() else np.full(len(percentiles), np.nan)
+                        moment = np.nanpercentile(peaks[1], percentiles) if not np.isnan(peaks[1]).all() else np.full(len(percentiles), np.nan)
+                self.uncertainty = {
+                        "samples": samples,
+                        "percentiles": np.asarray(percentiles, dtype=float),
+                        "deflection": deflection,
+                        "moment": moment,
+                        "peak_deflections": peaks[0],
+                        "peak_moments": peaks[1],
+                        "failed": int(np.isnan(peaks[0]).sum()),
+                        "shared_stiffness": "U" in plan,
+                        "time": time.perf_counter() - start,
+                }
+                return True
+
+        # Method to prepare what every batch of a Monte Carlo run needs (picklable, for the worker processes)
+        # samples share the stiffness matrix unless E or I vary on a beam whose conditioned matrix depends on them
+        # (sections, foundations, springs) or the solve is second order; then each sample is solved on its own
+        # with shared stiffness the deflections are linear in the loads and scale with 1 / (E I):
+        # the unit loads at fixed positions are solved once as columns of one multi-vector solve (U),
+        # settlements and thermal loads give a fixed part, and loads at random positions use the influence
+        # columns G of every node when they fit in memory, or one multi-vector solve per batch otherwise
+        def _monte_carlo_plan(self, distributions, samples:int, seed:int, batch_size:int):
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                point_loads = self.point_loads.view
+                plan = {
+                        "distributions": dict(distributions),
+                        "samples": samples,
+                        "seed": seed,
+                        "batch_size": batch_size,
+                        "length": self.length,
+                        "h": h,
+                        "E": self.materials["E"],
+                        "I": self.materials["I"],
+                        "point_loads": point_loads.copy(),
+                        "loads": self.loads.view.copy(),
+                        "snapshot": ModelSnapshot(self),
+                        "settings": {name: getattr(self, name) for name in self.design_settings},
+                }
+                if self.second_order or (("E" in distributions or "I" in distributions) and self._stiffness_key() is not None):
+                        return plan
+
+                lu, load_mask = self._factorize_stiffness(N, h)
+                if lu.dtype != np.float64:
+                        K, _ = self._apply_boundary_conditions(self._build_stiffness_matrix(N), np.ones(N), N, h)
+                        lu = BandedLU(K, self.band_lower, self.band_upper)
+                load_scale = load_mask * h**4 / self._flexural_rigidity(N, h)
+
+                moving = np.array([f"x{i}" in distributions for i in range(len(point_loads))], dtype=bool)
+                fixed = np.flatnonzero(~moving)
+                on_beam = (0 <= point_loads["position"][fixed]) & (point_loads["position"][fixed] <= self.length)
+                units = np.zeros((N, len(fixed) + len(self.loads)))
+                fixed_nodes = self._get_nodes_by_pos(point_loads["position"][fixed], h)
+                units[fixed_nodes, np.arange(len(fixed))] = on_beam / self._tributary(fixed_nodes, N, h)
+                for k, (start, end, _) in enumerate(self.loads.view):
+                        units[:, len(fixed) + k] = self._sum_over_ranges(np.array([start]), np.array([end]), np.ones(1), h, 0, N)
+                plan["U"] = lu.solve(units * load_scale[:, None])
+                plan["fixed"] = fixed
+                plan["moving"] = np.flatnonzero(moving)
+                plan["sin"] = np.sin(point_loads["angle"] * np.pi / 180)
+
+                # Settlements and thermal loads do not scale with 1 / (E I), their moments do with E I
+                plan["v_fixed"] = None
+                if len(self.settlements) or len(self.thermal_loads):
+                        F = np.zeros(N)
+                        if len(self.thermal_loads):
+                                F = self._thermal_load(N, h, 0, N)
+                        v = lu.solve(self._scale_loads(F, load_mask, N, h))
+                        plan["v_fixed"] = v
+                        plan["M_fixed"] = self._moments(v, np.gradient(v, h), h)
+
+                if len(plan["moving"]):
+                        # About 128 MiB for the influence columns of every node
+                        if N * N <= 2**24:
+                                plan["G"] = lu.solve(np.diag(load_scale / self._tributary(np.arange(N), N, h)))
+                        else:
+                                plan["lu"] = lu
+                                plan["load_scale"] = load_scale
+                return plan
+
+        # Method to draw the samples of one batch, returns E, I (batch,), the point load magnitudes and positions
+        # (point loads, batch) and the distributed load magnitudes (loads, batch)
+        @staticmethod
+        def _sample_monte_carlo_batch(plan, batch:int):
+                size = min(plan["batch_size"], plan["samples"] - batch * plan["batch_size"])
+                rng = np.random.default_rng([plan["seed"], batch])
+
+                def draw(name, value):
+                        if name in plan["distributions"]:
+                                kind, *parameters = plan["distributions"][name]
+                                return getattr(rng, kind)(*parameters, size=size)
+                        return np.full(size, value)
+
+                point_loads, loads = plan["point_loads"], plan["loads"]
+                E = draw("E", plan["E"])
+                I = draw("I", plan["I"])
+                P = np.array([draw(f"P{i}", value) for i, value in enumerate(point_loads["magnitude"])]).reshape(-1, size)
+                x = np.array([draw(f"x{i}", value) for i, value in enumerate(point_loads["position"])]).reshape(-1, size)
+                q = np.array([draw(f"q{i}", value) for i, value in enumerate(loads["magnitude"])]).reshape(-1, size)
+                return E, I, P, x, q
+
+        # Method to solve one batch of samples and write their peaks into plan["peaks"] (2, samples)
+        @staticmethod
+        def _run_monte_carlo_batch(batch:int, plan = None):
+                plan = plan or Model._monte_carlo_worker
+                model = plan["model"]
+                E, I, P, x, q = Model._sample_monte_carlo_batch(plan, batch)
+                first = batch * plan["batch_size"]
+                peaks = plan["peaks"][:, first:first + len(E)]
+                # Loads that leave the beam do not act on it
+                on_beam = (0 <= x) & (x <= plan["length"])
+                h = plan["h"]
+
+                if "U" not in plan:
+                        for s in range(len(E)):
+                                model.materials["E"] = E[s]
+                                model.materials["I"] = I[s]
+                                model.point_loads["magnitude"][:] = np.where(on_beam[:, s], P[:, s], 0)
+                                model.point_loads["position"][:] = np.clip(x[:, s], 0, plan["length"])
+                                model.loads["magnitude"][:] = q[:, s]
+                                model.solved = False
+                                if E[s] * I[s] > 0 and model.solve_FDM():
+                                        peaks[:, s] = np.abs(model.deflections).max(), np.abs(model.moments).max()
+                                else:
+                                        peaks[:, s] = np.nan
+                        return
+
+                Fy = P * plan["sin"][:, None] * on_beam
+                v = plan["U"] @ np.concatenate((Fy[plan["fixed"]], q))
+                moving = plan["moving"]
+                if len(moving):
+                        nodes = np.clip(np.round(x[moving] / h).astype(int), 0, len(v) - 1)
+                        if "G" in plan:
+                                for k in range(len(moving)):
+                                        v += plan["G"][:, nodes[k]] * Fy[moving[k]]
+                        else:
+                                F = np.zeros(v.shape)
+                                np.add.at(F, (nodes, np.arange(len(E))), Fy[moving] / model._tributary(nodes, len(v), h))
+                                v += plan["lu"].solve(F * plan["load_scale"][:, None])
+                M = model._moments(v, np.gradient(v, h, axis=0), h, thermal=False)
+
+                with np.errstate(divide="ignore", invalid="ignore"):
+                        ratio = np.where(E * I > 0, plan["E"] * plan["I"] / (E * I), np.nan)
+                        v *= ratio
+                        if plan["v_fixed"] is not None:
+                                v += plan["v_fixed"][:, None]
+                                M += plan["M_fixed"][:, None] / ratio
+                        peaks[0] = np.abs(v).max(axis=0)
+                        peaks[1] = np.abs(M).max(axis=0)
+                peaks[:, np.isnan(ratio)] = np.nan
+
+        # Method to run the batches on a pool of worker processes
+        # the peaks (and the influence columns) live in shared memory, so nothing large is pickled
+        def _run_monte_carlo_pool(self, plan, batches:int, workers:int):
+                arrays = {"peaks": np.zeros((2, plan["samples"]))}
+                if "G" in plan:
+                        arrays["G"] = plan.pop("G")
+                blocks = []
+                try:
+                        shared = {}
+                        for key, array in arrays.items():
+                                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                                blocks.append(block)
+                                np.ndarray(array.shape, dtype=np.float64, buffer=block.buf)[:] = array
+                                shared[key] = (block.name, array.shape)
+                        del arrays
+
+                        with ProcessPoolExecutor(workers, initializer=Model._start_monte_carlo_worker, initargs=(plan, shared)) as pool:
+                                list(pool.map(Model._run_monte_carlo_batch, range(batches), chunksize=max(1, batches // (4 * workers))))
+                        return np.ndarray((2, plan["samples"]), dtype=np.float64, buffer=blocks[0].buf).copy()
+                finally:
+                        for block in blocks:
+                                block.close()
+                                block.unlink()
+
+        # Initializer of a Monte Carlo worker process: attaches the shared arrays and builds its model once
+        @staticmethod
+        def _start_monte_carlo_worker(plan, shared):
+                plan["blocks"] = []
+                for key, (name, shape) in shared.items():
+                        # The parent unlinks the blocks (the pool shares its resource tracker)
+                        block = shared_memory.SharedMemory(name=name)
+                        plan["blocks"].append(block)
+                        plan[key] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+                plan["model"] = Model._trial_model(plan["snapshot"], plan["settings"])
+                Model._monte_carlo_worker = plan
+
+        # Method to find the lowest natural frequencies and mode shapes of the beam
+        # mass_per_length is the vibrating mass (beam plus added mass) in kg/m
+        # solves K v = lambda M v by subspace iteration with shift-invert: each iteration
+        # is one multi-vector solve with the banded factors of K - shift M, never a dense N x N eigenproblem
+        # M is the load mask (rows replaced by supports carry no mass) and lambda = omega^2 m h^4 / (E I)
+        # the shift is a frequency in Hz, the modes closest to it converge first
+        def solve_modes(self, num_modes:int, mass_per_length:float, shift:float = 0.0, tol:float = 1e-10, max_iterations:int = 100):
+                self.stats = stats = SolveStats(self.track_memory, self.solve_callbacks)
+                stats.error = self.check_stability(check_loads=False)
+                if stats.error:
+                        return False
+                if num_modes < 1 or mass_per_length <= 0:
+                        stats.error = "Modal analysis needs at least one mode and a positive mass"
+                        return False
+
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                EI = self.materials["E"] * self.materials["I"]
+                scale = mass_per_length * h**4 / EI # lambda = scale * omega^2
+
+                try:
+                        with stats.phase("stiffness assembly"):
+                                K, mass = self._apply_boundary_conditions(self._build_stiffness_matrix(N), np.ones(N), N, h)
+                                # Equations are divided by the EI of their node, so is their mass
+                                mass *= EI / self._flexural_rigidity(N, h)
+                        with stats.phase("factorization"):
+                                sigma = scale * (2 * np.pi * shift)**2
+                                shifted = K.copy()
+                                shifted[:, self.band_lower] -= sigma * mass
+                                lu = BandedLU(shifted, self.band_lower, self.band_upper)
+
+                        with stats.phase("subspace iteration"):
+                                # A few extra vectors speed up the convergence of the last wanted mode
+                                num_modes = min(num_modes, np.count_nonzero(mass))
+                                size = min(num_modes + max(num_modes, 8), np.count_nonzero(mass))
+                                X = np.random.default_rng(0).standard_normal((N, size)) * mass[:, None]
+                                Q, _ = np.linalg.qr(lu.solve(mass[:, None] * X))
+                                eigenvalues = np.full(num_modes, np.inf)
+                                smallest_change, stalled = np.inf, 0
+
+                                for iteration in range(1, max_iterations + 1):
+                                        # Rayleigh-Ritz with the shift-invert operator T = (K - shift M)^-1 M,
+                                        # its eigenvalues mu = 1 / (lambda - shift) are largest for the wanted modes
+                                        # (projecting K itself would lose the small lambdas to cancellation)
+                                        Z = lu.solve(mass[:, None] * Q)
+                                        values, vectors = np.linalg.eig(Q.T @ Z)
+                                        order = np.argsort(-np.abs(values))
+                                        vectors = vectors[:, order].real
+                                        X = Q @ vectors
+
+                                        previous = eigenvalues
+                                        eigenvalues = sigma + 1 / values.real[order[:num_modes]]
+                                        change = np.max(np.abs(eigenvalues - previous) / np.abs(eigenvalues))
+                                        if change <= tol:
+                                                break
+                                        # Rounding in the solves limits fine meshes (as for static solves),
+                                        # stop once the changes no longer shrink
+                                        stalled = stalled + 1 if change >= smallest_change else 0
+                                        smallest_change = min(smallest_change, change)
+                                        if stalled == 3:
+                                                break
+                                        Q, _ = np.linalg.qr(Z @ vectors)
+
+                        with stats.phase("post-processing"):
+                                order = np.argsort(eigenvalues)
+                                shapes = X[:, order]
+                                # Largest displacement of each mode is +1
+                                peaks = shapes[np.argmax(np.abs(shapes), axis=0), np.arange(len(order))]
+                                self.mode_shapes = shapes / peaks
+                                self.mode_frequencies = np.sqrt(np.maximum(eigenvalues[order], 0) / scale) / (2 * np.pi)
+                                self.mode_iterations = iteration
+                        return True
+                except np.linalg.LinAlgError as e:
+                        stats.error = f"Beam is unstable or too finely discretized: {e}"
+                        return False
+
+        # Method to integrate the dynamic response in time with the Newmark method
+        # m a + E I v'''' + c m v' = q(t), with mass_per_length m (kg/m) and mass-proportional damping c (1/s)
+        # load(t) returns the nodal loads q in N/m (see step_load, impact_load, harmonic_load, moving_load),
+        # by default the model loads applied suddenly at t = 0; the beam starts at rest
+        # the effective stiffness is factorized once, then every step is one banded solve
+        # yields (t, deflections) for t = 0, dt, .. duration, each frame is a new array that callers may keep
+        def iter_time_history(self, duration:float, dt:float, mass_per_length:float, load = None, damping:float = 0.0, beta:float = 0.25, gamma:float = 0.5):
+                self.stats = stats = SolveStats(self.track_memory, self.solve_callbacks)
+                stats.error = self.check_stability()
+                if stats.error:
+                        raise ValueError(stats.error)
+                if dt <= 0 or duration < 0 or mass_per_length <= 0:
+                        raise ValueError("Time history needs a positive time step and mass")
+                if load is None:
+                        load = self.step_load()
+
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                EI = self._flexural_rigidity(N, h)
+                # Equations are scaled like the static ones: K v + s (a + c v') = q h^4 / (E I)
+                s = mass_per_length * h**4 / EI
+
+                with stats.phase("factorization"):
+                        K, mass = self._apply_boundary_conditions(self._build_stiffness_matrix(N), np.ones(N), N, h)
+                        # Rows replaced by supports carry no mass, they keep deflection = 0
+                        M = s * mass
+                        a0 = 1 / (beta * dt**2) + damping * gamma / (beta * dt)
+                        K_eff = K.copy()
+                        K_eff[:, self.band_lower] += a0 * M
+                        lu = BandedLU(K_eff, self.band_lower, self.band_upper)
+
+                load_scale = h**4 / EI
+                v = np.zeros(N)
+                velocity = np.zeros(N)
+                acceleration = np.where(mass > 0, load(0.0) * mass, 0) / mass_per_length
+                yield 0.0, v
+
+                for step in range(1, int(round(duration / dt)) + 1):
+                        t = step * dt
+                        # Newmark predictors of the inertia and damping terms
+                        inertia = v / (beta * dt**2) + velocity / (beta * dt) + (1 / (2 * beta) - 1) * acceleration
+                        viscous = gamma / (beta * dt) * v + (gamma / beta - 1) * velocity + dt * (gamma / (2 * beta) - 1) * acceleration
+                        F = load(t) * mass * load_scale + M * (inertia + damping * viscous)
+
+                        with stats.phase("solve"):
+                                v_new = lu.solve(F)
+                        new_acceleration = (v_new - v) / (beta * dt**2) - velocity / (beta * dt) - (1 / (2 * beta) - 1) * acceleration
+                        velocity = velocity + dt * ((1 - gamma) * acceleration + gamma * new_acceleration)
+                        acceleration = new_acceleration
+                        v = v_new
+                        yield t, v
+
+        # Method to write a time history to a .npy file, one frame of N deflections per step
+        # frames are written as they are computed, so memory does not grow with the number of steps
+        # returns the number of frames
+        def export_time_history(self, path, duration:float, dt:float, mass_per_length:float, load = None, damping:float = 0.0):
+                frames = self.iter_time_history(duration, dt, mass_per_length, load, damping)
+                # The first frame checks the inputs before the file is touched
+                _, v = next(frames)
+                steps = int(round(duration / dt)) + 1
+                with open(path, "wb") as file:
+                        np.lib.format.write_array_header_1_0(file, {"descr": "<f8", "fortran_order": False, "shape": (steps, len(v))})
+                        v.tofile(file)
+                        for _, v in frames:
+                                v.tofile(file)
+                return steps
+
+        # Load functions for iter_time_history, returning nodal loads in N/m at time t
+
+        # The model loads, applied suddenly at t = 0 and kept
+        def step_load(self):
+                N = self.total_node_num
+                F = self._build_load_vector(N, self.length / (N - 1))
+                return lambda t: F
+
+        # The model loads during the first `duration` seconds (impact)
+        def impact_load(self, duration:float):
+                N = self.total_node_num
+                F = self._build_load_vector(N, self.length / (N - 1))
+                zero = np.zeros(N)
+                return lambda t: F if t <= duration else zero
+
+        # The model loads scaled by sin(2 pi frequency t)
+        def harmonic_load(self, frequency:float):
+                N = self.total_node_num
+                F = self._build_load_vector(N, self.length / (N - 1))
+                return lambda t: F * np.sin(2 * np.pi * frequency * t)
+
+        # A point load crossing the beam from x = 0 at constant speed (m/s)
+        def moving_load(self, magnitude:float, speed:float):
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                def load(t):
+                        F = np.zeros(N)
+                        x = speed * t
+                        if 0 <= x <= self.length:
+                                node = self._get_node_by_pos(x, h)
+                                F[node] = magnitude / self._tributary(node, N, h)
+                        return F
+                return load
+
+        # Method to roll a train of axle loads across the beam
+        # magnitudes are the axle loads, spacings the distances between consecutive axles
+        # stores the (min, max) envelopes of each diagram per node in self.envelopes
+        # the deflections of a train position are the influence columns of its loaded nodes times the axle loads,
+        # summed over blocks of positions of about moving_load_block_size values
+        def solve_moving_load(self, magnitudes, spacings, step:float = None):
+                magnitudes = np.asarray(magnitudes, dtype=float)
+                offsets = np.concatenate(([0.0], np.cumsum(spacings, dtype=float)))
+
+                if magnitudes.ndim != 1 or len(offsets) != len(magnitudes) or np.any(offsets < 0):
+                        return False
+                if step is not None and step <= 0:
+                        return False
+
+                error = self.check_stability()
+                if error:
+                        self.stats = SolveStats()
+                        self.stats.error = error
+                        return False
+
+                N = self.total_node_num
+                h = self.length / (N - 1)
+                if step is None:
+                        step = h
+                # Position of the leading axle, from entering to leaving the beam
+                positions = np.arange(0, self.length + offsets[-1] + step / 2, step)
+                if N * len(positions) > self.max_moving_load_size:
+                        self.stats = SolveStats()
+                        self.stats.error = f"A moving load over {len(positions)} positions and {N} nodes exceeds max_moving_load_size ({self.max_moving_load_size} deflections), use fewer nodes or a longer step"
+                        return False
+
+                try:
+                        axle_positions = positions[:, None] - offsets[None, :]
+                        on_beam = (axle_positions >= 0) & (axle_positions <= self.length)
+                        nodes = self._get_nodes_by_pos(axle_positions, h)
+                        weights = magnitudes * on_beam
+
+                        # The influence lines of every node are cached with the factorization (by rows) if they fit
+                        # in max_influence_size, otherwise each block solves for the lines of its loaded nodes only
+                        # (at most one per axle and position, so a block also stays within max_influence_size)
+                        lines = None
+                        block = max(self.moving_load_block_size // N, 1)
+                        if N * N <= self.max_influence_size:
+                                # (a new factorization drops the cached lines)
+                                self._factorize_stiffness(N, h)
+                                if self._influence_lines is None:
+                                        self.get_influence_lines()
+                                lines = self._influence_lines
+                                weights = weights / (self.materials["E"] * self.materials["I"])
+                        else:
+                                block = max(min(block, self.max_influence_size // (N * len(magnitudes))), 1)
+
+                        envelopes = {}
+                        for start in range(0, len(positions), block):
+                                stop = min(start + block, len(positions))
+                                block_lines, block_nodes = lines, nodes[start:stop]
+                                if lines is None:
+                                        loaded, block_nodes = np.unique(block_nodes, return_inverse=True)
+                                        block_lines = np.ascontiguousarray(self.get_influence_lines(loaded).T)
+                                        block_nodes = block_nodes.reshape(stop - start, -1)
+                                # Column p holds the deflections of the train at position start + p
+                                v = np.zeros((stop - start, N))
+                                for axle in range(len(magnitudes)):
+                                        v += weights[start:stop, axle, None] * block_lines[block_nodes[:, axle]]
+                                v = v.T
+                                slopes, moments, shears = self._post_process(v, h, thermal=False)
+
+                                for name, values in zip(("deflection", "slope", "moment", "shear"), (v, slopes, moments, shears)):
+                                        low, high = values.min(axis=1), values.max(axis=1)
+                                        if name in envelopes:
+                                                low = np.minimum(envelopes[name][0], low)
+                                                high = np.maximum(envelopes[name][1], high)
+                                        envelopes[name] = (low, high)
+
+                        self.envelope_positions = positions
+                        self.envelopes = envelopes
+                        return True
+                except np.linalg.LinAlgError as e:
+                        self.stats = SolveStats()
+                        self.stats.error = f"Beam is unstable or too finely discretized: {e}"
+                        return False
+
+        # Length of beam each node stands for: h, and h / 2 for the two end nodes
+        # a point load P on node j is a distributed load of P / tributary there
+        def _tributary(self, nodes, N, h):
+                nodes = np.asarray(nodes)
+                return np.where((nodes == 0) | (nodes == N - 1), h / 2, h)
 
         def _get_node_by_pos(self, pos, h) -> int:
                 N = self.total_node_num
@@ -198,91 +2652,487 @@ class Model():
 
                 return j
 
-        def _build_load_vector(self, N, h):
+        # Vectorized _get_node_by_pos for an array of positions
+        def _get_nodes_by_pos(self, positions, h):
+                N = self.total_node_num
+                return np.clip(np.round(np.asarray(positions) / h).astype(int), 0, N - 1)
+
+        # Method to assemble the load vector, only the nodes first .. last - 1 if given (out-of-core solves)
+        # without the thermal gradients if thermal is false (the mechanical loads alone)
+        def _build_load_vector(self, N, h, first:int = 0, last:int = None, thermal:bool = True):
+                if last is None:
+                        last = N
+                n = last - first
                 
-                F = np.zeros(N) # define N sized vector
-
-                for magnitude, pos, angle in self.point_loads:
-                        # get node closest to position
-                        j = self._get_node_by_pos(pos, h)
+                F = np.zeros(n) # define n sized vector
 
-                        # convert force P to equivalent distribution q
-                        Fy = magnitude * np.sin(angle * np.pi / 180) / h
+                # convert each force P to equivalent distribution q on the node closest to it
+                point_loads = self.point_loads.view
+                j = self._get_nodes_by_pos(point_loads["position"], h)
+                Fy = point_loads["magnitude"] * np.sin(point_loads["angle"] * np.pi / 180) / self._tributary(j, N, h) # converting deg to rad
+                inside = (j >= first) & (j < last)
+                F += np.bincount(j[inside] - first, weights=Fy[inside], minlength=n)
 
-                        F[j] += Fy # converting deg to rad
-                
-                for (pos_start, pos_end), magnitude in self.loads:
-                        j_start = self._get_node_by_pos(pos_start, h)
-                        j_end = self._get_node_by_pos(pos_end, h)
+                # distributed loads cover every node from start to end
+                loads = self.loads.view
+                F += self._sum_over_ranges(loads["start"], loads["end"], loads["magnitude"], h, first, last)
 
-                        for j in range(j_start, j_end + 1):
-                                F[j] += magnitude
+                if thermal and len(self.thermal_loads):
+                        F += self._thermal_load(N, h, first, last)
                 
                 return F
 
-        def _build_stiffness_matrix(self, N):
-
-                K = np.zeros((N, N))
-                
-                # Standard 4th-order derivative stencil
-                for i in range(2, N-2):
-                        K[i, i-2:i+3] = [1, -4, 6, -4, 1]
-
-                # Special stencils for free end nodes
+        # Method to get the thermal moments EI * curvature of the nodes first .. last - 1,
+        # the moments that would keep the heated parts of the beam straight
+        def _thermal_moments(self, N, h, first:int, last:int):
+                thermal = self.thermal_loads.view
+                curvature = self._sum_over_ranges(thermal["start"], thermal["end"], thermal["curvature"], h, first, last)
+                return self._flexural_rigidity(N, h, first, last) * curvature
+
+        # Method to get the equivalent load of the thermal gradients at the nodes first .. last - 1
+        # M = EI (v'' - curvature), so (EI v'')'' = q + (EI curvature)'' and the thermal moments
+        # load the beam through their second difference (mirrored past the ends, like the ghost nodes);
+        # the rows closing a free end use M = 0 there, so its thermal moment drops out of them
+        def _thermal_load(self, N, h, first:int, last:int):
+                lo, hi = max(first - 1, 0), min(last + 1, N)
+                M = self._thermal_moments(N, h, lo, hi)
+                if first == 0:
+                        M = np.concatenate(([M[1]], M))
+                if last == N:
+                        M = np.concatenate((M, [M[-2]]))
+                q = (M[:-2] - 2 * M[1:-1] + M[2:]) / h**2
+
+                written = self._support_row_writes(N, h)[0] if len(self.supports) else []
+                for end, inner in ((0, 1), (N - 1, N - 2)):
+                        M_end = self._thermal_moments(N, h, end, end + 1)[0]
+                        if end not in written and first <= end < last:
+                                q[end - first] += 2 * M_end / h**2
+                        if inner not in written and first <= inner < last:
+                                q[inner - first] -= M_end / h**2
+                return q
+
+        # Sum at the nodes first .. last - 1 of values that each cover the nodes from start to end:
+        # add the value at the first node and remove it after the last one, then accumulate
+        # (ranges starting before the first node are added at the first node)
+        def _sum_over_ranges(self, starts, ends, values, h, first:int, last:int):
+                n = last - first
+                j_start = np.maximum(self._get_nodes_by_pos(starts, h) - first, 0)
+                j_end = self._get_nodes_by_pos(ends, h) + 1 - first
+                active = (j_start < n) & (j_end > 0)
+                steps = np.bincount(j_start[active], weights=values[active], minlength=n + 1)
+                steps -= np.bincount(np.minimum(j_end[active], n), weights=values[active], minlength=n + 1)
+                return np.cumsum(steps)[:n]
+
+        # Method to get the flexural rigidity E*I of the nodes first .. last - 1
+        def _flexural_rigidity(self, N, h, first:int = 0, last:int = None):
+                if last is None:
+                        last = N
+                EI = np.full(last - first, self.materials["E"] * self.materials["I"])
+                if not len(self.sections):
+                        return EI
+
+                sections = self.sections.view
+                last_owner = self._section_owners(N, h, first, last)
+                covered = last_owner >= 0
+                section = sections[last_owner[covered]]
+                t = (np.flatnonzero(covered) + first) * h - section["start"]
+                EI[covered] = section["EI"] + (section["end_EI"] - section["EI"]) * t / (section["end"] - section["start"])
+                return EI
+
+        # Method to get the section that sets the EI of each node first .. last - 1 (-1 where the materials do)
+        def _section_owners(self, N, h, first:int = 0, last:int = None):
+                if last is None:
+                        last = N
+                last_owner = np.full(last - first, -1)
+                if not len(self.sections):
+                        return last_owner
+
+                # Nodes covered by each section, clipped to first .. last - 1
+                sections = self.sections.view
+                j_start = np.maximum(np.ceil(sections["start"] / h - 1e-9).astype(int), first)
+                j_end = np.minimum(np.floor(sections["end"] / h + 1e-9).astype(int) + 1, last)
+                counts = np.maximum(j_end - j_start, 0)
+                owner = np.repeat(np.arange(len(sections)), counts)
+                nodes = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + j_start[owner]
+
+                # Where sections overlap the one added last counts
+                np.maximum.at(last_owner, nodes - first, owner)
+                return last_owner
+
+        # Identifies the EI profile, foundations and springs for the cached factorizations
+        # the equations of a prismatic beam only depend on the ratios of EI, so it needs no key
+        def _stiffness_key(self):
+                if not (len(self.sections) or len(self.foundations) or len(self.springs)):
+                        return None
+                return self.sections.key(), self.foundations.key(), self.springs.key(), self.materials["E"] * self.materials["I"]
+
+        # Rows, columns and stiffnesses (N/m) of the band entries of the springs
+        # a rotational spring resists the slope (v[b] - v[a]) / ((b - a) h), central inside the beam
+        # and one-sided at its ends, which couples nodes a and b
+        def _spring_entries(self, N, h):
+                springs = self.springs.view
+                j = self._get_nodes_by_pos(springs["position"], h)
+                a = np.clip(j - 1, 0, N - 2)
+                b = np.clip(j + 1, 1, N - 1)
+                k = springs["rotational"] / ((b - a) * h)**2
+
+                rows = np.concatenate((j, a, a, b, b))
+                cols = np.concatenate((j, a, b, b, a))
+                values = np.concatenate((springs["stiffness"], k, -k, k, -k))
+                return rows, cols, values
+
+        # Method to add the foundations and springs to the rows first .. last - 1 of K
+        # they only touch the diagonal and the entries two nodes away, so K stays banded;
+        # springs act on the length of their node (h, h / 2 at the ends), and every term is scaled
+        # by h^4 / EI like the rest of the equation of its node
+        def _add_elastic_supports(self, K, N, h, first:int, last:int):
+                if not (len(self.foundations) or len(self.springs)):
+                        return
+                scale = h**4 / self._flexural_rigidity(N, h, first, last)
+
+                foundations = self.foundations.view
+                K[first:last, self.band_lower] += scale * self._sum_over_ranges(foundations["start"], foundations["end"], foundations["modulus"], h, first, last)
+
+                rows, cols, values = self._spring_entries(N, h)
+                inside = (rows >= first) & (rows < last)
+                rows, cols, values = rows[inside], cols[inside], values[inside]
+                np.add.at(K[first:last], (rows - first, cols - rows + self.band_lower), values / self._tributary(rows, N, h) * scale[rows - first])
+
+        # Method to assemble the stiffness matrix in banded form
+        # K[i, d + band_lower] holds the coefficient of node i + d in the equation of node i
+        # the operator is (EI v'')'' with moments M = EI v'' at the nodes, and the equation of
+        # node i is divided by its own EI (the loads are scaled by h^4 / EI to match)
+        # K can be given to fill an existing array (e.g. memory-mapped), block_rows at a time
+        def _build_stiffness_matrix(self, N, K = None, block_rows:int = None):
+
+                if K is None:
+                        K = np.zeros((N, self.band_lower + self.band_upper + 1))
+                else:
+                        K[:] = 0
+                if block_rows is None:
+                        block_rows = N
+                h = self.length / (N - 1)
+
+                # 4th-order derivative stencil, [1, -4, 6, -4, 1] for a prismatic beam
+                for start in range(2, N - 2, block_rows):
+                        stop = min(start + block_rows, N - 2)
+                        c = self._flexural_rigidity(N, h, start - 1, stop + 1)
+                        before, node, after = c[:-2], c[1:-1], c[2:]
+                        K[start:stop, 0:5] = np.stack((
+                                before,
+                                -2 * before - 2 * node,
+                                before + 4 * node + after,
+                                -2 * node - 2 * after,
+                                after,
+                        ), axis=1) / node[:, None]
+
+                # Special stencils for free end nodes (M = 0 and V = 0 through a ghost node)
                 # they should be replaced by supports if so
-                K[0, 0:3] = [2, -4, 2]
-                K[1, 0:4] = [-2, 5, -4, 1]
+                c = self._flexural_rigidity(N, h, 0, 3)
+                self._replace_row(K, 0, 0, np.array([2, -4, 2]) * c[1] / c[0])
+                self._replace_row(K, 1, 0, [-2, 4 + c[2] / c[1], -2 - 2 * c[2] / c[1], c[2] / c[1]])
+
+                c = self._flexural_rigidity(N, h, N - 3, N)
+                self._replace_row(K, N-2, N-4, [c[0] / c[1], -2 * c[0] / c[1] - 2, c[0] / c[1] + 4, -2])
+                self._replace_row(K, N-1, N-3, np.array([2, -4, 2]) * c[1] / c[2])
 
-                K[N-2, N-4:N] = [1, -4, 5, -2]
-                K[N-1, N-3:N] = [2, -4, 2]
+                # Elastic foundations and springs (rigid supports replace their rows later)
+                for start in range(0, N, block_rows):
+                        self._add_elastic_supports(K, N, h, start, min(start + block_rows, N))
 
                 return K
+
+        # Method to overwrite the equation of node j in the banded matrix
+        # values are the coefficients of nodes col, col + 1, ...
+        def _replace_row(self, K, j, col, values):
+                K[j, :] = 0
+                start = col - j + self.band_lower
+                K[j, start:start + len(values)] = values
         
+        # Rows written by the supports, in banded form (see _apply_boundary_conditions)
+        _support_rows = np.array([
+                [0, 0, 1, 0, 0, 0],             # deflection = 0 -> w_0 = 0
+                [0, 0, 6, -8, 2, 0],            # "z" on the left half, written on node j
+                [2, -8, 6, 0, 0, 0],            # "z" on the right half, written on node j
+                [0, 0, 7, -4, 1, 0],            # "yz" on the left half, written on node j+1
+                [1, -4, 7, 0, 0, 0],            # "yz" on the right half, written on node j-1
+        ], dtype=float)
+
+        # Right-hand side of each support row for a settlement w and a rotation t of the support
+        # (from the same ghost nodes, e.g. a "z" on the left has w_-1 = w_1 - 2 h t and w_-2 = w_2 - 4 h t)
+        _support_rhs = np.array([
+                [1, 0],                         # w_0 = w
+                [0, -4],                        # "z" on the left half
+                [0, 4],                         # "z" on the right half
+                [4, 2],                         # "yz" on the left half
+                [4, -2],                        # "yz" on the right half
+        ], dtype=float)
+
+        # Method to find the rows written by the supports, returns (rows, stencils, supports)
+        # with the index of the _support_rows stencil and of the support that writes each row
+        def _support_row_writes(self, N, h):
+                j = self._get_nodes_by_pos(self.supports["position"], h)
+                # x is handled by another method
+                kind = np.char.replace(self.supports["type"], "x", "")
+                left = j <= N // 2
+                order = np.arange(len(j))
+
+                is_y = (kind == "y") | (kind == "yz") # 1° or 2° degree support
+                is_z = kind == "z"
+                is_yz = kind == "yz"
+
+                # "z" stencil is defined by:
+                #       Angle = 0 -> w_-1 = w_1
+                #       Shear = 0 -> w_-2 = w_2
+                # "yz" stencil is defined by:
+                #       Deflection = 0 -> w_0 = 0
+                #       Angle = 0 -> w_-1 = w_1
+                # extreme boundaries need to erase ghost nodes
+                # So i'm defining it like this to guarantee
+                # no ghost node is created, by defining in relation
+                # to the node right next to it (boundaries corrected for node positions)
+                rows = np.concatenate((j[is_y], j[is_z], j[is_yz & left] + 1, j[is_yz & ~left] - 1))
+                stencils = np.concatenate((
+                        np.zeros(is_y.sum(), dtype=int),
+                        np.where(left[is_z], 1, 2),
+                        np.full((is_yz & left).sum(), 3),
+                        np.full((is_yz & ~left).sum(), 4),
+                ))
+                writers = np.concatenate((order[is_y], order[is_z], order[is_yz & left], order[is_yz & ~left]))
+
+                # Each support replaces whole rows, so when two supports write the same row
+                # only the one added last counts (as if they were applied one after the other)
+                sort = np.lexsort((writers, rows))
+                rows, stencils, writers = rows[sort], stencils[sort], writers[sort]
+                last = np.ones(len(rows), dtype=bool)
+                last[:-1] = rows[1:] != rows[:-1]
+                return rows[last], stencils[last], writers[last]
+
         def _apply_boundary_conditions(self, K, F, N, h):
-                
-                for pos, support_type in self.supports:
-                        j = self._get_node_by_pos(pos, h)
-
-                        # x is handled by another method
-                        match support_type.replace("x", ""):
-                                case "y": # 1° or 2° degree support
-                                        K[j, :] = 0
-                                        K[j, j] = 1
-                                        F[j] = 0
-                                case "z":
-                                        # Stencil is defined by:
-                                        #       Angle = 0 -> w_-1 = w_1
-                                        #       Shear = 0 -> w_-2 = w_2
-                                        K[j, :] = 0
-                                        if j <= N // 2:
-                                                K[j, j:j+3] = [6, -8, 2]
-                                        else:
-                                                K[j, j-2:j+1] = [2, -8, 6]
-
-                                case "yz":
-                                        # Stencil is defined by:
-                                        #       Deflection = 0 -> w_0 = 0
-                                        #       Angle = 0 -> w_-1 = w_1
-                                        # ensure deflection is null at 0
-                                        K[j, :] = 0
-                                        K[j,j] = 1
-                                        F[j] = 0
-                                        # extreme boundaries need to erase ghost nodes
-                                        # So i'm defining it like this to guarantee
-                                        # no ghost node is created, by defining in relation
-                                        # to the node right next to it 
-                                        if j <= N // 2:
-                                                # boundaries corrected for node positions
-                                                K[j+1, :] = 0
-                                                K[j+1, j+1:j+5] = [0, 7, -4, 1]
-                                        else:
-                                                
-                                                # boundaries corrected for node positions
-                                                K[j-1, :] = 0
-                                                K[j-1, j-3:j+1] = [1, -4, 7, 0]
+                # A beam may rest on springs and foundations only
+                if not len(self.supports):
+                        return K, F
+
+                rows, stencils, _ = self._support_row_writes(N, h)
+                K[rows] = self._support_rows[stencils]
+
+                # ensure deflection is null at the supports
+                # (settlements are added to the scaled loads, see _prescribed_rhs)
+                is_y = np.char.find(self.supports["type"], "y") >= 0
+                F[self._get_nodes_by_pos(self.supports["position"][is_y], h)] = 0
                 
                 return K, F
 
+        # Method to get the right-hand side entries of prescribed support displacements, as (rows, values)
+        # to add to the scaled load vector; deflections (m) and rotations (rad, slope dv/dx) are given
+        # per support, by default from the settlements. Only the right-hand side changes,
+        # so the factorization of K is reused
+        def _prescribed_rhs(self, N, h, deflections = None, rotations = None):
+                if not len(self.supports):
+                        return np.zeros(0, dtype=int), np.zeros(0)
+                if deflections is None:
+                        deflections, rotations = self._support_settlements(N, h)
+                rows, stencils, writers = self._support_row_writes(N, h)
+                values = self._support_rhs[stencils, 0] * deflections[writers] + self._support_rhs[stencils, 1] * h * rotations[writers]
+                nonzero = values != 0
+                return rows[nonzero], values[nonzero]
+
+        # Method to get the settlement and rotation of every support from the settlements on its node
+        # (where several settlements share a node the one added last counts)
+        def _support_settlements(self, N, h):
+                deflections = np.zeros(len(self.supports))
+                rotations = np.zeros(len(self.supports))
+                if not len(self.settlements):
+                        return deflections, rotations
+
+                settlement_nodes = self._get_nodes_by_pos(self.settlements["position"], h)
+                nodes, first = np.unique(settlement_nodes[::-1], return_index=True)
+                last = len(settlement_nodes) - 1 - first
+                support_nodes = self._get_nodes_by_pos(self.supports["position"], h)
+                index = np.searchsorted(nodes, support_nodes)
+                found = (index < len(nodes)) & (nodes[np.minimum(index, len(nodes) - 1)] == support_nodes)
+                deflections[found] = self.settlements["deflection"][last[index[found]]]
+                rotations[found] = self.settlements["rotation"][last[index[found]]]
+                return deflections, rotations
+
+        # Project files (.dmf): a small JSON header followed by raw arrays
+        # layout: magic (8 bytes), header size (uint64), header, arrays aligned to 64 bytes
+        project_magic = b"DMFPROJ1"
+        project_alignment = 64
+        result_names = ("node_positions", "deflections", "slopes", "moments", "shears", "normals")
+
+        # Method to save inputs and (if solved) results to a project file
+        def save_project(self, path):
+                path = os.path.abspath(path)
+                arrays = {
+                        "supports": self.supports.view,
+                        "point_loads": self.point_loads.view,
+                        "loads": self.loads.view,
+                        "sections": self.sections.view,
+                        "foundations": self.foundations.view,
+                        "springs": self.springs.view,
+                        "settlements": self.settlements.view,
+                        "thermal_loads": self.thermal_loads.view,
+                        "order_of_efforts": (np.array(self.order_of_efforts, dtype="U5") == "point").astype(np.uint8),
+                }
+                if self.solved:
+                        for name in self.result_names:
+                                result = getattr(self, name)
+                                # Results mapped from the file being overwritten must be read first
+                                if isinstance(result, np.memmap) and result.filename is not None and os.path.abspath(result.filename) == path:
+                                        result = np.array(result)
+                                        setattr(self, name, result)
+                                arrays[name] = result
+
+                header = {
+                        "length": self.length,
+                        "materials": self.materials,
+                        "total_node_num": self.total_node_num,
+                        "solved": self.solved,
+                        "arrays": {},
+                }
+
+                # Offsets are relative to the end of the header, which is padded to the alignment
+                offset = 0
+                for name, array in arrays.items():
+                        header["arrays"][name] = {"offset": offset, "dtype": np.lib.format.dtype_to_descr(array.dtype), "shape": array.shape}
+                        offset += -(-array.nbytes // self.project_alignment) * self.project_alignment
+
+                header_bytes = json.dumps(header).encode()
+                start = len(self.project_magic) + 8 + len(header_bytes)
+                header_bytes += b" " * (-start % self.project_alignment)
+
+                with open(path, "wb") as file:
+                        file.write(self.project_magic)
+                        file.write(np.uint64(len(header_bytes)).tobytes())
+                        file.write(header_bytes)
+                        for name, array in arrays.items():
+                                np.ascontiguousarray(array).tofile(file)
+                                file.write(b"\0" * (-array.nbytes % self.project_alignment))
+                return True
+
+        # Method to load a project file
+        # results are memory-mapped (read-only), so opening a large solved project copies nothing
+        def load_project(self, path):
+                with open(path, "rb") as file:
+                        if file.read(len(self.project_magic)) != self.project_magic:
+                                raise ValueError(f"{path} is not a project file")
+                        header_size = int(np.frombuffer(file.read(8), dtype=np.uint64)[0])
+                        header = json.loads(file.read(header_size))
+                data_start = len(self.project_magic) + 8 + header_size
+
+                arrays = {}
+                for name, info in header["arrays"].items():
+                        descr = info["dtype"]
+                        # JSON turns the (name, type) pairs of structured dtypes into lists
+                        if isinstance(descr, list):
+                                descr = [tuple(field) for field in descr]
+                        dtype = np.lib.format.descr_to_dtype(descr)
+                        shape = tuple(info["shape"])
+                        if not np.prod(shape):
+                                arrays[name] = np.zeros(shape, dtype=dtype)
+                                continue
+                        arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=data_start + info["offset"], shape=shape)
+
+                self.length = header["length"]
+                self.materials = dict(header["materials"])
+                self.total_node_num = header["total_node_num"]
+
+                # Inputs are small, they are copied into the element arrays
+                self.supports.replace(arrays["supports"])
+                self.point_loads.replace(arrays["point_loads"])
+                self.loads.replace(arrays["loads"])
+                # Projects saved before these elements existed have none of them
+                for name in ("sections", "foundations", "springs", "settlements", "thermal_loads"):
+                        elements = getattr(self, name)
+                        elements.replace(arrays.get(name, np.zeros(0, dtype=elements.dtype)))
+                self.order_of_efforts = np.where(arrays["order_of_efforts"] == 1, "point", "load").tolist()
+
+                self.solved = header["solved"]
+                self.stats = SolveStats()
+                self._factorization = None
+                self._factorization_key = None
+                if self.solved:
+                        for name in self.result_names:
+                                # Projects saved before axial forces were solved have no normals
+                                setattr(self, name, arrays[name] if name in arrays else np.zeros(self.total_node_num))
+
+                # The opened project starts a new history, undo cannot go back to the previous one
+                self.history = []
+                self.history_index = -1
+                self._cached_solutions = []
+                self._record_state()
+                if self.solved:
+                        self._store_solution()
+                return True
+
+        # Diagrams written by export_results, with the node where each one starts
+        # (moments and shears are only computed from node 2 on)
+        export_columns = (("deflections", 0), ("slopes", 0), ("moments", 2), ("shears", 2), ("normals", 0))
+
+        # Method to export the diagrams to a .csv or .npy file, written in chunks of rows
+        # so memory use does not grow with the number of nodes
+        # spacing: if given, values are interpolated at stations every `spacing` instead of at each node
+        def export_results(self, path, spacing:float = None, chunk_size:int = 65536):
+                if not self.solved:
+                        return False
+
+                N = self.total_node_num
+                h = self.length / (N - 1)
+
+                # Stations as fractional node indices
+                if spacing is None:
+                        num_rows = N
+                        station_scale = 1.0
+                else:
+                        num_rows = int(np.floor(self.length / spacing + 1e-9)) + 1
+                        station_scale = spacing / h
+                        # Always finish at the end of the beam
+                        add_end = (num_rows - 1) * spacing < self.length * (1 - 1e-12)
+                        num_rows += add_end
+
+                header = "position," + ",".join(name for name, _ in self.export_columns)
+                extension = os.path.splitext(path)[1].lower()
+                if extension not in (".csv", ".npy"):
+                        raise ValueError(f"Unknown export format '{extension}', use .csv or .npy")
+
+                row_format = ",".join(["%.10e"] * (1 + len(self.export_columns))) + "\n"
+                with open(path, "w" if extension == ".csv" else "wb") as file:
+                        if extension == ".csv":
+                                file.write(header + "\n")
+                        else:
+                                np.lib.format.write_array_header_1_0(file, {"descr": "<f8", "fortran_order": False, "shape": (num_rows, 1 + len(self.export_columns))})
+
+                        for start in range(0, num_rows, chunk_size):
+                                u = np.arange(start, min(start + chunk_size, num_rows)) * station_scale
+                                u = np.minimum(u, N - 1)
+                                if spacing is not None and add_end and start + len(u) == num_rows:
+                                        u[-1] = N - 1
+
+                                block = np.empty((len(u), 1 + len(self.export_columns)))
+                                block[:, 0] = u * h
+                                for column, (name, first) in enumerate(self.export_columns, start=1):
+                                        block[:, column] = self._diagram_at(getattr(self, name), first, u)
+
+                                if extension == ".csv":
+                                        # One formatting operation per chunk
+                                        file.write(row_format * len(block) % tuple(block.ravel()))
+                                else:
+                                        block.tofile(file)
+                return True
+
+        # Values of a diagram at fractional node indices u, interpolated linearly
+        # `first` is the node of values[0]; nan where the diagram is not defined
+        def _diagram_at(self, values, first, u):
+                u = u - first
+                n = len(values)
+                inside = (u >= 0) & (u <= n - 1)
+                i = np.clip(np.floor(u).astype(int), 0, max(n - 2, 0))
+                t = u - i
+                result = values[i] * (1 - t) + values[np.minimum(i + 1, n - 1)] * t
+                result[~inside] = np.nan
+                return result
+
 # This class handles drawing on the canvas
 class Pencil():
         # Initialize the pencil with drawing properties
@@ -591,26 +3441,465 @@ class Pencil():
                         font = f"TkDefaultFont {int(height / 3)}"
                 )
 
-# main application window (GUI)
-class View(tk.Tk):
-        # Initialize the view
-        def __init__(self, controller):
-                super().__init__("View")
-                self.controller = controller
-                self.font = ("Helvetica", 10, "bold")
-                # Set window size
-                self.geometry("1000x700")
-                # Create a pencil for drawing
-                self.pencil = Pencil(self)
-                self.pack_propagate = False
-                # if true, adds gui elements for viewing graphs
-                self.view_solution:bool = False
-                self.solution_mode = "deflection"
-                
-                # Define padding on the sides of the canvas
-                self.canvas_padx = 50
-                
-                # Set terminal variables
+        # Draws a vertical zigzag spring from (x, y0) down to (x, y1) in canvas coordinates
+        def _draw_zigzag(self, x:float, y0:float, y1:float, canvas:tk.Canvas, width:float, turns:int = 4):
+                ys = np.linspace(y0, y1, 2 * turns + 3)
+                xs = np.full(len(ys), x)
+                xs[1:-1:2] -= width / 2
+                xs[2:-1:2] += width / 2
+                # Straight ends above and below the coils
+                xs[[1, -2]] = x
+                canvas.create_line(*np.stack((xs, ys), axis=1).ravel(), width=self.line_width, fill=self.sup_fill)
+
+        # Draws a spring support, with a circle around the node if it also resists rotation
+        def draw_spring(self, beam_position:float, height:float, canvas:tk.Canvas, stiffness:float = 1, rotational:float = 0):
+                beam_length = self.view.controller.model.length
+                x0 = self.view.canvas_padx + (canvas.winfo_width() - 2*self.view.canvas_padx)*(beam_position / beam_length)
+                y0 = self.view.beam_y
+
+                if stiffness > 0:
+                        self._draw_zigzag(x0, y0, y0 + height, canvas, width=height / 3)
+                        canvas.create_line((x0 - height / 3, y0 + height), (x0 + height / 3, y0 + height), width=self.line_width, fill=self.line_color)
+                if rotational > 0:
+                        self.create_circle(canvas, (x0, y0), height / 4, width=self.line_width, outline=self.sup_fill)
+
+        # Draws an elastic foundation as a row of small springs on the ground
+        def draw_foundation(self, pos_limits:tuple, height:float, canvas:tk.Canvas):
+                beam_length = self.view.controller.model.length
+                x0, x1 = pos_limits
+                x0 = self.view.canvas_padx + (canvas.winfo_width() - 2*self.view.canvas_padx)*(x0 / beam_length)
+                x1 = self.view.canvas_padx + (canvas.winfo_width() - 2*self.view.canvas_padx)*(x1 / beam_length)
+                y0 = self.view.beam_y
+
+                for x in np.linspace(x0, x1, max(int(abs(x1 - x0) / (height / 2)), 2)):
+                        self._draw_zigzag(x, y0, y0 + height / 2, canvas, width=height / 6, turns=2)
+                canvas.create_line((x0, y0 + height / 2), (x1, y0 + height / 2), width=self.line_width, fill=self.line_color)
+
+        # Draws the beam with its supports, foundations, springs and loads
+        # (the main canvas of the View, or any object with the same drawing methods)
+        def draw_schematic(self, canvas:tk.Canvas):
+                model = self.view.controller.model
+                # Get current canvas dimensions
+                canvas_w, canvas_h = canvas.winfo_width(), canvas.winfo_height()
+
+                # Define the y-position of the beam on the canvas
+                self.view.beam_y = canvas_h / 2
+
+                std_height = canvas_h / 8
+
+                # Draw the main beam line
+                canvas.create_line(
+                (self.view.canvas_padx, self.view.beam_y),
+                (canvas_w - self.view.canvas_padx, self.view.beam_y),
+                width = 3, fill="black"
+                )
+
+                # Draw all saved supports
+                for support_pos, support_type in model.supports:
+                        # Call the appropriate drawing function from the mapper
+                        self.mapper[support_type](support_pos, std_height, canvas=canvas)
+
+                # Draw the elastic foundations and springs
+                for start, end, _ in model.foundations:
+                        self.draw_foundation((start, end), std_height, canvas=canvas)
+                for spring_pos, stiffness, rotational in model.springs:
+                        self.draw_spring(spring_pos, std_height, canvas=canvas, stiffness=stiffness, rotational=rotational)
+
+                # Draw all saved point forces
+                for magnitude, force_pos, angle in model.point_loads:
+                        self.draw_point_load(beam_position=force_pos, height=std_height, canvas=canvas, angle=angle, magnitude=magnitude)
+
+                # Draw all saved distributed loads
+                for pos_limits, magnitude in model.loads:
+                        self.draw_load(pos_limits=pos_limits, height=std_height, canvas=canvas, magnitude=magnitude)
+
+        # Values of a solved diagram as they are drawn (moments are drawn with the opposite sign)
+        @staticmethod
+        def diagram_values(model, mode:str):
+                match mode:
+                        case "deflection":
+                                return model.deflections
+                        case "moment":
+                                return -np.asarray(model.moments)
+                        case "shear":
+                                return model.shears
+                        case "slope":
+                                return model.slopes
+                        case "normal":
+                                return model.normals
+                raise ValueError(f"Unknown diagram '{mode}'")
+
+        # Draws a diagram (one value per node, spread over the beam) as a red line about the beam
+        # scale is the value drawn at full height (default: the largest value of the diagram)
+        def draw_diagram(self, y_values, canvas:tk.Canvas, scale:float = None):
+                canvas_w, canvas_h = canvas.winfo_width(), canvas.winfo_height()
+                padx = self.view.canvas_padx
+
+                max_abs_point = scale or abs(max(y_values.min(), y_values.max(), key=abs)) or 1.0
+                std_height = canvas_h / 5
+                sol_beam_y = canvas_h / 2
+
+                # draw line that represents beam
+                canvas.create_line(
+                        (padx, sol_beam_y),
+                        (canvas_w - padx, sol_beam_y),
+                        width = 3, fill="black"
+                )
+
+                # Large models have many nodes per pixel, only the extremes of each pixel column are drawn
+                x_values, y_values = self.decimate(np.linspace(0, 1, len(y_values)), y_values, max(int(canvas_w - 2 * padx), 1))
+
+                # define points in canvas coords
+                xs = padx + x_values * (canvas_w - 2 * padx)
+                ys = sol_beam_y - (np.asarray(y_values) / max_abs_point) * std_height
+
+                # draw graph
+                canvas.create_line(*np.stack((xs, ys), axis=1).ravel(), width = 2, fill = "red")
+
+        # Reduces a line of many points to the first, lowest, highest and last point of each of `columns` groups
+        # when a group spans one pixel column it is drawn the same as all its points
+        @staticmethod
+        def decimate(x_values, y_values, columns:int):
+                n = len(y_values)
+                if n <= 4 * columns:
+                        return x_values, y_values
+
+                starts = np.linspace(0, n, columns + 1).astype(np.int64)[:-1]
+                ends = np.append(starts[1:], n) - 1
+                low = np.minimum.reduceat(y_values, starts)
+                high = np.maximum.reduceat(y_values, starts)
+
+                x = np.stack((x_values[starts], x_values[starts], x_values[ends], x_values[ends]), axis=1).ravel()
+                y = np.stack((y_values[starts], low, high, y_values[ends]), axis=1).ravel()
+                return x, y
+
+# This class records the tk.Canvas drawing calls used by Pencil and writes them to an .svg or .png file,
+# so beams can be drawn without a display
+class ImageCanvas():
+        # Colors by name for the .png files (.svg files keep the names)
+        colors = {
+                "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0), "green": (0, 128, 0),
+                "blue": (0, 0, 255), "yellow": (255, 255, 0), "orange": (255, 165, 0), "gray": (190, 190, 190), "grey": (190, 190, 190),
+        }
+
+        # 5x7 bitmaps (one int per row) of the characters written in .png files: the numbers Pencil writes
+        # other characters are left blank, .svg files have all the text
+        glyphs = {
+                "0": (14, 17, 19, 21, 25, 17, 14), "1": (4, 12, 4, 4, 4, 4, 14), "2": (14, 17, 1, 2, 4, 8, 31),
+                "3": (31, 2, 4, 2, 1, 17, 14), "4": (2, 6, 10, 18, 31, 2, 2), "5": (31, 16, 30, 1, 1, 17, 14),
+                "6": (6, 8, 16, 30, 17, 17, 14), "7": (31, 1, 2, 4, 8, 8, 8), "8": (14, 17, 17, 14, 17, 17, 14),
+                "9": (14, 17, 17, 15, 1, 2, 12), ".": (0, 0, 0, 0, 0, 12, 12), "-": (0, 0, 0, 31, 0, 0, 0),
+                "+": (0, 4, 4, 31, 4, 4, 0), "e": (0, 0, 14, 17, 31, 16, 14), "E": (31, 16, 16, 30, 16, 16, 31),
+        }
+
+        def __init__(self, width:int, height:int, background:str = "white"):
+                self.width = width
+                self.height = height
+                self.background = background
+                self.items = []
+
+        def winfo_width(self):
+                return self.width
+
+        def winfo_height(self):
+                return self.height
+
+        def config(self, bg:str = None, **options):
+                if bg is not None:
+                        self.background = bg
+
+        def delete(self, *tags):
+                self.items.clear()
+
+        # Points given as (x, y) pairs or as flat coordinates, as tk.Canvas takes them
+        @staticmethod
+        def _points(coords):
+                return np.asarray(coords, dtype=float).reshape(-1, 2)
+
+        def create_line(self, *coords, width = 1, fill = "black", arrow = None, arrowshape = (8, 10, 3), **options):
+                points = self._points(coords)
+                # The arrowheads are polygons at the ends of the line, the line stops at their neck
+                for end, previous, side in ((-1, -2, tk.LAST), (0, 1, tk.FIRST)):
+                        if arrow in (side, tk.BOTH) and len(points) > 1:
+                                points[end], head = self._arrowhead(points[end], points[previous], arrowshape, width)
+                                self.items.append(("polygon", head, fill, "", 0))
+                self.items.append(("line", points, fill, width))
+                return len(self.items)
+
+        # Tk arrowshape: distance from the tip to the neck, from the tip to the trailing points,
+        # and from the outside of the line to the trailing points
+        @staticmethod
+        def _arrowhead(tip, previous, arrowshape, width):
+                neck_length, trail_length, trail_width = arrowshape
+                direction = tip - previous
+                direction = direction / (np.linalg.norm(direction) or 1.0)
+                normal = np.array([-direction[1], direction[0]]) * (trail_width + width / 2)
+                neck = tip - neck_length * direction
+                base = tip - trail_length * direction
+                return neck, np.array([tip, base + normal, neck, base - normal])
+
+        def create_polygon(self, *coords, width = 1, fill = "black", outline = "", **options):
+                self.items.append(("polygon", self._points(coords), fill, outline, width))
+                return len(self.items)
+
+        def create_oval(self, x0, y0, x1, y1, width = 1, fill = "", outline = "black", **options):
+                self.items.append(("oval", np.array([[x0, y0], [x1, y1]], dtype=float), fill, outline, width))
+                return len(self.items)
+
+        def create_text(self, *coords, text = "", fill = "black", font = None, anchor = "center", **options):
+                # Tk font sizes are in points (negative sizes are in pixels), the files use pixels
+                if isinstance(font, tuple):
+                        size = font[1]
+                else:
+                        parts = str(font or "").split()
+                        size = int(parts[-1]) if parts and parts[-1].lstrip("-").isdigit() else 9
+                pixels = -size if size < 0 else size * 4 / 3
+                self.items.append(("text", self._points(coords)[0], fill, str(text), pixels, anchor))
+                return len(self.items)
+
+        # Writes the drawing, the format is given by the extension (.svg or .png)
+        def save(self, path):
+                if str(path).lower().endswith(".png"):
+                        with open(path, "wb") as file:
+                                file.write(self.to_png())
+                else:
+                        with open(path, "w") as file:
+                                file.write(self.to_svg())
+                return path
+
+        def to_svg(self):
+                def points(values):
+                        return " ".join(f"{x:.1f},{y:.1f}" for x, y in values)
+
+                lines = [
+                        f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" viewBox="0 0 {self.width} {self.height}">',
+                        f'<rect width="100%" height="100%" fill="{self.background}"/>',
+                ]
+                for kind, coords, fill, *rest in self.items:
+                        if kind == "line":
+                                lines.append(f'<polyline points="{points(coords)}" fill="none" stroke="{fill}" stroke-width="{rest[0]}" stroke-linejoin="round"/>')
+                        elif kind == "polygon":
+                                outline, width = rest
+                                stroke = f' stroke="{outline}" stroke-width="{width}"' if outline else ""
+                                lines.append(f'<polygon points="{points(coords)}" fill="{fill or "none"}"{stroke}/>')
+                        elif kind == "oval":
+                                outline, width = rest
+                                (x0, y0), (x1, y1) = coords
+                                stroke = f' stroke="{outline}" stroke-width="{width}"' if outline else ""
+                                lines.append(f'<ellipse cx="{(x0 + x1) / 2:.1f}" cy="{(y0 + y1) / 2:.1f}" rx="{abs(x1 - x0) / 2:.1f}" ry="{abs(y1 - y0) / 2:.1f}" fill="{fill or "none"}"{stroke}/>')
+                        else:
+                                text, pixels, anchor = rest
+                                horizontal = "start" if "w" in anchor else "end" if "e" in anchor and anchor != "center" else "middle"
+                                vertical = "hanging" if anchor.startswith("n") else "auto" if anchor.startswith("s") else "central"
+                                text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+                                lines.append(f'<text x="{coords[0]:.1f}" y="{coords[1]:.1f}" fill="{fill}" font-family="sans-serif" font-size="{pixels:.1f}" text-anchor="{horizontal}" dominant-baseline="{vertical}">{text}</text>')
+                lines.append("</svg>")
+                return "\n".join(lines) + "\n"
+
+        @classmethod
+        def _rgb(cls, color):
+                if color.startswith("#"):
+                        digits = color[1:]
+                        step = len(digits) // 3
+                        return tuple(int(digits[i * step:(i + 1) * step].ljust(2, digits[i * step]), 16) for i in range(3))
+                return cls.colors.get(color.lower(), (0, 0, 0))
+
+        # Pixel centers of the image inside a bounding box, with the slices of the box
+        @staticmethod
+        def _box(shape, x0, y0, x1, y1):
+                i0, i1 = max(int(np.floor(y0)), 0), min(int(np.ceil(y1)) + 1, shape[0])
+                j0, j1 = max(int(np.floor(x0)), 0), min(int(np.ceil(x1)) + 1, shape[1])
+                if i0 >= i1 or j0 >= j1:
+                        return None, None, None
+                ys, xs = np.mgrid[i0:i1, j0:j1] + 0.5
+                return (slice(i0, i1), slice(j0, j1)), xs, ys
+
+        # Stamps a disk as wide as the line every half pixel along it (all segments at once)
+        def _draw_segments(self, image, points, color, width):
+                half = max(width / 2, 0.5)
+                steps = np.maximum(np.ceil(2 * np.hypot(*np.diff(points, axis=0).T)).astype(np.int64), 1)
+                segments = np.repeat(np.arange(len(steps)), steps)
+                t = (np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)) / np.repeat(steps, steps)
+                samples = np.vstack((points[segments] + t[:, None] * (points[segments + 1] - points[segments]), points[-1:]))
+                samples = samples[np.isfinite(samples).all(axis=1)]
+
+                r = int(np.ceil(half))
+                dy, dx = (offsets.ravel() for offsets in np.mgrid[-r:r + 1, -r:r + 1])
+                xs = np.floor(samples[:, :1]).astype(np.int64) + dx
+                ys = np.floor(samples[:, 1:]).astype(np.int64) + dy
+                inside = ((xs + 0.5 - samples[:, :1])**2 + (ys + 0.5 - samples[:, 1:])**2 <= half**2)
+                inside &= (xs >= 0) & (xs < image.shape[1]) & (ys >= 0) & (ys < image.shape[0])
+                image[ys[inside], xs[inside]] = color
+
+        def _fill_polygon(self, image, points, color):
+                box, xs, ys = self._box(image.shape, *points.min(axis=0), *points.max(axis=0))
+                if box is None:
+                        return
+                # Even-odd rule, as Tk fills polygons
+                inside = np.zeros(xs.shape, dtype=bool)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                        for (ax, ay), (bx, by) in zip(points, np.roll(points, -1, axis=0)):
+                                crosses = (ay > ys) != (by > ys)
+                                inside ^= crosses & (xs < ax + (ys - ay) * (bx - ax) / (by - ay))
+                image[box][inside] = color
+
+        def _draw_oval(self, image, corners, fill, outline, width):
+                (x0, y0), (x1, y1) = np.sort(corners, axis=0)
+                half = width / 2 if outline else 0
+                box, xs, ys = self._box(image.shape, x0 - half, y0 - half, x1 + half, y1 + half)
+                if box is None:
+                        return
+                rx, ry = max((x1 - x0) / 2, 0.5), max((y1 - y0) / 2, 0.5)
+                # Approximate distance to the ellipse, in pixels
+                distance = (np.sqrt(((xs - (x0 + x1) / 2) / rx)**2 + ((ys - (y0 + y1) / 2) / ry)**2) - 1) * min(rx, ry)
+                if fill:
+                        image[box][distance <= 0] = self._rgb(fill)
+                if outline:
+                        image[box][np.abs(distance) <= max(half, 0.5)] = self._rgb(outline)
+
+        def _draw_text(self, image, position, color, text, pixels, anchor, scale):
+                # Each bitmap is 5x7 with one column of space between characters
+                cell = pixels * scale / 9
+                bitmap = np.zeros((7, 6 * len(text)), dtype=bool)
+                for k, character in enumerate(text):
+                        for row, bits in enumerate(self.glyphs.get(character, (0,) * 7)):
+                                bitmap[row, 6 * k:6 * k + 5] = [(bits >> (4 - c)) & 1 for c in range(5)]
+                width, height = bitmap.shape[1] * cell, 7 * cell
+                x, y = position * scale
+                x -= 0 if "w" in anchor else width if "e" in anchor and anchor != "center" else width / 2
+                y -= 0 if anchor.startswith("n") else height if anchor.startswith("s") else height / 2
+
+                box, xs, ys = self._box(image.shape, x, y, x + width, y + height)
+                if box is None:
+                        return
+                rows, columns = ((ys - y) / cell).astype(int), ((xs - x) / cell).astype(int)
+                inside = (rows >= 0) & (rows < 7) & (columns >= 0) & (columns < bitmap.shape[1])
+                mask = np.zeros(xs.shape, dtype=bool)
+                mask[inside] = bitmap[rows[inside], columns[inside]]
+                image[box][mask] = color
+
+        # Draws the items on a grid `scale` times finer than the image and averages it, which smooths the edges
+        def to_array(self, scale:int = 2):
+                image = np.empty((self.height * scale, self.width * scale, 3), dtype=np.uint8)
+                image[:] = self._rgb(self.background)
+                for kind, coords, fill, *rest in self.items:
+                        if kind == "line":
+                                self._draw_segments(image, coords * scale, self._rgb(fill), rest[0] * scale)
+                        elif kind == "polygon":
+                                outline, width = rest
+                                if fill:
+                                        self._fill_polygon(image, coords * scale, self._rgb(fill))
+                                if outline:
+                                        self._draw_segments(image, np.vstack((coords, coords[:1])) * scale, self._rgb(outline), width * scale)
+                        elif kind == "oval":
+                                self._draw_oval(image, coords * scale, fill, rest[0], rest[1] * scale)
+                        else:
+                                self._draw_text(image, coords, self._rgb(fill), *rest, scale)
+                total = np.full((self.height, self.width, 3), scale**2 // 2, dtype=np.uint32)
+                for i in range(scale):
+                        for j in range(scale):
+                                total += image[i::scale, j::scale]
+                return (total // scale**2).astype(np.uint8)
+
+        # 8-bit RGB .png, rows without filtering, compressed with zlib
+        def to_png(self, scale:int = 2):
+                image = self.to_array(scale)
+                rows = np.concatenate((np.zeros((self.height, 1), dtype=np.uint8), image.reshape(self.height, -1)), axis=1)
+
+                def chunk(kind, data):
+                        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+                return (
+                        b"\x89PNG\r\n\x1a\n"
+                        + chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+                        + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6))
+                        + chunk(b"IEND", b"")
+                )
+
+
+# This class draws models without a display (batch results, reports):
+# it stands in for the View of a Pencil, which draws on ImageCanvas objects instead of the window
+class Renderer():
+        def __init__(self, model:Model, width:int = 1000, height:int = 300, canvas_padx:int = 50):
+                # Pencil reaches the model through view.controller.model
+                self.controller = self
+                self.model = model
+                self.width = width
+                self.height = height
+                self.canvas_padx = canvas_padx
+                self.beam_y = height / 2
+                self.pencil = Pencil(self)
+
+        # Draws the beam with its supports and loads, as on the main canvas
+        def draw_beam(self):
+                canvas = ImageCanvas(self.width, self.height)
+                self.pencil.draw_schematic(canvas)
+                return canvas
+
+        # Draws a solved diagram (deflection, moment, shear, slope or normal), as on the terminal canvas
+        def draw_solved_beam(self, mode:str, scale:float = None):
+                canvas = ImageCanvas(self.width, self.height)
+                self.pencil.draw_diagram(Pencil.diagram_values(self.model, mode), canvas, scale)
+                return canvas
+
+        # Writes the figures of one model: source is a Model or a project file,
+        # outputs are (path, mode) pairs, mode None for the beam and a diagram name otherwise
+        # unsolved models are solved first; returns None or the error message
+        @staticmethod
+        def render_job(job, width:int = 1000, height:int = 300):
+                source, outputs = job
+                model = source
+                try:
+                        if not isinstance(source, Model):
+                                model = Model()
+                                model.load_project(source)
+                        if any(mode is not None for _, mode in outputs) and not model.solved and not model.solve_FDM():
+                                return model.stats.error
+                        renderer = Renderer(model, width, height)
+                        for path, mode in outputs:
+                                canvas = renderer.draw_beam() if mode is None else renderer.draw_solved_beam(mode)
+                                canvas.save(path)
+                except (OSError, ValueError, KeyError) as e:
+                        return str(e)
+                return None
+
+        # Renders many jobs (see render_job) on `workers` processes (default: one per CPU)
+        # returns the error message of each job, None when its figures were written
+        @staticmethod
+        def render_batch(jobs, workers:int = None, width:int = 1000, height:int = 300):
+                jobs = list(jobs)
+                workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+                render = partial(Renderer.render_job, width=width, height=height)
+                if workers == 1:
+                        return [render(job) for job in jobs]
+                with ProcessPoolExecutor(workers) as pool:
+                        return list(pool.map(render, jobs, chunksize=max(len(jobs) // (4 * workers), 1)))
+
+# main application window (GUI)
+class View(tk.Tk):
+        # Initialize the view
+        def __init__(self, controller):
+                super().__init__(className="View")
+                self.controller = controller
+                self.font = ("Helvetica", 10, "bold")
+                # Set window size
+                self.geometry("1000x700")
+                # Create a pencil for drawing
+                self.pencil = Pencil(self)
+                self.pack_propagate = False
+                # if true, adds gui elements for viewing graphs
+                self.view_solution:bool = False
+                self.solution_mode = "deflection"
+                # Mode shape drawn when solution_mode is "mode"
+                self.mode_index = 0
+                # Time history frames played when solution_mode is "frame"
+                self.frames = None
+                self.frame_index = 0
+                
+                # Define padding on the sides of the canvas
+                self.canvas_padx = 50
+                
+                # Set terminal variables
                 self.terminal_messages = []
                 self.terminal_color = "#eeeeee"
 
@@ -673,6 +3962,7 @@ class View(tk.Tk):
                 self.supports_gui()
                 self.loads_gui()
                 self.solve_gui()
+                self.project_gui()
 
         def terminal_gui(self):
                 self.terminal_canvas = tk.Canvas(self.terminal_frame, bg=self.terminal_color, bd=2, relief="groove")
@@ -749,6 +4039,35 @@ class View(tk.Tk):
                         )
                 ).pack(pady=2)
 
+                # Sections with their own I (non-prismatic beams), E is the beam's
+                section_frame = ttk.Frame(self.control_frame)
+                section_I_frame = ttk.Frame(self.control_frame)
+                section_buttons = ttk.Frame(self.control_frame)
+                section_frame.pack(pady=1)
+                section_I_frame.pack(pady=1)
+                section_buttons.pack(pady=2)
+
+                self.section_pos_var = tk.StringVar(value="")
+                self.section_I_var = tk.StringVar(value="")
+
+                ttk.Label(section_frame, text="Section (m)", font=self.font, width=10).pack(side="left")
+                ttk.Entry(section_frame, textvariable=self.section_pos_var).pack(fill="x", side="left")
+
+                # "I" for a stepped section, "I start;I end" for a tapered one
+                ttk.Label(section_I_frame, text="Sec. I (m^4)", font=self.font, width=10).pack(side="left")
+                ttk.Entry(section_I_frame, textvariable=self.section_I_var).pack(fill="x", side="left")
+
+                ttk.Button(
+                        section_buttons,
+                        text="Add Section",
+                        command=lambda: self.controller.add_section(self.section_pos_var.get(), self.section_I_var.get())
+                ).grid(row=0, column=0, padx=2)
+                ttk.Button(
+                        section_buttons,
+                        text="Remove Section",
+                        command=self.controller.remove_last_section
+                ).grid(row=0, column=1, padx=2)
+
         # Creates the GUI elements for adding/removing supports
         def supports_gui(self):
                 # Support controls section
@@ -815,6 +4134,67 @@ class View(tk.Tk):
                         command=self.controller.remove_last_support      
                 ).pack(side="left", padx = 2)
 
+                # Button to import many supports from a file
+                ttk.Button(
+                        self.control_frame,
+                        text="Import Supports",
+                        command=lambda: self.controller.import_supports(
+                                path=filedialog.askopenfilename(filetypes=[("Supports", "*.csv *.txt"), ("All files", "*")]),
+                                support_type=self.Var1.get()*"x" + self.Var2.get()*"y" + self.Var3.get()*"z"
+                        )
+                ).pack(pady=2)
+
+                # Springs at the positions above ("k" in N/m or "k;k rotational" in N*m/rad)
+                # and foundations between them ("start;end", modulus in N/m per m)
+                spring_frame = ttk.Frame(self.control_frame)
+                spring_frame.pack(pady=5)
+                ttk.Label(spring_frame, text="Stiffness", font=self.font, width=10).pack(side="left", padx=2)
+                self.spring_strgvar = tk.StringVar(value="")
+                ttk.Entry(spring_frame, textvariable=self.spring_strgvar, width = 12).pack(side="left")
+
+                spring_button_frame = ttk.Frame(self.control_frame)
+                spring_button_frame.pack(pady=2)
+                ttk.Button(
+                        spring_button_frame,
+                        text="Add Spring",
+                        command=lambda: self.controller.add_spring(self.support_pos_strgvar.get(), self.spring_strgvar.get())
+                ).grid(row=0, column=0, padx=2, pady=1)
+                ttk.Button(
+                        spring_button_frame,
+                        text="Remove Spring",
+                        command=self.controller.remove_last_spring
+                ).grid(row=0, column=1, padx=2, pady=1)
+                ttk.Button(
+                        spring_button_frame,
+                        text="Add Foundation",
+                        command=lambda: self.controller.add_foundation(self.support_pos_strgvar.get(), self.spring_strgvar.get())
+                ).grid(row=1, column=0, padx=2, pady=1)
+                ttk.Button(
+                        spring_button_frame,
+                        text="Remove Found.",
+                        command=self.controller.remove_last_foundation
+                ).grid(row=1, column=1, padx=2, pady=1)
+
+                # Settlement of the support at the position above ("w" in m or "w;rotation" in rad)
+                settlement_frame = ttk.Frame(self.control_frame)
+                settlement_frame.pack(pady=5)
+                ttk.Label(settlement_frame, text="Settlement", font=self.font, width=10).pack(side="left", padx=2)
+                self.settlement_strgvar = tk.StringVar(value="")
+                ttk.Entry(settlement_frame, textvariable=self.settlement_strgvar, width = 12).pack(side="left")
+
+                settlement_button_frame = ttk.Frame(self.control_frame)
+                settlement_button_frame.pack(pady=2)
+                ttk.Button(
+                        settlement_button_frame,
+                        text="Settle Support",
+                        command=lambda: self.controller.add_settlement(self.support_pos_strgvar.get(), self.settlement_strgvar.get())
+                ).pack(side="left", padx=2)
+                ttk.Button(
+                        settlement_button_frame,
+                        text="Remove Settle.",
+                        command=self.controller.remove_last_settlement
+                ).pack(side="left", padx=2)
+
         # Creates the GUI elements for adding/removing forces and loads
         def loads_gui(self):
                 # Title for the loads section
@@ -868,6 +4248,47 @@ class View(tk.Tk):
                         text="Remove Force",
                         command=self.controller.remove_last_effort
                 ).pack(side="left", padx=2)
+
+                # Buttons to import many forces or loads from a file
+                import_frame = ttk.Frame(self.control_frame)
+                import_frame.pack(pady = 2)
+                load_filetypes = [("Load arrays", "*.csv *.npy"), ("All files", "*")]
+
+                ttk.Button(
+                        import_frame,
+                        text="Import Forces",
+                        command=lambda: self.controller.import_point_loads(
+                                path=filedialog.askopenfilename(filetypes=load_filetypes)
+                        )
+                ).pack(side="left", padx=2)
+
+                ttk.Button(
+                        import_frame,
+                        text="Import Loads",
+                        command=lambda: self.controller.import_distributed_loads(
+                                path=filedialog.askopenfilename(filetypes=load_filetypes)
+                        )
+                ).pack(side="left", padx=2)
+
+                # Thermal gradient over the position range above ("dT;depth", bottom minus top in K, depth in m)
+                thermal_frame = ttk.Frame(self.control_frame)
+                thermal_frame.pack(pady=lines_pady)
+                ttk.Label(thermal_frame, text="Thermal", font=self.font, width=10).pack(side="left", padx=2)
+                self.thermal_strgvar = tk.StringVar(value="")
+                ttk.Entry(thermal_frame, textvariable=self.thermal_strgvar, width = 12).pack()
+
+                thermal_button_frame = ttk.Frame(self.control_frame)
+                thermal_button_frame.pack(pady = 2)
+                ttk.Button(
+                        thermal_button_frame,
+                        text="Add Thermal",
+                        command=lambda: self.controller.add_thermal_load(self.load_pos_strgvar.get(), self.thermal_strgvar.get())
+                ).pack(side="left", padx=2)
+                ttk.Button(
+                        thermal_button_frame,
+                        text="Remove Thermal",
+                        command=self.controller.remove_last_thermal_load
+                ).pack(side="left", padx=2)
         
         # Creates the GUI element for solving the beam problem
         def solve_gui(self):
@@ -912,6 +4333,192 @@ class View(tk.Tk):
                         command=lambda: self.controller.view_graph_button_clicked("deflection")
                 ).grid(row=1, column=1, padx=2, pady=2)
 
+                # See Normal force
+                ttk.Button(
+                        self.after_solve_frame,
+                        text="Normal",
+                        command=lambda: self.controller.view_graph_button_clicked("normal")
+                ).grid(row=2, column=0, padx=2, pady=2)
+
+                # Second order (P-Delta) analysis
+                self.second_order_boolvar = tk.BooleanVar(value=False)
+                ttk.Checkbutton(
+                        self.after_solve_frame,
+                        text="P-Delta",
+                        variable=self.second_order_boolvar,
+                        command=lambda: self.controller.set_second_order(self.second_order_boolvar.get())
+                ).grid(row=2, column=1, padx=2, pady=2)
+
+                # Modal analysis: vibrating mass and number of modes
+                line2 = tk.Frame(self.control_frame)
+                line2.pack(pady=3)
+                ttk.Label(line2, text="Mass kg/m", font=self.font, width=10).pack(side="left", padx=2)
+                self.mass_strgvar = tk.StringVar(value="50")
+                ttk.Entry(line2, textvariable=self.mass_strgvar, width = 5).pack(side="left")
+                ttk.Label(line2, text="Modes", font=self.font).pack(side="left", padx=2)
+                self.modes_strgvar = tk.StringVar(value="4")
+                ttk.Entry(line2, textvariable=self.modes_strgvar, width = 3).pack(side="left")
+
+                modes_frame = ttk.Frame(self.control_frame)
+                modes_frame.pack(pady=3)
+
+                ttk.Button(
+                        modes_frame,
+                        text="Modes",
+                        command=lambda: self.controller.modes_button_clicked(self.mass_strgvar.get(), self.modes_strgvar.get())
+                ).grid(row=0, column=0, padx=2, pady=2)
+
+                ttk.Button(
+                        modes_frame,
+                        text="Next Mode",
+                        command=self.controller.next_mode_button_clicked
+                ).grid(row=0, column=1, padx=2, pady=2)
+
+                # Time history: duration and excitation frequency (0 for a suddenly applied load)
+                line3 = tk.Frame(self.control_frame)
+                line3.pack(pady=3)
+                ttk.Label(line3, text="Time s", font=self.font, width=10).pack(side="left", padx=2)
+                self.duration_strgvar = tk.StringVar(value="1")
+                ttk.Entry(line3, textvariable=self.duration_strgvar, width = 5).pack(side="left")
+                ttk.Label(line3, text="Hz", font=self.font).pack(side="left", padx=2)
+                self.excitation_strgvar = tk.StringVar(value="0")
+                ttk.Entry(line3, textvariable=self.excitation_strgvar, width = 3).pack(side="left")
+
+                dynamic_frame = ttk.Frame(self.control_frame)
+                dynamic_frame.pack(pady=3)
+
+                ttk.Button(
+                        dynamic_frame,
+                        text="Dynamic",
+                        command=lambda: self.controller.dynamic_button_clicked(self.mass_strgvar.get(), self.duration_strgvar.get(), self.excitation_strgvar.get())
+                ).grid(row=0, column=0, padx=2, pady=2)
+
+                ttk.Button(
+                        dynamic_frame,
+                        text="Replay",
+                        command=self.controller.replay_button_clicked
+                ).grid(row=0, column=1, padx=2, pady=2)
+
+                # Design: deflection limit (m or "L/n"), stress limit (MPa) and section depth (m)
+                line4 = tk.Frame(self.control_frame)
+                line4.pack(pady=3)
+                ttk.Label(line4, text="Defl. lim.", font=self.font, width=10).pack(side="left", padx=2)
+                self.deflection_limit_strgvar = tk.StringVar(value="L/250")
+                ttk.Entry(line4, textvariable=self.deflection_limit_strgvar, width = 12).pack(side="left")
+
+                line5 = tk.Frame(self.control_frame)
+                line5.pack(pady=3)
+                ttk.Label(line5, text="MPa", font=self.font, width=10).pack(side="left", padx=2)
+                self.stress_limit_strgvar = tk.StringVar(value="235")
+                ttk.Entry(line5, textvariable=self.stress_limit_strgvar, width = 5).pack(side="left")
+                ttk.Label(line5, text="h m", font=self.font).pack(side="left", padx=2)
+                self.depth_strgvar = tk.StringVar(value="0.3")
+                ttk.Entry(line5, textvariable=self.depth_strgvar, width = 3).pack(side="left")
+
+                design_frame = ttk.Frame(self.control_frame)
+                design_frame.pack(pady=3)
+
+                ttk.Button(
+                        design_frame,
+                        text="Size I",
+                        command=lambda: self.controller.size_inertia_button_clicked(
+                                self.deflection_limit_strgvar.get(), self.stress_limit_strgvar.get(), self.depth_strgvar.get()
+                        )
+                ).grid(row=0, column=0, padx=2, pady=2)
+
+                # The catalog is a CSV file of sections: name, I (m^4), W (m^3), mass (kg/m)
+                ttk.Button(
+                        design_frame,
+                        text="Pick Section",
+                        command=lambda: self.controller.select_section_button_clicked(
+                                filedialog.askopenfilename(filetypes=[("CSV", "*.csv"), ("All files", "*")]),
+                                self.deflection_limit_strgvar.get(), self.stress_limit_strgvar.get()
+                        )
+                ).grid(row=0, column=1, padx=2, pady=2)
+
+                # Monte Carlo: distributions as "E=normal(2e11,1e10); P0=uniform(-12e3,-8e3)" and number of samples
+                line6 = tk.Frame(self.control_frame)
+                line6.pack(pady=3)
+                ttk.Label(line6, text="Random", font=self.font, width=10).pack(side="left", padx=2)
+                self.distributions_strgvar = tk.StringVar(value="E=normal(2e11,1e10)")
+                ttk.Entry(line6, textvariable=self.distributions_strgvar, width = 12).pack(side="left")
+
+                monte_carlo_frame = ttk.Frame(self.control_frame)
+                monte_carlo_frame.pack(pady=3)
+                self.samples_strgvar = tk.StringVar(value="10000")
+                ttk.Entry(monte_carlo_frame, textvariable=self.samples_strgvar, width = 7).grid(row=0, column=0, padx=2, pady=2)
+
+                ttk.Button(
+                        monte_carlo_frame,
+                        text="Monte Carlo",
+                        command=lambda: self.controller.monte_carlo_button_clicked(self.distributions_strgvar.get(), self.samples_strgvar.get())
+                ).grid(row=0, column=1, padx=2, pady=2)
+
+
+        # Creates the GUI elements for saving and opening project files
+        def project_gui(self):
+                self.create_separator(self.control_frame, "Project")
+
+                project_frame = ttk.Frame(self.control_frame)
+                project_frame.pack(pady=3)
+                project_filetypes = [("Beam projects", "*.dmf"), ("All files", "*")]
+
+                ttk.Button(
+                        project_frame,
+                        text="Save",
+                        command=lambda: self.controller.save_project(
+                                filedialog.asksaveasfilename(defaultextension=".dmf", filetypes=project_filetypes)
+                        )
+                ).pack(side="left", padx=2)
+
+                ttk.Button(
+                        project_frame,
+                        text="Open",
+                        command=lambda: self.controller.open_project(
+                                filedialog.askopenfilename(filetypes=project_filetypes)
+                        )
+                ).pack(side="left", padx=2)
+
+                ttk.Button(
+                        project_frame,
+                        text="Export",
+                        command=lambda: self.controller.export_results(
+                                filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv"), ("NumPy array", "*.npy")])
+                        )
+                ).pack(side="left", padx=2)
+
+                ttk.Button(
+                        project_frame,
+                        text="Figure",
+                        command=lambda: self.controller.export_figure(
+                                filedialog.asksaveasfilename(defaultextension=".svg", filetypes=[("SVG", "*.svg"), ("PNG", "*.png")])
+                        )
+                ).pack(side="left", padx=2)
+
+                # Undo/redo of any change to the beam
+                history_frame = ttk.Frame(self.control_frame)
+                history_frame.pack(pady=3)
+
+                ttk.Button(
+                        history_frame,
+                        text="Undo",
+                        command=self.controller.undo
+                ).pack(side="left", padx=2)
+
+                ttk.Button(
+                        history_frame,
+                        text="Redo",
+                        command=self.controller.redo
+                ).pack(side="left", padx=2)
+
+                self.bind_all("<Control-z>", partial(self._on_history_key, self.controller.undo))
+                self.bind_all("<Control-y>", partial(self._on_history_key, self.controller.redo))
+
+        # Ctrl+Z / Ctrl+Y undo and redo the model, except while typing in an entry (which handles them itself)
+        def _on_history_key(self, action, event):
+                if isinstance(event.widget, tk.Entry):
+                        return
+                action(event)
 
         def _on_mouse_wheel(self, event):
                 if not self.view_solution: # only valid for terminal
@@ -923,16 +4530,14 @@ class View(tk.Tk):
         def _get_fdm_values(self):
                 
                 match self.solution_mode:
-                        case "deflection":
-                                return self.controller.model.deflections
-                        case "moment":
-                                return np.array([-1*i for i in self.controller.model.moments]) 
-                                # multiply by -1 for drawing 
-                        case "shear":                                
-                                return self.controller.model.shears
-                        
-                        case "slope":
-                                return self.controller.model.slopes
+                        case "deflection" | "moment" | "shear" | "slope" | "normal":
+                                return Pencil.diagram_values(self.controller.model, self.solution_mode)
+
+                        case "mode":
+                                return self.controller.model.mode_shapes[:, self.mode_index]
+
+                        case "frame":
+                                return self.frames[self.frame_index]
                         
         def _on_terminal_click(self, event):
                 if self.view_solution:
@@ -1011,86 +4616,45 @@ class View(tk.Tk):
 
                 return
         
-        def draw_solved_beam(self):
+        # scale is the value drawn at full height (default: the largest value of the diagram)
+        def draw_solved_beam(self, scale:float = None):
                 mode = self.solution_mode
                 self.view_solution = True
                 # remove all elements in terminal canvas
                 self.terminal_canvas.delete("all")
 
-                # get canvas width and height
-                term_w, term_h = self.terminal_canvas.winfo_width(), self.terminal_canvas.winfo_height()
-
-                # define model
-                model = self.controller.model
-
                 self.terminal_canvas.config(bg = "white")
-                
-                y_values = self._get_fdm_values()
-                
-                max_abs_point = abs(max(y_values.min(), y_values.max(), key=abs))
-                std_height = term_h / 5
-
-                sol_beam_y = term_h / 2
-
-                # draw line that represents beam
-                self.terminal_canvas.create_line(
-                        (self.canvas_padx, sol_beam_y),
-                        (term_w - self.canvas_padx, sol_beam_y),
-                        width = 3, fill="black"
-                )
-
-                # get x values
-                x_values = np.linspace(0, model.length, len(y_values))
 
-                # define points in canvas coords
-                points = [(
-                                self.canvas_padx + x / model.length * (term_w - 2 * self.canvas_padx), # x
-                                sol_beam_y - (y / max_abs_point) * std_height # y
-                        )
-                        for x, y
-                        in zip(x_values, y_values)
-                ]
-                
-                # draw graph
-                self.terminal_canvas.create_line(
-                        *points,
-                        width = 2, fill = "red"
-                )
+                self.pencil.draw_diagram(self._get_fdm_values(), self.terminal_canvas, scale)
                           
+        # Plays time history frames (e.g. a memory-mapped .npy) in the terminal canvas
+        # at most max_frames are drawn, every interval ms, with the same scale for all
+        def play_frames(self, frames, interval:int = 30, max_frames:int = 300):
+                self.frames = frames
+                self.frame_stride = max(1, len(frames) // max_frames)
+                # Largest deflection of the whole history, read in blocks
+                self.frame_scale = max(np.abs(frames[i:i + 1024]).max() for i in range(0, len(frames), 1024)) or 1.0
+                self.frame_index = 0
+                self.solution_mode = "frame"
+                self._draw_next_frame(interval)
+
+        def _draw_next_frame(self, interval:int):
+                # Stop when the frames ran out or something else was drawn on the terminal
+                if self.solution_mode != "frame" or self.frame_index >= len(self.frames):
+                        return
+                if self.frame_index > 0 and not self.view_solution:
+                        return
+                self.draw_solved_beam(self.frame_scale)
+                self.frame_index += self.frame_stride
+                self.after(interval, self._draw_next_frame, interval)
+
         # Redraws the entire canvas
         def draw_beam(self, canvas: tk.Canvas = None):
                 if canvas is None:
                         canvas = self.maincanvas
                 # Clear the canvas
                 canvas.delete("all")
-                # Get current canvas dimensions
-                canvas_w, canvas_h = canvas.winfo_width(), canvas.winfo_height()
-                
-
-                # Define the y-position of the beam on the canvas
-                self.beam_y = canvas_h / 2
-
-                std_height = canvas_h / 8
-
-                # Draw the main beam line
-                canvas.create_line(
-                (self.canvas_padx, self.beam_y),
-                (canvas_w - self.canvas_padx, self.beam_y),
-                width = 3, fill="black"
-                )
-
-                # Draw all saved supports
-                for support_pos, support_type in self.controller.model.supports:
-                        # Call the appropriate drawing function from the pencil's mapper
-                        self.pencil.mapper[support_type](support_pos, std_height, canvas=canvas)
-                        
-                # Draw all saved point forces
-                for magnitude, force_pos, angle in self.controller.model.point_loads:
-                        self.pencil.draw_point_load(beam_position=force_pos, height=std_height, canvas=canvas, angle=angle, magnitude=magnitude)
-
-                # Draw all saved distributed loads
-                for pos_limits, magnitude in self.controller.model.loads:
-                        self.pencil.draw_load(pos_limits=pos_limits, height=std_height, canvas=canvas, magnitude=magnitude)
+                self.pencil.draw_schematic(canvas)
         
         def update_display(self):
                 self.draw_beam()
@@ -1103,6 +4667,8 @@ class Controller():
                 # Create instances of the model and view
                 self.model = Model()
                 self.view = View(self)
+                # Temporary .npy file with the frames of the last time history
+                self.time_history_path = None
         
                 # When the canvas is resized, call the update_display method
                 self.view.maincanvas.bind("<Configure>", self.update_display)
@@ -1165,6 +4731,7 @@ class Controller():
                 return False
 
         # Handles the "Add Support" button click
+        # several positions may be given separated by ";"
         def add_support(self, position, support_type):
                 # Validate the position input is floatable
                 positions = []
@@ -1175,27 +4742,70 @@ class Controller():
                         
                         positions.append(position)
 
-                for position in positions:
-                        # check if position is within the beam's length
-                        if not 0 <= position <= self.model.length:
-                                self.add_terminal_message(f"Error: Support position must be inside beam!")
-                                return False
+                return self._add_supports(np.array(positions), np.full(len(positions), support_type))
 
-                        # check if new support is too close to an existing one
-                        for already_saved_position, _ in self.model.supports:
-                                if abs(position - already_saved_position) <= self.model.length / self.model.total_node_num:
-                                        self.add_terminal_message(f"Error: Cannot add support too close to another one!")
-                                        return False
-                
-                        # Check if the support type is valid/implemented
-                        if support_type not in self.view.pencil.mapper:
-                                self.add_terminal_message(f"Error: Support kind '{support_type}' not yet implemented!")
-                                return False
-                
-                        # If the model successfully adds the support, update the view
-                        if self.model.add_support(position, support_type):
-                                self.add_terminal_message(f"New support {support_type} added to:{position}")
-                                continue
+        # Handles the "Import Supports" button click
+        # the file has one support per line: "position" or "position, support_type"
+        def import_supports(self, path, support_type):
+                if not path:
+                        return False
+
+                try:
+                        with open(path) as file:
+                                # "#" starts a comment, blank lines are skipped
+                                rows = [line.split("#")[0].split(",") for line in file]
+                except OSError as e:
+                        self.add_terminal_message(f"Error: Cannot read supports file: {e}")
+                        return False
+
+                rows = [[field.strip() for field in row] for row in rows if row[0].strip()]
+                if not rows:
+                        self.add_terminal_message(f"Error: No supports found in {path}")
+                        return False
+
+                try:
+                        positions = np.array([row[0] for row in rows], dtype=float)
+                except ValueError as e:
+                        self.add_terminal_message(f"Error: Invalid support position in file: {e}")
+                        return False
+
+                support_types = np.array([row[1] if len(row) > 1 else support_type for row in rows])
+                return self._add_supports(positions, support_types)
+
+        # Validates all new supports at once and adds them to the model in one step
+        def _add_supports(self, positions, support_types):
+                if not len(positions):
+                        return False
+
+                # check if positions are within the beam's length
+                if not np.all((0 <= positions) & (positions <= self.model.length)):
+                        self.add_terminal_message(f"Error: Support position must be inside beam!")
+                        return False
+
+                # Check if the support types are valid/implemented
+                implemented = np.isin(support_types, list(self.view.pencil.mapper))
+                if not implemented.all():
+                        self.add_terminal_message(f"Error: Support kind '{support_types[~implemented][0]}' not yet implemented!")
+                        return False
+
+                # check if a new support is too close to an existing one or to another new one
+                # after sorting, only neighbours need to be compared
+                all_positions = np.concatenate((self.model.supports["position"], positions))
+                is_new = np.arange(len(all_positions)) >= len(self.model.supports)
+                order = np.argsort(all_positions, kind="stable")
+                too_close = np.diff(all_positions[order]) <= self.model.length / self.model.total_node_num
+                involves_new = is_new[order][1:] | is_new[order][:-1]
+                if np.any(too_close & involves_new):
+                        self.add_terminal_message(f"Error: Cannot add support too close to another one!")
+                        return False
+        
+                # If the model successfully adds the supports, update the view once
+                if self.model.add_supports(positions, support_types):
+                        if len(positions) == 1:
+                                self.add_terminal_message(f"New support {support_types[0]} added to:{positions[0]}")
+                        else:
+                                self.add_terminal_message(f"{len(positions)} new supports added from {positions.min()} to {positions.max()}")
+                        return True
             
                 return False
 
@@ -1207,6 +4817,167 @@ class Controller():
                         return True
                 return False
 
+        # Handles the "Add Spring" button click
+        # several positions may be given separated by ";", stiffness is "k" or "k;k rotational"
+        def add_spring(self, position, stiffness):
+                positions = []
+                for position in position.split(";"):
+                        test, position = self.test_float(position, "Position")
+                        if not test:
+                                return False
+                        positions.append(position)
+
+                values = []
+                for value in stiffness.split(";")[:2]:
+                        test, value = self.test_float(value, "Stiffness")
+                        if not test:
+                                return False
+                        values.append(value)
+                translational, rotational = values[0], values[1] if len(values) > 1 else 0.0
+
+                if self.model.add_springs(positions, translational, rotational):
+                        self.add_terminal_message(f"{len(positions)} spring(s) added (k = {translational:g} N/m, k rotational = {rotational:g} N*m/rad)")
+                        return True
+                self.add_terminal_message("Error: Springs must be inside beam with a positive stiffness!")
+                return False
+
+        # Handles the "Remove Spring" button click
+        def remove_last_spring(self):
+                if self.model.remove_last_spring():
+                        self.add_terminal_message("Spring Removed.")
+                        return True
+                return False
+
+        # Handles the "Add Foundation" button click, position is "start;end"
+        def add_foundation(self, position, modulus):
+                if ";" not in position:
+                        self.add_terminal_message("Error: Foundation needs a start and an end, e.g. '2;5'")
+                        return False
+
+                pos0, pos1 = position.split(";")[:2]
+                test0, pos0 = self.test_float(pos0, "Position 1")
+                test1, pos1 = self.test_float(pos1, "Position 2")
+                test2, modulus = self.test_float(modulus, "Modulus")
+                if not (test0 and test1 and test2):
+                        return False
+                if pos1 < pos0:
+                        pos0, pos1 = pos1, pos0
+
+                if self.model.add_foundation((pos0, pos1), modulus):
+                        self.add_terminal_message(f"New foundation {modulus:g} N/m/m added from {pos0} to {pos1}")
+                        return True
+                self.add_terminal_message("Error: Foundation must be inside beam with a positive modulus!")
+                return False
+
+        # Handles the "Remove Found." button click
+        def remove_last_foundation(self):
+                if self.model.remove_last_foundation():
+                        self.add_terminal_message("Foundation Removed.")
+                        return True
+                return False
+
+        # Handles the "Settle Support" button click, settlement is "w" or "w;rotation"
+        def add_settlement(self, position, settlement):
+                test, position = self.test_float(position, "Position")
+                if not test:
+                        return False
+
+                values = []
+                for value in settlement.split(";")[:2]:
+                        test, value = self.test_float(value, "Settlement")
+                        if not test:
+                                return False
+                        values.append(value)
+                deflection, rotation = values[0], values[1] if len(values) > 1 else 0.0
+
+                # A settlement only acts through a support on the same node
+                h = self.model.length / (self.model.total_node_num - 1)
+                if not np.any(np.abs(self.model.supports["position"] - position) <= h / 2):
+                        self.add_terminal_message(f"Error: No support at {position} to settle!")
+                        return False
+
+                if self.model.add_settlement(position, deflection, rotation):
+                        self.add_terminal_message(f"Support at {position} settled by {deflection:g} m, rotated by {rotation:g} rad")
+                        return True
+                self.add_terminal_message("Error: Settlement must be inside beam!")
+                return False
+
+        # Handles the "Remove Settle." button click
+        def remove_last_settlement(self):
+                if self.model.remove_last_settlement():
+                        self.add_terminal_message("Settlement Removed.")
+                        return True
+                return False
+
+        # Handles the "Add Thermal" button click, position is "start;end" and thermal is "dT;depth"
+        def add_thermal_load(self, position, thermal):
+                if ";" not in position or ";" not in thermal:
+                        self.add_terminal_message("Error: Thermal load needs 'start;end' positions and 'dT;depth', e.g. '2;5' and '20;0.3'")
+                        return False
+
+                pos0, pos1 = position.split(";")[:2]
+                delta_T, depth = thermal.split(";")[:2]
+                test0, pos0 = self.test_float(pos0, "Position 1")
+                test1, pos1 = self.test_float(pos1, "Position 2")
+                test2, delta_T = self.test_float(delta_T, "Temperature difference")
+                test3, depth = self.test_float(depth, "Depth")
+                if not (test0 and test1 and test2 and test3):
+                        return False
+                if pos1 < pos0:
+                        pos0, pos1 = pos1, pos0
+
+                if self.model.add_thermal_load((pos0, pos1), delta_T, depth):
+                        self.add_terminal_message(f"New thermal load dT = {delta_T:g} K (depth {depth:g} m) added from {pos0} to {pos1}")
+                        return True
+                self.add_terminal_message("Error: Thermal load must be inside beam with a positive depth!")
+                return False
+
+        # Handles the "Remove Thermal" button click
+        def remove_last_thermal_load(self):
+                if self.model.remove_last_thermal_load():
+                        self.add_terminal_message("Thermal Load Removed.")
+                        return True
+                return False
+
+        # Handles the "Add Section" button click
+        # position is "start;end", inertia is "I" or "I start;I end" for a tapered section
+        def add_section(self, position, inertia):
+                if ";" not in position:
+                        self.add_terminal_message("Error: Section needs a start and an end, e.g. '2;5'")
+                        return False
+
+                pos0, pos1 = position.split(";")[:2]
+                test0, pos0 = self.test_float(pos0, "Position 1")
+                test1, pos1 = self.test_float(pos1, "Position 2")
+                if not (test0 and test1):
+                        return False
+
+                inertias = []
+                for value in inertia.split(";")[:2]:
+                        test, value = self.test_float(value, "I")
+                        if not test:
+                                return False
+                        inertias.append(value)
+                if min(inertias) <= 0:
+                        self.add_terminal_message("Error: I must be greater than '0'!")
+                        return False
+                if pos1 < pos0:
+                        pos0, pos1 = pos1, pos0
+                        inertias.reverse()
+
+                if self.model.add_section((pos0, pos1), self.model.materials["E"], inertias[0], inertias[-1]):
+                        self.add_terminal_message(f"New section I = {inertia} added from {pos0} to {pos1}")
+                        return True
+                self.add_terminal_message("Error: Section must be inside beam and not empty!")
+                return False
+
+        # Handles the "Remove Section" button click
+        def remove_last_section(self):
+                if self.model.remove_last_section():
+                        self.add_terminal_message("Section Removed.")
+                        return True
+                return False
+
         # Handles the "Add Force" button click
         def add_effort(self, magnitude:float, position, angle:float = 90):
                 # test magnitude and angle
@@ -1267,6 +5038,73 @@ class Controller():
                         return True
                 return False
 
+        # Handles the "Import Forces" button click
+        # the file (.csv or .npy) has one force per row: magnitude, position[, angle]
+        def import_point_loads(self, path):
+                data = self._read_load_file(path, columns=(2, 3))
+                if data is None:
+                        return False
+
+                magnitudes, positions = data[:, 0], data[:, 1]
+                angles = data[:, 2] if data.shape[1] > 2 else np.full(len(data), 90.0)
+
+                invalid = (magnitudes == 0) | ~np.isfinite(magnitudes)
+                invalid |= ~((0 <= positions) & (positions <= self.model.length))
+                invalid |= ~((0 <= angles) & (angles <= 180))
+                if invalid.any():
+                        self.add_terminal_message(f"Error: {invalid.sum()} invalid force(s) in file, first at row {np.argmax(invalid) + 1}")
+                        return False
+
+                # If the model adds the forces, update the display once
+                if self.model.add_point_loads(magnitudes, positions, angles):
+                        self.add_terminal_message(f"{len(data)} new forces imported from {path}")
+                        return True
+                return False
+
+        # Handles the "Import Loads" button click
+        # the file (.csv or .npy) has one distributed load per row: start, end, magnitude
+        def import_distributed_loads(self, path):
+                data = self._read_load_file(path, columns=(3,))
+                if data is None:
+                        return False
+
+                starts = np.minimum(data[:, 0], data[:, 1])
+                ends = np.maximum(data[:, 0], data[:, 1])
+                magnitudes = data[:, 2]
+
+                invalid = (magnitudes == 0) | ~np.isfinite(magnitudes)
+                invalid |= ~((0 <= starts) & (ends <= self.model.length))
+                if invalid.any():
+                        self.add_terminal_message(f"Error: {invalid.sum()} invalid load(s) in file, first at row {np.argmax(invalid) + 1}")
+                        return False
+
+                # If the model adds the loads, update the display once
+                if self.model.add_distributed_loads(starts, ends, magnitudes):
+                        self.add_terminal_message(f"{len(data)} new loads imported from {path}")
+                        return True
+                return False
+
+        # Reads a 2D array of loads from a .npy or .csv file, None if it cannot be used
+        def _read_load_file(self, path, columns:tuple):
+                if not path:
+                        return None
+
+                try:
+                        if path.endswith(".npy"):
+                                data = np.load(path, allow_pickle=False)
+                        else:
+                                data = np.loadtxt(path, delimiter=",", comments="#", ndmin=2)
+                        data = np.asarray(data, dtype=float)
+                except (OSError, ValueError) as e:
+                        self.add_terminal_message(f"Error: Cannot read loads file: {e}")
+                        return None
+
+                if data.ndim != 2 or data.shape[1] not in columns or not len(data):
+                        self.add_terminal_message(f"Error: Loads file must have {' or '.join(map(str, columns))} columns per row")
+                        return None
+
+                return data
+
         # Handles the "Remove Force" button click
         def remove_last_effort(self):
                 # If the model successfully removes an effort, update the view
@@ -1279,22 +5117,34 @@ class Controller():
         # Handles the "Solve" button click
         def solve_button_clicked(self):
                 
-                if not self.model.supports:
-                        self.add_terminal_message(f"Error: You cannot solve a beam without supports")
-                        return False
-
-                if len(self.model.loads) + len(self.model.point_loads) == 0:
+                # Settlements and temperature gradients load the beam as well
+                model = self.model
+                if len(model.loads) + len(model.point_loads) + len(model.settlements) + len(model.thermal_loads) == 0:
                         self.add_terminal_message(f"Error: You cannot solve a beam without loads")
                         return False
 
                 if not self.set_total_node_num(self.view.nodes_strgvar.get()):
 
                         return False
+
+                # Springs and foundations support the beam too, the model knows whether it is stable
+                error = self.model.check_stability()
+                if error:
+                        self.add_terminal_message(f"Error: {error}")
+                        return False
                 self.add_terminal_message(f"SOLVING FOR {self.model.total_node_num} NODES...")
                 
-
+                was_solved = self.model.solved
                 self.model.solve_FDM()
 
+                if not self.model.solved:
+                        self.add_terminal_message(f"Error: {self.model.stats.error}")
+                        return False
+
+                # Only report timings of an actual solve, not of a cached one
+                if not was_solved:
+                        self.add_terminal_message(self.model.stats.summary())
+
                 self.update_display()
                 self.view.draw_solved_beam()
 
@@ -1305,6 +5155,330 @@ class Controller():
 
                 self.solve_button_clicked()
 
+        # Handles the "P-Delta" check button: solves with or without the second order effects
+        def set_second_order(self, second_order:bool):
+                if self.model.second_order != second_order:
+                        self.model.second_order = second_order
+                        self.model.solved = False
+                        self.add_terminal_message(f"Second order (P-Delta) analysis {'on' if second_order else 'off'}")
+                return True
+
+        # Handles the "Modes" button click: finds the lowest modes and draws the first one
+        def modes_button_clicked(self, mass_per_length, num_modes):
+                test, mass_per_length = self.test_float(mass_per_length, "Mass kg/m")
+                if not test:
+                        return False
+                test, num_modes = self.test_float(num_modes, "Modes", test_int = True)
+                if not test:
+                        return False
+                if not self.set_total_node_num(self.view.nodes_strgvar.get()):
+                        return False
+
+                if not self.model.solve_modes(num_modes, mass_per_length):
+                        self.add_terminal_message(f"Error: {self.model.stats.error}")
+                        return False
+
+                self.add_terminal_message(f"{len(self.model.mode_frequencies)} modes in {self.model.stats.total() * 1e3:.2f} ms ({self.model.mode_iterations} iterations)")
+                for i, frequency in enumerate(self.model.mode_frequencies, start=1):
+                        self.add_terminal_message(f"Mode {i}: {frequency:.4g} Hz")
+
+                self.view.solution_mode = "mode"
+                self.view.mode_index = 0
+                self.update_display()
+                self.view.draw_solved_beam()
+                return True
+
+        # Handles the "Next Mode" button click: draws the following mode shape
+        def next_mode_button_clicked(self):
+                if self.model.mode_shapes is None:
+                        self.add_terminal_message("Error: Run the modal analysis first")
+                        return False
+
+                self.view.mode_index = (self.view.mode_index + 1) % self.model.mode_shapes.shape[1]
+                self.view.solution_mode = "mode"
+                self.add_terminal_message(f"Mode {self.view.mode_index + 1}: {self.model.mode_frequencies[self.view.mode_index]:.4g} Hz")
+                self.update_display()
+                self.view.draw_solved_beam()
+                return True
+
+        # Handles the "Dynamic" button click: integrates the time history to a temporary file and plays it
+        def dynamic_button_clicked(self, mass_per_length, duration, frequency, steps:int = 1000):
+                test, mass_per_length = self.test_float(mass_per_length, "Mass kg/m")
+                if not test:
+                        return False
+                test, duration = self.test_float(duration, "Time s")
+                if not test:
+                        return False
+                test, frequency = self.test_float(frequency, "Hz")
+                if not test:
+                        return False
+                if not self.set_total_node_num(self.view.nodes_strgvar.get()):
+                        return False
+
+                load = self.model.harmonic_load(frequency) if frequency > 0 else self.model.step_load()
+                if self.time_history_path is None:
+                        file, self.time_history_path = tempfile.mkstemp(suffix=".npy")
+                        os.close(file)
+                try:
+                        frames = self.model.export_time_history(self.time_history_path, duration, duration / steps, mass_per_length, load)
+                except (OSError, ValueError) as e:
+                        self.add_terminal_message(f"Error: {e}")
+                        return False
+
+                self.add_terminal_message(f"{frames} frames in {self.model.stats.total() * 1e3:.2f} ms")
+                return self.replay_button_clicked()
+
+        # Handles the "Replay" button click: plays the last time history from disk, without solving again
+        def replay_button_clicked(self):
+                if self.time_history_path is None:
+                        self.add_terminal_message("Error: Run a dynamic analysis first")
+                        return False
+                self.update_display()
+                self.view.play_frames(np.load(self.time_history_path, mmap_mode="r"))
+                return True
+
+        # Handles the "Size I" button click: finds the smallest I meeting the limits and applies it
+        def size_inertia_button_clicked(self, deflection_limit, stress_limit, depth):
+                test, deflection_limit = self._deflection_limit(deflection_limit)
+                if not test:
+                        return False
+                test, stress_limit = self.test_float(stress_limit, "MPa")
+                if not test:
+                        return False
+                test, depth = self.test_float(depth, "h m")
+                if not test:
+                        return False
+                if deflection_limit <= 0 or stress_limit <= 0 or depth <= 0:
+                        self.add_terminal_message("Error: Design limits and depth must be positive")
+                        return False
+                if not self.set_total_node_num(self.view.nodes_strgvar.get()):
+                        return False
+
+                if not self.model.size_inertia(deflection_limit, stress_limit * 1e6, depth):
+                        self.add_terminal_message(f"Error: {self.model.stats.error}")
+                        return False
+
+                return self._apply_design()
+
+        # Handles the "Pick Section" button click: picks the lightest section of a catalog file meeting the limits
+        def select_section_button_clicked(self, path, deflection_limit, stress_limit):
+                if not path:
+                        return False
+                test, deflection_limit = self._deflection_limit(deflection_limit)
+                if not test:
+                        return False
+                test, stress_limit = self.test_float(stress_limit, "MPa")
+                if not test:
+                        return False
+                if deflection_limit <= 0 or stress_limit <= 0:
+                        self.add_terminal_message("Error: Design limits must be positive")
+                        return False
+
+                try:
+                        with open(path) as file:
+                                # "#" starts a comment, blank lines are skipped
+                                rows = [line.split("#")[0].split(",") for line in file]
+                except OSError as e:
+                        self.add_terminal_message(f"Error: Cannot read catalog file: {e}")
+                        return False
+
+                rows = [[field.strip() for field in row] for row in rows if row[0].strip()]
+                # A header line is allowed
+                if rows and rows[0][0].lower() == "name":
+                        rows = rows[1:]
+                try:
+                        catalog = np.array([(row[0], *map(float, row[1:4])) for row in rows], dtype=self.model.section_catalog_fields)
+                except (ValueError, TypeError) as e:
+                        self.add_terminal_message(f"Error: Invalid section in catalog: {e}")
+                        return False
+                if not len(catalog):
+                        self.add_terminal_message(f"Error: No sections found in {path}")
+                        return False
+                if np.any(catalog["I"] <= 0) or np.any(catalog["W"] <= 0):
+                        self.add_terminal_message("Error: Catalog sections need positive I and W")
+                        return False
+                if not self.set_total_node_num(self.view.nodes_strgvar.get()):
+                        return False
+
+                if not self.model.select_section(catalog, deflection_limit, stress_limit * 1e6):
+                        self.add_terminal_message(f"Error: {self.model.stats.error}")
+                        return False
+
+                return self._apply_design()
+
+        # Handles the "Monte Carlo" button click: reports percentiles of the peak deflection and moment
+        def monte_carlo_button_clicked(self, distributions, samples):
+                test, distributions = self._parse_distributions(distributions)
+                if not test:
+                        return False
+                test, samples = self.test_float(samples, "Samples", test_int = True)
+                if not test:
+                        return False
+                if samples < 1:
+                        self.add_terminal_message("Error: Samples must be positive")
+                        return False
+                if not self.set_total_node_num(self.view.nodes_strgvar.get()):
+                        return False
+
+                if not self.model.solve_monte_carlo(distributions, samples):
+                        self.add_terminal_message(f"Error: {self.model.stats.error}")
+                        return False
+
+                result = self.model.uncertainty
+                self.add_terminal_message(f"{samples} samples in {result['time'] * 1e3:.2f} ms" + (f" ({result['failed']} failed)" if result["failed"] else ""))
+                for p, deflection, moment in zip(result["percentiles"], result["deflection"], result["moment"]):
+                        self.add_terminal_message(f"P{p:g}: deflection {deflection:.4g} m, moment {moment:.4g} N*m")
+                return True
+
+        # Reads distributions as "name=kind(a,b); ..." (see Model.solve_monte_carlo for the names)
+        def _parse_distributions(self, text):
+                names = {"E", "I"}
+                names |= {f"{prefix}{i}" for prefix in "Px" for i in range(len(self.model.point_loads))}
+                names |= {f"q{i}" for i in range(len(self.model.loads))}
+
+                distributions = {}
+                for item in filter(None, (item.strip() for item in text.split(";"))):
+                        name, _, spec = (part.strip() for part in item.partition("="))
+                        kind, _, parameters = spec.rstrip(")").partition("(")
+                        kind = kind.strip()
+                        if name not in names:
+                                self.add_terminal_message(f"Error: Unknown random input '{name}' (E, I, P<i>, x<i> or q<i>)")
+                                return False, None
+                        if kind not in self.model.monte_carlo_distributions:
+                                self.add_terminal_message(f"Error: Unknown distribution '{kind}' ({', '.join(self.model.monte_carlo_distributions)})")
+                                return False, None
+                        try:
+                                parameters = [float(value) for value in parameters.split(",")]
+                        except ValueError:
+                                self.add_terminal_message(f"Error: Invalid parameters for {name}: '{spec}'")
+                                return False, None
+                        if len(parameters) != self.model.monte_carlo_distributions[kind]:
+                                self.add_terminal_message(f"Error: {kind} needs {self.model.monte_carlo_distributions[kind]} parameters")
+                                return False, None
+                        distributions[name] = (kind, *parameters)
+                if not distributions:
+                        self.add_terminal_message("Error: No random inputs given")
+                        return False, None
+                return True, distributions
+
+        # Reads a deflection limit in m, or as a fraction of the span ("L/250")
+        def _deflection_limit(self, text):
+                text = str(text).strip()
+                if text.upper().startswith("L/"):
+                        test, divisor = self.test_float(text[2:], "Defl. lim.")
+                        if not test or divisor <= 0:
+                                return False, None
+                        return True, self.model.length / divisor
+                return self.test_float(text, "Defl. lim.")
+
+        # Reports the last design search and gives its I to the beam
+        def _apply_design(self):
+                design = self.model.design
+                if "name" in design:
+                        self.add_terminal_message(f"Section {design['name']}: I = {design['I']:.4g} m^4, W = {design['W']:.4g} m^3, {design['mass']:.4g} kg/m")
+                else:
+                        self.add_terminal_message(f"Minimum I = {design['I']:.4g} m^4")
+                self.add_terminal_message(f"Deflection {design['deflection']:.4g} m, stress {design['stress'] / 1e6:.4g} MPa")
+                self.add_terminal_message(f"{design['evaluated']} candidates in {design['time'] * 1e3:.2f} ms")
+
+                self.model.set_properties(self.model.length, self.model.materials["E"], design["I"])
+                self._sync_inputs()
+                self.update_display()
+                return True
+
+        # Handles the "Save" project button click
+        def save_project(self, path):
+                if not path:
+                        return False
+                try:
+                        self.model.save_project(path)
+                except OSError as e:
+                        self.add_terminal_message(f"Error: Cannot save project: {e}")
+                        return False
+                self.add_terminal_message(f"Project saved to {path}")
+                return True
+
+        # Handles the "Open" project button click
+        def open_project(self, path):
+                if not path:
+                        return False
+                try:
+                        self.model.load_project(path)
+                except (OSError, ValueError, KeyError) as e:
+                        self.add_terminal_message(f"Error: Cannot open project: {e}")
+                        return False
+
+                self._sync_inputs()
+                self.add_terminal_message(f"Project opened from {path}")
+                if self.model.solved:
+                        self.view.draw_solved_beam()
+                return True
+
+        # Handles the "Undo" button click (or Ctrl+Z)
+        def undo(self, event=None):
+                if not self.model.undo():
+                        self.add_terminal_message("Nothing to undo.")
+                        return False
+                self._sync_inputs()
+                self.add_terminal_message("Undo.")
+                # A cached solution is shown right away, without solving again
+                if self.model.solved:
+                        self.view.draw_solved_beam()
+                return True
+
+        # Handles the "Redo" button click (or Ctrl+Y)
+        def redo(self, event=None):
+                if not self.model.redo():
+                        self.add_terminal_message("Nothing to redo.")
+                        return False
+                self._sync_inputs()
+                self.add_terminal_message("Redo.")
+                if self.model.solved:
+                        self.view.draw_solved_beam()
+                return True
+
+        # Shows the model properties in the entries (after opening a project or undoing)
+        def _sync_inputs(self):
+                self.view.len_var.set(str(self.model.length))
+                self.view.E_var.set(str(self.model.materials["E"]))
+                self.view.I_var.set(str(self.model.materials["I"]))
+                self.view.nodes_strgvar.set(str(self.model.total_node_num))
+
+        # Handles the "Export" button click
+        def export_results(self, path, spacing:float = None):
+                if not path:
+                        return False
+                if not self.model.solved:
+                        self.add_terminal_message("Error: Solve the beam before exporting results")
+                        return False
+                try:
+                        self.model.export_results(path, spacing)
+                except (OSError, ValueError) as e:
+                        self.add_terminal_message(f"Error: Cannot export results: {e}")
+                        return False
+                self.add_terminal_message(f"Results exported to {path}")
+                return True
+
+        # Handles the "Figure" button click: writes the beam as drawn on the canvas (.svg or .png)
+        # and, when solved, the diagram shown in the terminal next to it as <name>_<diagram>
+        def export_figure(self, path):
+                if not path:
+                        return False
+                canvas = self.view.maincanvas
+                renderer = Renderer(self.model, max(canvas.winfo_width(), 200), max(canvas.winfo_height(), 100), self.view.canvas_padx)
+                paths = [path]
+                try:
+                        renderer.draw_beam().save(path)
+                        if self.model.solved and self.view.view_solution and self.view.solution_mode in ("deflection", "moment", "shear", "slope", "normal"):
+                                stem, extension = os.path.splitext(path)
+                                paths.append(f"{stem}_{self.view.solution_mode}{extension}")
+                                renderer.draw_solved_beam(self.view.solution_mode).save(paths[-1])
+                except OSError as e:
+                        self.add_terminal_message(f"Error: Cannot save figure: {e}")
+                        return False
+                self.add_terminal_message(f"Figure saved to {', '.join(paths)}")
+                return True
+
         # This method is called to refresh the drawing on the canvas
         def update_display(self, event=None):
                 self.view.update_display()
@@ -0,0 +1,53 @@
+# Draws the beams and diagrams of saved projects to .svg or .png files, without opening a window
+# usage:
+#       python render.py a.dmf b.dmf ...                          (beam and moment diagram of each project, as .svg)
+#       python render.py *.dmf --modes beam deflection shear --format png --output figures
+#       python render.py *.dmf --workers 4 --size 1600x400
+# Unsolved projects are solved first; the figures of project P are written as <output>/<P>_<mode>.<format>
+import argparse
+import os
+import sys
+import time
+
+from main import Renderer
+
+MODES = ("beam", "deflection", "moment", "shear", "slope", "normal")
+
+
+def main():
+        parser = argparse.ArgumentParser(description="Render beam projects to .svg or .png figures")
+        parser.add_argument("projects", nargs="+", help="project files (.dmf)")
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=["beam", "moment"], help="figures drawn for each project")
+        parser.add_argument("--format", choices=("svg", "png"), default="svg", help="file format of the figures")
+        parser.add_argument("--output", default=".", help="directory of the figures")
+        parser.add_argument("--size", default="1000x300", help="size of the figures in pixels, WIDTHxHEIGHT")
+        parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+        args = parser.parse_args()
+
+        try:
+                width, height = (int(value) for value in args.size.lower().split("x"))
+        except ValueError:
+                parser.error(f"invalid size '{args.size}', expected WIDTHxHEIGHT")
+
+        os.makedirs(args.output, exist_ok=True)
+        jobs = []
+        for project in args.projects:
+                stem = os.path.join(args.output, os.path.splitext(os.path.basename(project))[0])
+                outputs = [(f"{stem}_{mode}.{args.format}", None if mode == "beam" else mode) for mode in args.modes]
+                jobs.append((project, outputs))
+
+        start = time.perf_counter()
+        errors = Renderer.render_batch(jobs, args.workers, width, height)
+        elapsed = time.perf_counter() - start
+
+        for project, error in zip(args.projects, errors):
+                if error is not None:
+                        print(f"{project}: {error}")
+        failed = sum(error is not None for error in errors)
+        figures = (len(jobs) - failed) * len(args.modes)
+        print(f"{figures} figures of {len(jobs) - failed} projects written to {args.output} in {elapsed:.2f} s ({failed} failed)")
+        return 1 if failed else 0
+
+
+if __name__ == "__main__":
+        sys.exit(main())
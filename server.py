@@ -0,0 +1,482 @@
+# Local solver service: other tools post beams as JSON and get the results back,
+# without paying for a Python start (and the numpy import) on every beam
+# usage:
+#       python server.py                          (HTTP on 127.0.0.1:8765)
+#       python server.py --port 9000 --workers 4
+#       python server.py --unix /tmp/beam.sock    (HTTP over a Unix socket)
+#       python server.py --bench 500              (serves on a free port, posts 500 beams with a local client, prints the metrics)
+# endpoints:
+#       POST /solve     a beam (see parse_beam), returns the requested results
+#       GET /metrics    requests, latency percentiles, throughput and batching counters
+# Beams that only differ in their loads share a stiffness matrix: the ones that arrive within the batch window
+# are solved together, as the columns of one multi-vector solve (Model.solve_load_cases) on a pool of
+# worker processes; identical beams in flight or solved recently share one solve
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+
+from main import Model
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Results a beam may ask for, "reactions" has one value per support (N, upward positive)
+RESULT_NAMES = Model.result_names + ("reactions",)
+DEFAULT_RESULTS = ("deflections", "moments", "reactions")
+SUPPORT_TYPES = ("y", "xy", "xyz", "xz")
+# Elements that set the stiffness matrix, the others are the load case
+STIFFNESS_ELEMENTS = ("supports", "sections", "foundations", "springs")
+# Trailing fields that may be left out of a record
+RECORD_DEFAULTS = {"point_loads": (90.0,), "springs": (0.0,), "settlements": (0.0,)}
+
+MAX_BODY = 64 * 2**20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+# Checks a beam posted as JSON and splits it into what sets the stiffness matrix and its load case
+# beam: {"length", "E", "I", "nodes", "second_order",
+#        "supports": [[position, type]], "sections": [[start, end, EI, end_EI]],
+#        "foundations": [[start, end, modulus]], "springs": [[position, stiffness, rotational]],
+#        "point_loads": [[magnitude, position, angle]], "loads": [[start, end, magnitude]],
+#        "settlements": [[position, deflection, rotation]], "thermal_loads": [[start, end, curvature]],
+#        "results": [names from RESULT_NAMES]}
+# every field is optional (the Model defaults apply); raises ValueError for an invalid beam
+def parse_beam(data):
+        if not isinstance(data, dict):
+                raise ValueError("The beam must be a JSON object")
+        model = Model()
+        known = {"length", "E", "I", "nodes", "second_order", "results"} | set(STIFFNESS_ELEMENTS) | set(Model.load_case_names)
+        unknown = sorted(set(data) - known)
+        if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        try:
+                stiffness = {
+                        "length": float(data.get("length", model.length)),
+                        "E": float(data.get("E", model.materials["E"])),
+                        "I": float(data.get("I", model.materials["I"])),
+                        "nodes": int(data.get("nodes", model.total_node_num)),
+                        "second_order": bool(data.get("second_order", False)),
+                }
+        except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid beam property: {e}")
+        length = stiffness["length"]
+        if not (0 < length < np.inf and 0 < stiffness["E"] < np.inf and 0 < stiffness["I"] < np.inf):
+                raise ValueError("length, E and I must be positive")
+        if stiffness["nodes"] < 10:
+                raise ValueError("nodes must be higher than 9")
+
+        case = {}
+        for name in STIFFNESS_ELEMENTS + Model.load_case_names:
+                records = _parse_records(name, data.get(name, []), getattr(model, name).dtype, length)
+                if name in STIFFNESS_ELEMENTS:
+                        stiffness[name] = records.tolist()
+                else:
+                        case[name] = records.tolist()
+
+        results = data.get("results", DEFAULT_RESULTS)
+        if not isinstance(results, (list, tuple)) or not all(result in RESULT_NAMES for result in results):
+                raise ValueError(f"results must be a list of {', '.join(RESULT_NAMES)}")
+        return stiffness, case, list(results)
+
+
+# Converts the records of one kind of element to a structured array and checks their values
+def _parse_records(name, records, dtype, length:float):
+        if not isinstance(records, list):
+                raise ValueError(f"{name} must be a list of records")
+        defaults = RECORD_DEFAULTS.get(name, ())
+        try:
+                rows = []
+                for record in records:
+                        missing = len(dtype.names) - len(record)
+                        rows.append(tuple(record) + (defaults[len(defaults) - missing:] if 0 < missing <= len(defaults) else ()))
+                array = np.array(rows, dtype=dtype)
+        except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid {name}: {e}")
+
+        for field in dtype.names:
+                values = array[field]
+                if values.dtype.kind == "f" and not np.all(np.isfinite(values)):
+                        raise ValueError(f"{name} {field} must be finite")
+                if field in ("position", "start", "end") and not np.all((0 <= values) & (values <= length)):
+                        raise ValueError(f"{name} must be inside the beam")
+        if "start" in dtype.names and np.any(array["start"] > array["end"]):
+                raise ValueError(f"{name} must start before they end")
+
+        if name == "supports" and not np.all(np.isin(array["type"], SUPPORT_TYPES)):
+                raise ValueError(f"Support types are {', '.join(SUPPORT_TYPES)}")
+        if name == "point_loads" and not np.all((0 <= array["angle"]) & (array["angle"] <= 180)):
+                raise ValueError("Point load angles must be within 0 .. 180")
+        if name == "sections" and not np.all((array["EI"] > 0) & (array["end_EI"] > 0)):
+                raise ValueError("Sections need a positive EI")
+        if name == "foundations" and not np.all(array["modulus"] > 0):
+                raise ValueError("Foundations need a positive modulus")
+        if name == "springs" and not np.all((array["stiffness"] >= 0) & (array["rotational"] >= 0) & (array["stiffness"] + array["rotational"] > 0)):
+                raise ValueError("Springs need a positive stiffness")
+        return array
+
+
+# Models of the stiffness configurations a worker process solved last, so their factorizations are reused
+_models = OrderedDict()
+MAX_MODELS = 8
+
+
+# Gives the worker's model of a stiffness configuration, building it the first time
+def stiffness_model(key:str, stiffness:dict):
+        model = _models.pop(key, None)
+        if model is None:
+                model = Model()
+                model.set_properties(stiffness["length"], stiffness["E"], stiffness["I"])
+                model.set_total_node_num(stiffness["nodes"])
+                model.second_order = stiffness["second_order"]
+                for name in STIFFNESS_ELEMENTS:
+                        getattr(model, name).replace([tuple(record) for record in stiffness[name]])
+        _models[key] = model
+        if len(_models) > MAX_MODELS:
+                _models.popitem(last=False)
+        return model
+
+
+# Solves the load cases of one stiffness configuration (runs in a worker process)
+# returns the response of each case and the seconds spent solving
+def solve_batch(key:str, stiffness:dict, cases:list, results:list):
+        start = time.perf_counter()
+        model = stiffness_model(key, stiffness)
+        cases = [{name: [tuple(record) for record in records] for name, records in case.items()} for case in cases]
+        responses = []
+        for solution, names in zip(model.solve_load_cases(cases), results):
+                if "error" in solution:
+                        responses.append({"error": solution["error"]})
+                        continue
+                response = {name: np.asarray(solution[name]).tolist() for name in names}
+                response["max_deflection"] = float(np.abs(solution["deflections"]).max())
+                responses.append(response)
+        return responses, time.perf_counter() - start
+
+
+# This class batches, de-duplicates and solves the beams posted to the service
+class SolverService():
+        def __init__(self, workers:int = None, batch_window:float = 0.002, max_batch:int = 256, cache_size:int = 1024):
+                self.workers = workers or os.cpu_count() or 1
+                self.pool = ProcessPoolExecutor(self.workers)
+                # Seconds a new stiffness configuration waits for more load cases before it is solved
+                self.batch_window = batch_window
+                self.max_batch = max_batch
+
+                # stiffness key -> [stiffness, [(request key, case, results)], timer]
+                self.pending = {}
+                # Stiffness keys whose window closed while every worker was busy, in order:
+                # they keep gathering load cases until a worker is free
+                self.ready = deque()
+                self.busy = 0
+                # request key -> future of its response, while it is being solved
+                self.in_flight = {}
+                # request key -> response of the most recent requests
+                self.cache = OrderedDict()
+                self.cache_size = cache_size
+
+                self.started = time.perf_counter()
+                self.counters = {"requests": 0, "errors": 0, "solved": 0, "batches": 0, "largest_batch": 0, "deduplicated": 0, "cache_hits": 0}
+                self.solve_seconds = 0.0
+                # (time, seconds) of the latest requests
+                self.latencies = deque(maxlen=10000)
+                # Tasks serving the open connections
+                self.connections = set()
+
+        # Returns the response to a beam (raises ValueError if it is invalid)
+        async def solve(self, data):
+                stiffness, case, results = parse_beam(data)
+                group = json.dumps(stiffness, sort_keys=True)
+                key = json.dumps([group, case, results], sort_keys=True)
+
+                if key in self.cache:
+                        self.counters["cache_hits"] += 1
+                        self.cache.move_to_end(key)
+                        return self.cache[key]
+                if key in self.in_flight:
+                        self.counters["deduplicated"] += 1
+                        return await asyncio.shield(self.in_flight[key])
+
+                future = asyncio.get_running_loop().create_future()
+                self.in_flight[key] = future
+                self._queue(group, stiffness, key, case, results)
+                return await asyncio.shield(future)
+
+        # Adds a load case to the batch of its stiffness configuration
+        # the batch is solved when the window closes, or right away once it is full
+        def _queue(self, group:str, stiffness:dict, key:str, case:dict, results:list):
+                if group not in self.pending:
+                        timer = asyncio.get_running_loop().call_later(self.batch_window, self._flush, group)
+                        self.pending[group] = [stiffness, [], timer]
+                batch = self.pending[group]
+                batch[1].append((key, case, results))
+                if len(batch[1]) >= self.max_batch:
+                        batch[2].cancel()
+                        self._flush(group)
+
+        # Sends a batch to a free worker, or lines it up until one is free
+        def _flush(self, group:str):
+                if self.busy < self.workers:
+                        self._dispatch(group)
+                elif group not in self.ready:
+                        self.ready.append(group)
+
+        # Sends up to max_batch load cases of a stiffness configuration to the worker pool
+        def _dispatch(self, group:str):
+                stiffness, requests, timer = self.pending.pop(group)
+                if len(requests) > self.max_batch:
+                        self.pending[group] = [stiffness, requests[self.max_batch:], timer]
+                        self.ready.appendleft(group)
+                        requests = requests[:self.max_batch]
+                self.busy += 1
+                asyncio.get_running_loop().create_task(self._solve_batch(group, stiffness, requests))
+
+        async def _solve_batch(self, group:str, stiffness:dict, requests:list):
+                keys = [key for key, _, _ in requests]
+                try:
+                        responses, seconds = await asyncio.get_running_loop().run_in_executor(
+                                self.pool, solve_batch, group, stiffness, [case for _, case, _ in requests], [results for _, _, results in requests]
+                        )
+                except Exception as e:
+                        for key in keys:
+                                self.in_flight.pop(key).set_exception(e)
+                        return
+                finally:
+                        self.busy -= 1
+                        while self.ready and self.busy < self.workers:
+                                self._dispatch(self.ready.popleft())
+
+                self.counters["batches"] += 1
+                self.counters["solved"] += len(requests)
+                self.counters["largest_batch"] = max(self.counters["largest_batch"], len(requests))
+                self.solve_seconds += seconds
+                for key, response in zip(keys, responses):
+                        self.cache[key] = response
+                        if len(self.cache) > self.cache_size:
+                                self.cache.popitem(last=False)
+                        self.in_flight.pop(key).set_result(response)
+
+        # Latency percentiles (ms) of the latest requests, throughputs (requests/s) and batching counters
+        def metrics(self):
+                now = time.perf_counter()
+                latencies = np.array([seconds for _, seconds in self.latencies]) * 1e3
+                report = dict(self.counters)
+                report.update(
+                        uptime=now - self.started,
+                        workers=self.workers,
+                        throughput=self.counters["requests"] / (now - self.started),
+                        recent_throughput=len(self.latencies) / (now - self.latencies[0][0]) if self.latencies else 0.0,
+                        mean_batch=self.counters["solved"] / self.counters["batches"] if self.counters["batches"] else 0.0,
+                        solve_seconds=self.solve_seconds,
+                        latency_ms={
+                                f"p{p}": float(np.percentile(latencies, p)) if len(latencies) else 0.0
+                                for p in (50, 90, 99)
+                        },
+                )
+                report["latency_ms"]["max"] = float(latencies.max()) if len(latencies) else 0.0
+                return report
+
+        # Answers one HTTP request, returns (status, JSON payload)
+        async def route(self, method:str, path:str, body:bytes):
+                if path == "/metrics":
+                        return (200, self.metrics()) if method == "GET" else (405, {"error": "Use GET /metrics"})
+                if path != "/solve":
+                        return 404, {"error": f"No endpoint {path}"}
+                if method != "POST":
+                        return 405, {"error": "Use POST /solve"}
+
+                start = time.perf_counter()
+                self.counters["requests"] += 1
+                try:
+                        response = await self.solve(json.loads(body))
+                        status = 422 if "error" in response else 200
+                except ValueError as e:
+                        response, status = {"error": str(e)}, 400
+                except Exception as e:
+                        response, status = {"error": f"{type(e).__name__}: {e}"}, 500
+                if status != 200:
+                        self.counters["errors"] += 1
+                self.latencies.append((start, time.perf_counter() - start))
+                return status, response
+
+        # Serves HTTP/1.1 requests on one connection (kept alive unless the client closes it)
+        async def handle(self, reader, writer):
+                self.connections.add(asyncio.current_task())
+                try:
+                        while True:
+                                request_line = await reader.readline()
+                                if not request_line.strip():
+                                        break
+                                headers = {}
+                                while True:
+                                        line = await reader.readline()
+                                        if line in (b"\r\n", b"\n", b""):
+                                                break
+                                        name, _, value = line.decode("latin-1").partition(":")
+                                        headers[name.strip().lower()] = value.strip()
+
+                                try:
+                                        method, path, version = request_line.decode("latin-1").split()
+                                        size = int(headers.get("content-length", 0))
+                                except ValueError:
+                                        status, payload, version, size = 400, {"error": "Malformed request"}, "HTTP/1.0", 0
+                                else:
+                                        if size > MAX_BODY:
+                                                status, payload, version = 413, {"error": f"Bodies are limited to {MAX_BODY} bytes"}, "HTTP/1.0"
+                                        else:
+                                                status, payload = await self.route(method, path, await reader.readexactly(size))
+
+                                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                                body = json.dumps(payload).encode()
+                                writer.write(
+                                        f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                                        f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+                                )
+                                await writer.drain()
+                                if not keep_alive:
+                                        break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                        pass
+                finally:
+                        writer.close()
+                        self.connections.discard(asyncio.current_task())
+
+        # Starts listening on a Unix socket if unix is given, otherwise on host:port
+        # the worker processes start first, so they inherit no open connection (and are ready for the first beam)
+        async def start(self, host:str = DEFAULT_HOST, port:int = DEFAULT_PORT, unix:str = None):
+                loop = asyncio.get_running_loop()
+                await asyncio.gather(*(loop.run_in_executor(self.pool, os.getpid) for _ in range(self.workers)))
+                if unix:
+                        return await asyncio.start_unix_server(self.handle, path=unix)
+                return await asyncio.start_server(self.handle, host, port)
+
+        def close(self):
+                self.pool.shutdown(cancel_futures=True)
+
+
+# HTTP connection over a Unix socket, for the client
+class UnixHTTPConnection(http.client.HTTPConnection):
+        def __init__(self, path:str, timeout:float = 60):
+                super().__init__("localhost", timeout=timeout)
+                self.path = path
+
+        def connect(self):
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.settimeout(self.timeout)
+                self.sock.connect(self.path)
+
+
+# Small synchronous client of the service, keeps its connection open between requests
+class SolverClient():
+        def __init__(self, host:str = DEFAULT_HOST, port:int = DEFAULT_PORT, unix:str = None, timeout:float = 60):
+                self.connection = UnixHTTPConnection(unix, timeout) if unix else http.client.HTTPConnection(host, port, timeout=timeout)
+
+        # Returns (status, payload) of one request
+        def request(self, method:str, path:str, payload = None):
+                body = json.dumps(payload).encode() if payload is not None else None
+                self.connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+                response = self.connection.getresponse()
+                return response.status, json.loads(response.read())
+
+        def solve(self, beam:dict):
+                return self.request("POST", "/solve", beam)
+
+        def metrics(self):
+                return self.request("GET", "/metrics")[1]
+
+        def close(self):
+                self.connection.close()
+
+
+# Beams for --bench: three stiffness configurations with random loads (seeded), some of them repeated
+def bench_beams(count:int, seed:int = 0):
+        rng = np.random.default_rng(seed)
+        configurations = [
+                {"supports": [[0, "xy"], [10, "y"]]},
+                {"supports": [[0, "xyz"], [10, "y"]]},
+                {"supports": [[0, "xy"], [4, "y"], [10, "y"]], "springs": [[7, 1e6]]},
+        ]
+        beams = []
+        for _ in range(count):
+                # One beam in five repeats an earlier one
+                if beams and rng.random() < 0.2:
+                        beams.append(beams[rng.integers(len(beams))])
+                        continue
+                beam = {"length": 10, "nodes": 1001, **configurations[rng.integers(len(configurations))]}
+                beam["point_loads"] = [[round(float(rng.uniform(-1e4, -1e3))), round(float(rng.uniform(0, 10)), 2)]]
+                beam["loads"] = [[0, 10, round(float(rng.uniform(-2e3, 0)))]]
+                beams.append(beam)
+        return beams
+
+
+# Serves on a free port and posts beams from concurrent local clients, then prints the metrics
+async def bench(service:SolverService, count:int, clients:int):
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        beams = bench_beams(count)
+
+        def post(indices):
+                client = SolverClient(port=port)
+                statuses = [client.solve(beams[i])[0] for i in indices]
+                client.close()
+                return statuses
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as threads:
+                statuses = await asyncio.gather(*(loop.run_in_executor(threads, post, range(k, count, clients)) for k in range(clients)))
+        elapsed = time.perf_counter() - start
+
+        # The clients closed their connections, let the server see it
+        await asyncio.gather(*service.connections)
+        server.close()
+        await server.wait_closed()
+        failed = sum(status != 200 for batch in statuses for status in batch)
+        print(f"{count} beams from {clients} clients in {elapsed:.2f} s ({count / elapsed:.1f} beams/s, {failed} failed)")
+        print(json.dumps(service.metrics(), indent=2))
+        return 1 if failed else 0
+
+
+async def serve(service:SolverService, host:str, port:int, unix:str):
+        server = await service.start(host, port, unix)
+        print(f"Listening on {unix or f'http://{host}:{server.sockets[0].getsockname()[1]}'}")
+        async with server:
+                await server.serve_forever()
+
+
+def main():
+        parser = argparse.ArgumentParser(description="Serve the FDM beam solver over HTTP")
+        parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+        parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port (0 picks a free one)")
+        parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+        parser.add_argument("--workers", type=int, default=None, help="solver processes (default: one per CPU)")
+        parser.add_argument("--batch-window", type=float, default=2.0, help="ms a stiffness configuration waits for more load cases")
+        parser.add_argument("--max-batch", type=int, default=256, help="load cases solved together at most")
+        parser.add_argument("--bench", type=int, default=0, help="post this many beams from local clients and print the metrics")
+        parser.add_argument("--clients", type=int, default=16, help="concurrent clients of --bench")
+        args = parser.parse_args()
+
+        service = SolverService(args.workers, args.batch_window / 1e3, args.max_batch)
+        try:
+                if args.bench:
+                        return asyncio.run(bench(service, args.bench, args.clients))
+                asyncio.run(serve(service, args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+                pass
+        finally:
+                service.close()
+                if args.unix and os.path.exists(args.unix):
+                        os.remove(args.unix)
+        return 0
+
+
+if __name__ == "__main__":
+        sys.exit(main())
@@ -0,0 +1,5 @@
+# The tests import the scripts at the root of the repository (main, accuracy)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
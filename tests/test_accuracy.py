@@ -0,0 +1,37 @@
+# The closed-form cases of accuracy.py, checked on every change
+import numpy as np
+import pytest
+
+import accuracy
+
+
+# Halving the step divides the error of the deflections by about 4 (second order)
+# and the error of the moments, which are sampled at the nodes, by about 2
+@pytest.mark.parametrize("name", list(accuracy.CASES))
+def test_deflections_converge_at_second_order(name):
+        coarse = accuracy.run_case(name, 241)
+        fine = accuracy.run_case(name, 481)
+        assert fine["deflection_error"] < 2e-2
+        assert np.log2(coarse["deflection_error"] / fine["deflection_error"]) > 1.9
+        assert np.log2(coarse["moment_error"] / fine["moment_error"]) > 0.9
+        assert fine["warning"] is None
+
+
+def test_large_foundation_stays_accurate():
+        for name, nodes in accuracy.LARGE_CASES:
+                assert accuracy.run_case(name, nodes)["deflection_error"] < 1e-4
+
+
+# Over-refined models are rejected or still accurate
+def test_refined_cases_are_rejected_or_accurate():
+        _, failures = accuracy.run_refined(accuracy.REFINED_CASES)
+        assert failures == []
+
+
+# The cantilever is most accurate around 961 nodes, past it rounding errors grow and the solve warns
+def test_rounding_warning_follows_the_error():
+        best = accuracy.run_case("cantilever, UDL", 961)
+        refined = accuracy.run_case("cantilever, UDL", 1921)
+        assert best["warning"] is None
+        assert refined["warning"] is not None
+        assert refined["deflection_error"] > best["deflection_error"]
@@ -0,0 +1,165 @@
+# Sensitivities, dynamics, second order and mixed precision solves against finite differences and closed forms
+import numpy as np
+import pytest
+
+from main import Model
+
+L = 10.0
+EI = 2e11 * 10e-6       # flexural rigidity of the default materials (N m^2)
+MASS = 100.0            # kg/m
+
+
+def simply_supported(nodes:int = 201):
+        model = Model()
+        model.set_total_node_num(nodes)
+        model.add_support(0, "xy")
+        model.add_support(L, "y")
+        model.add_loads((0, L), -1e3)
+        return model
+
+
+# Two spans with a stiffer section, the parameters of the sensitivities are arguments
+def two_spans(E = 2e11, I = 10e-6, P = -1e4, q = -1e3, support = 6.0, section = 1.0):
+        model = Model()
+        model.set_properties(L, E, I)
+        model.set_total_node_num(401)
+        model.add_support(0, "xy")
+        model.add_support(support, "y")
+        model.add_support(L, "y")
+        model.add_section((2, 4), 2e11, 20e-6 * section)
+        model.add_point_load(P, 3)
+        model.add_loads((0, L), q)
+        return model
+
+
+# Natural frequency (Hz) of a uniform beam whose mode has the eigenvalue beta L
+def frequency(beta_L:float):
+        return beta_L**2 / L**2 * np.sqrt(EI / MASS) / (2 * np.pi)
+
+
+@pytest.mark.parametrize("quantity, position", [("deflection", 3.0), ("moment", 6.0), ("reaction", L), ("max_deflection", None)])
+def test_sensitivities_match_finite_differences(quantity, position):
+        model = two_spans()
+        assert model.solve_sensitivities(quantity, position), model.stats.error
+        sensitivities = model.sensitivities
+
+        def derivative(name:str, value:float, step:float):
+                values = []
+                for x in (value + step, value - step):
+                        model = two_spans(**{name: x})
+                        assert model.solve_sensitivities(quantity, position), model.stats.error
+                        values.append(model.sensitivities["value"])
+                return (values[0] - values[1]) / (2 * step)
+
+        assert sensitivities["E"] == pytest.approx(derivative("E", 2e11, 2e8), rel=1e-4)
+        assert sensitivities["I"] == pytest.approx(derivative("I", 10e-6, 1e-8), rel=1e-4)
+        assert sensitivities["point_loads"][0] == pytest.approx(derivative("P", -1e4, 10), rel=1e-6)
+        assert sensitivities["loads"][0] == pytest.approx(derivative("q", -1e3, 1), rel=1e-6)
+        assert sensitivities["sections"][0] == pytest.approx(derivative("section", 1.0, 1e-3), rel=1e-4)
+        # Supports snap to the nodes, so the position moves by a whole step
+        assert sensitivities["supports"][1] == pytest.approx(derivative("support", 6.0, L / 400), rel=2e-2)
+
+
+def test_modes_match_closed_form_frequencies():
+        model = simply_supported(401)
+        assert model.solve_modes(3, MASS), model.stats.error
+        assert model.mode_frequencies == pytest.approx([frequency(n * np.pi) for n in (1, 2, 3)], rel=1e-4)
+
+        cantilever = Model()
+        cantilever.set_total_node_num(401)
+        cantilever.add_support(0, "xyz")
+        assert cantilever.solve_modes(2, MASS), cantilever.stats.error
+        assert cantilever.mode_frequencies == pytest.approx([frequency(1.8751), frequency(4.6941)], rel=1e-4)
+
+
+# A load applied suddenly doubles the static deflection half a period later, damping settles it on the static one
+def test_newmark_step_load():
+        static = simply_supported()
+        assert static.solve_FDM()
+        middle = static.deflections[100]
+        half_period = 0.5 / frequency(np.pi)
+
+        frames = [(t, v[100]) for t, v in simply_supported().iter_time_history(0.6, 1e-3, MASS)]
+        times, deflections = np.array(frames).T
+        assert deflections.min() / middle == pytest.approx(2, rel=1e-3)
+        assert times[deflections.argmin()] == pytest.approx(half_period, rel=1e-2)
+
+        damping = 2 * 0.3 * 2 * np.pi * frequency(np.pi)
+        *_, (t, v) = simply_supported().iter_time_history(5, 2e-3, MASS, damping=damping)
+        assert v == pytest.approx(static.deflections, rel=1e-5)
+
+
+# Amplification of the midspan deflection of a pinned beam under a UDL and a compression alpha * Pcr
+def test_p_delta_amplification():
+        critical = np.pi**2 * EI / L**2
+        linear = simply_supported(401)
+        assert linear.solve_FDM()
+
+        for alpha in (0.5, 0.95):
+                model = simply_supported(401)
+                model.add_point_load(-alpha * critical, L, 0)
+                model.second_order = True
+                assert model.solve_FDM(), model.stats.error
+                u = np.pi / 2 * np.sqrt(alpha)
+                amplification = 12 * (2 / np.cos(u) - u**2 - 2) / (5 * u**4)
+                assert model.buckling_factor == pytest.approx(1 / alpha, rel=1e-3)
+                assert model.deflections[200] / linear.deflections[200] == pytest.approx(amplification, rel=5e-3)
+
+        model = simply_supported(401)
+        model.add_point_load(-1.2 * critical, L, 0)
+        model.second_order = True
+        assert not model.solve_FDM()
+        assert "buckling" in model.stats.error
+
+
+def test_mixed_precision_matches_double():
+        double = simply_supported(60)
+        assert double.solve_FDM()
+        mixed = simply_supported(60)
+        mixed.precision = "mixed"
+        assert mixed.solve_FDM(), mixed.stats.error
+        assert mixed.stats.refinement_iterations is not None and mixed.stats.fallback is None
+        error = np.max(np.abs(mixed.deflections - double.deflections)) / np.max(np.abs(double.deflections))
+        assert error < 1e-9
+
+        # Larger beams are too ill-conditioned for float32 and are factorized in float64
+        large = simply_supported(1001)
+        large.precision = "mixed"
+        assert large.solve_FDM()
+        assert large.stats.fallback is not None
+
+
+def test_load_cases_match_separate_solves():
+        cases = [{"point_loads": [(-2e4, 8.0, 90.0)]}, {"loads": [(0.0, L, -5e2)]}, {}]
+        model = simply_supported()
+        assert model.solve_FDM()
+        versions = [getattr(model, name).version for name in model.load_case_names]
+        states = len(model.history)
+
+        results = model.solve_load_cases(cases)
+        for case, result in zip(cases, results):
+                separate = simply_supported()
+                for name, records in case.items():
+                        getattr(separate, name).replace(records)
+                assert separate.solve_FDM()
+                assert result["deflections"] == pytest.approx(separate.deflections, rel=1e-10, abs=1e-15)
+
+        # The model keeps its loads, its history and its solution
+        assert [getattr(model, name).version for name in model.load_case_names] == versions
+        assert len(model.history) == states
+        assert model.solved
+
+
+def test_moving_load_envelope_matches_point_load_solves():
+        model = simply_supported(101)
+        model.loads.replace([])
+        assert model.solve_moving_load([-1e4], [], step=1.0)
+
+        deflections = []
+        for position in np.arange(0, L + 0.5, 1.0):
+                static = simply_supported(101)
+                static.loads.replace([])
+                static.add_point_load(-1e4, position)
+                assert static.solve_FDM()
+                deflections.append(static.deflections)
+        assert model.envelopes["deflection"][0] == pytest.approx(np.min(deflections, axis=0), rel=1e-10, abs=1e-15)
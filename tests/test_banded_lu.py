@@ -0,0 +1,75 @@
+# Banded LU factorizations against dense numpy solves
+import numpy as np
+import pytest
+
+from main import BandedLU, OutOfCoreBandedLU
+
+LOWER = 2
+UPPER = 3
+
+
+# Random band (N rows, band[i, d + lower] = K[i, i + d]) whose pivots need row interchanges
+def random_band(N:int, seed:int = 0):
+        rng = np.random.default_rng(seed)
+        band = rng.standard_normal((N, LOWER + UPPER + 1))
+        # Entries outside the matrix are never read, zero them so the dense copy is exact
+        for d in range(-LOWER, UPPER + 1):
+                band[:max(-d, 0), d + LOWER] = 0
+                band[N - max(d, 0):, d + LOWER] = 0
+        return band
+
+
+def relative_error(x, reference):
+        return np.max(np.abs(x - reference)) / np.max(np.abs(reference))
+
+
+# Below dense_max_rows LAPACK solves the dense matrix, above it the banded loops run (in chunks of list_rows)
+@pytest.mark.parametrize("N", [5, 150, 1000])
+def test_solve_matches_dense(N, monkeypatch):
+        monkeypatch.setattr(BandedLU, "dense_max_rows", 100)
+        monkeypatch.setattr(BandedLU, "list_rows", 64)
+        band = random_band(N)
+        K = BandedLU.to_dense(band, LOWER)
+        b = np.random.default_rng(1).standard_normal((N, 3))
+        lu = BandedLU(band, LOWER, UPPER)
+
+        assert relative_error(lu.solve(b[:, 0]), np.linalg.solve(K, b[:, 0])) < 1e-10
+        assert relative_error(lu.solve(b), np.linalg.solve(K, b)) < 1e-10
+        assert relative_error(lu.solve_transposed(b[:, 0]), np.linalg.solve(K.T, b[:, 0])) < 1e-10
+
+
+def test_multiply_matches_dense():
+        band = random_band(50)
+        x = np.arange(50.0)
+        assert np.allclose(BandedLU.multiply(band, LOWER, x), BandedLU.to_dense(band, LOWER) @ x)
+
+
+def test_singular_matrix_is_rejected(monkeypatch):
+        monkeypatch.setattr(BandedLU, "dense_max_rows", 100)
+        band = random_band(300)
+        band[100] = 0
+        with pytest.raises(np.linalg.LinAlgError):
+                BandedLU(band, LOWER, UPPER)
+
+
+def test_condition_estimate_bounds_the_condition_number():
+        band = random_band(400)
+        K = BandedLU.to_dense(band, LOWER)
+        exact = np.linalg.cond(K, 1)
+        estimate = BandedLU(band, LOWER, UPPER).condition_estimate(band)
+        # Hager's estimate is a lower bound, usually within a small factor
+        assert exact / 10 <= estimate <= exact * (1 + 1e-8)
+        assert BandedLU.norm(band, LOWER) == pytest.approx(np.abs(K).sum(axis=0).max())
+
+
+@pytest.mark.parametrize("block_rows", [8, 37, 1000])
+def test_out_of_core_matches_in_memory(block_rows, tmp_path):
+        N = 500
+        band = random_band(N, seed=2)
+        b = np.random.default_rng(3).standard_normal((N, 2))
+        lu = BandedLU(band, LOWER, UPPER)
+        out_of_core = OutOfCoreBandedLU(band, LOWER, UPPER, block_rows, str(tmp_path))
+
+        assert relative_error(np.asarray(out_of_core.solve(b)), lu.solve(b)) < 1e-12
+        assert relative_error(np.asarray(out_of_core.solve_transposed(b[:, 0])), lu.solve_transposed(b[:, 0])) < 1e-12
+        assert out_of_core.condition_estimate(band) == pytest.approx(lu.condition_estimate(band))